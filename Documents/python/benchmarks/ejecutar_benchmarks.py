@@ -0,0 +1,324 @@
+"""
+Suite de benchmarks del pipeline de análisis.
+Para cada tamaño genera (o reutiliza) un conjunto de datos sintéticos y mide cada etapa:
+carga, limpieza, análisis por bloques, gráficos y reporte. De cada etapa se registra el
+tiempo de reloj, el pico de memoria residente (RSS) y las filas por segundo, y la
+ejecución completa se agrega a un historial JSON. Una etapa más lenta que la mediana
+de las ejecuciones anteriores (mismo tamaño) por encima del umbral se marca como regresión.
+
+Uso:
+    python benchmarks/ejecutar_benchmarks.py --tamanos 1000 100000 1000000
+    python benchmarks/ejecutar_benchmarks.py --fallar-si-regresion   # Código de salida 1 si hay regresiones
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.generar_datos import escribir_conjunto
+from src.preprocesamiento import cargar_datos, cargar_publicaciones, limpiar_datos_completo, TAMANO_CHUNK
+from src.analisis import realizar_analisis
+from src.consultas import construir_indices, consultar
+from src.carga_concurrente import cargar_concurrente
+from src.publicaciones import analizar_publicaciones
+from src.generar_reporte import calcular_resumenes_graficos, preparar_tablas, escribir_reporte
+from src.visualizacion import renderizar_graficos
+
+try:
+    import resource
+except ImportError:  # Windows: sin medición de memoria
+    resource = None
+
+# Historial por defecto (una entrada por ejecución de la suite)
+RUTA_HISTORIAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'historial.json')
+
+# Datos sintéticos generados, reutilizados entre ejecuciones
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.datos')
+
+# Tamaños por defecto (número de interacciones)
+TAMANOS = (1_000, 10_000, 100_000)
+
+# Por encima de este tamaño no se cargan las interacciones completas en memoria
+# (solo se mide el análisis por bloques)
+LIMITE_EN_MEMORIA = 10_000_000
+
+# Una etapa es regresión si tarda más que (1 + UMBRAL_REGRESION) veces la mediana anterior...
+UMBRAL_REGRESION = 0.25
+# ...y además la diferencia supera este mínimo en segundos (evita ruido en etapas muy cortas)
+DIFERENCIA_MINIMA = 0.05
+# Ejecuciones anteriores que entran en la mediana
+EJECUCIONES_REFERENCIA = 5
+
+def _reiniciar_pico_rss():
+    """Reinicia el pico de memoria del proceso (Linux >= 4.0); en otros sistemas el pico es acumulado."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def _pico_rss_mb():
+    """Pico de memoria residente en MB (VmHWM en Linux, ru_maxrss en otros Unix)."""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / 1024 ** 2 if sys.platform == 'darwin' else maximo / 1024  # macOS da bytes, Linux KB
+
+def medir(etapa, funcion, filas, repeticiones=1):
+    """
+    Ejecuta una etapa y mide tiempo, memoria y rendimiento.
+
+    La salida por consola de la etapa se descarta. Con varias repeticiones se
+    registra el mejor tiempo.
+
+    Args:
+        etapa (str): Nombre de la etapa
+        funcion (callable): Función sin argumentos a medir
+        filas (int): Filas procesadas (para las filas por segundo)
+        repeticiones (int): Veces que se ejecuta la etapa
+
+    Returns:
+        tuple: (valor devuelto por la función, dict con la medición)
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        _reiniciar_pico_rss()
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            valor = funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    segundos = min(tiempos)
+    rss = _pico_rss_mb()
+    return valor, {
+        'etapa': etapa,
+        'filas': filas,
+        'segundos': round(segundos, 4),
+        'filas_por_segundo': round(filas / segundos) if segundos > 0 else None,
+        'rss_pico_mb': round(rss, 1) if rss is not None else None
+    }
+
+def preparar_datos(tamano, semilla=0, directorio=DIRECTORIO_DATOS):
+    """
+    Devuelve las rutas del conjunto sintético de un tamaño, generándolo si no existe.
+
+    Args:
+        tamano (int): Número de interacciones
+        semilla (int): Semilla de la generación
+        directorio (str): Directorio de los conjuntos generados
+
+    Returns:
+        dict: Rutas ('usuarios', 'interacciones', 'publicaciones') y tamaños de cada tabla
+    """
+    n_usuarios = max(100, tamano // 20)
+    n_publicaciones = max(10, tamano // 10)
+    destino = os.path.join(directorio, f'{tamano}_{semilla}')
+    rutas = {
+        'usuarios': os.path.join(destino, 'usuarios.csv'),
+        'interacciones': os.path.join(destino, 'interacciones.jsonl'),
+        'publicaciones': os.path.join(destino, 'publicaciones.jsonl')
+    }
+    if not all(os.path.exists(ruta) for ruta in rutas.values()):
+        rutas = escribir_conjunto(destino, n_usuarios, tamano, n_publicaciones, semilla)
+    return dict(rutas, n_usuarios=n_usuarios, n_interacciones=tamano, n_publicaciones=n_publicaciones)
+
+def ejecutar_tamano(tamano, semilla=0, repeticiones=1):
+    """
+    Mide todas las etapas del pipeline sobre un conjunto sintético.
+
+    Args:
+        tamano (int): Número de interacciones
+        semilla (int): Semilla de la generación
+        repeticiones (int): Repeticiones de cada etapa (se guarda el mejor tiempo)
+
+    Returns:
+        list: Una medición por etapa (ver medir)
+    """
+    datos = preparar_datos(tamano, semilla)
+    filas = datos['n_usuarios'] + datos['n_interacciones']
+    mediciones = []
+
+    if tamano <= LIMITE_EN_MEMORIA:
+        (df_usuarios, df_interacciones), m = medir(
+            'cargar_datos', lambda: cargar_datos(datos['usuarios'], datos['interacciones']), filas, repeticiones)
+        mediciones.append(m)
+        # Las tres fuentes a la vez (comparar con cargar_datos + cargar_publicaciones)
+        _, m = medir('carga_concurrente',
+                     lambda: cargar_concurrente({'usuarios': datos['usuarios'],
+                                                 'interacciones': datos['interacciones'],
+                                                 'publicaciones': datos['publicaciones']}),
+                     filas + datos['n_publicaciones'], repeticiones)
+        mediciones.append(m)
+        _, m = medir('limpiar_datos_completo',
+                     lambda: limpiar_datos_completo(df_usuarios.copy(), df_interacciones.copy()),
+                     filas, repeticiones)
+        mediciones.append(m)
+        indices, m = medir('construir_indices', lambda: construir_indices(df_usuarios, df_interacciones),
+                           datos['n_interacciones'], repeticiones)
+        mediciones.append(m)
+        # Consulta típica de un panel: una ciudad, un tipo y una semana
+        _, m = medir('consulta', lambda: consultar(indices, ciudad='Cali', tipo='superlike',
+                                                   fecha=('2025-01-01', '2025-01-07')),
+                     datos['n_interacciones'], repeticiones)
+        mediciones.append(m)
+        del df_usuarios, df_interacciones, indices
+
+    _, m = medir('cargar_publicaciones', lambda: cargar_publicaciones(datos['publicaciones']),
+                 datos['n_publicaciones'], repeticiones)
+    mediciones.append(m)
+
+    (_, df_usuarios, _, resultados), m = medir(
+        'realizar_analisis',
+        lambda: realizar_analisis(datos['usuarios'], datos['interacciones'], tamano_chunk=TAMANO_CHUNK),
+        filas, repeticiones)
+    mediciones.append(m)
+
+    # Métricas de publicaciones por bloques (no se agregan a 'resultados' para que los
+    # gráficos y el reporte sigan midiendo lo mismo que en el historial)
+    _, m = medir('analizar_publicaciones',
+                 lambda: analizar_publicaciones(df_usuarios, datos['publicaciones']),
+                 datos['n_publicaciones'], repeticiones)
+    mediciones.append(m)
+
+    # Gráficos sin caché ni procesos extra, para medir el dibujo en sí
+    resumenes = calcular_resumenes_graficos(df_usuarios, None, resultados)
+    _, m = medir('graficos', lambda: renderizar_graficos(resumenes, procesos=1), len(resumenes), repeticiones)
+    mediciones.append(m)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'reporte.html')
+
+        def reporte():
+            tablas = preparar_tablas(df_usuarios, None, resultados)
+            return escribir_reporte(ruta, df_usuarios, None, resultados, tablas, procesos=1)
+
+        _, m = medir('generar_reporte', reporte, len(df_usuarios), repeticiones)
+        mediciones.append(m)
+
+    for m in mediciones:
+        m['tamano'] = tamano
+    return mediciones
+
+def _commit_actual():
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                                capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def cargar_historial(ruta=RUTA_HISTORIAL):
+    """Lee el historial de ejecuciones (lista vacía si no existe)."""
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+def guardar_historial(historial, ruta=RUTA_HISTORIAL):
+    """Escribe el historial de forma atómica."""
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(historial, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+def detectar_regresiones(mediciones, historial, umbral=UMBRAL_REGRESION):
+    """
+    Compara cada medición con la mediana de las últimas ejecuciones del mismo tamaño y etapa.
+
+    Args:
+        mediciones (list): Mediciones de la ejecución actual
+        historial (list): Ejecuciones anteriores
+        umbral (float): Aumento relativo tolerado
+
+    Returns:
+        list: Diccionarios con 'tamano', 'etapa', 'segundos', 'referencia' y 'aumento'
+    """
+    regresiones = []
+    for m in mediciones:
+        anteriores = [r['segundos'] for ejecucion in historial for r in ejecucion['resultados']
+                      if r['tamano'] == m['tamano'] and r['etapa'] == m['etapa']][-EJECUCIONES_REFERENCIA:]
+        if not anteriores:
+            continue
+        referencia = statistics.median(anteriores)
+        if m['segundos'] > referencia * (1 + umbral) and m['segundos'] - referencia > DIFERENCIA_MINIMA:
+            regresiones.append({'tamano': m['tamano'], 'etapa': m['etapa'], 'segundos': m['segundos'],
+                                'referencia': referencia, 'aumento': m['segundos'] / referencia - 1})
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ejecuta los benchmarks del pipeline de análisis.')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS),
+                        help='Número de interacciones de cada conjunto sintético')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--repeticiones', type=int, default=1,
+                        help='Repeticiones de cada etapa (se guarda el mejor tiempo)')
+    parser.add_argument('--historial', default=RUTA_HISTORIAL)
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION,
+                        help='Aumento relativo de tiempo que se considera regresión')
+    parser.add_argument('--fallar-si-regresion', action='store_true',
+                        help='Terminar con código 1 si se detecta alguna regresión')
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("⏱️ BENCHMARKS DEL PIPELINE")
+    print("=" * 60)
+
+    mediciones = []
+    for tamano in args.tamanos:
+        print(f"\n📦 {tamano:,} interacciones")
+        for m in ejecutar_tamano(tamano, args.semilla, args.repeticiones):
+            rss = f"{m['rss_pico_mb']:.1f} MB" if m['rss_pico_mb'] is not None else 'n/d'
+            print(f"   • {m['etapa']:<24} {m['segundos']:>9.3f} s  {m['filas_por_segundo'] or 0:>12,} filas/s  {rss}")
+            mediciones.append(m)
+
+    historial = cargar_historial(args.historial)
+    regresiones = detectar_regresiones(mediciones, historial, args.umbral)
+    historial.append({
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_actual(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'procesadores': os.cpu_count(),
+        'semilla': args.semilla,
+        'resultados': mediciones
+    })
+    guardar_historial(historial, args.historial)
+    print(f"\n💾 Resultados agregados a '{args.historial}'")
+
+    if regresiones:
+        print("\n⚠️ REGRESIONES:")
+        for r in regresiones:
+            print(f"   • {r['etapa']} ({r['tamano']:,}): {r['segundos']:.3f} s frente a "
+                  f"{r['referencia']:.3f} s (+{r['aumento']:.0%})")
+        if args.fallar_si_regresion:
+            return 1
+    else:
+        print("\n✅ Sin regresiones respecto de las ejecuciones anteriores")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
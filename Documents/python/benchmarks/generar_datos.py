@@ -0,0 +1,261 @@
+"""
+Generador de datos sintéticos para los benchmarks.
+Produce usuarios.csv, interacciones.jsonl y publicaciones.jsonl con la forma de los
+datos reales de la app: actividad muy sesgada (pocos usuarios concentran la mayoría
+de las interacciones), intereses y tags con varios valores y textos sucios (mayúsculas
+mezcladas, espacios sobrantes, tildes faltantes, edades no numéricas, banderas como texto).
+
+La salida es determinista: la misma semilla produce los mismos archivos. Cada bloque
+de filas usa su propio generador derivado de la semilla, así que también se puede
+generar a tamaños de 10^8 filas escribiendo por bloques, sin tener todo en memoria.
+
+Uso:
+    python benchmarks/generar_datos.py --usuarios 100000 --interacciones 10000000 --directorio datos_bench
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Filas generadas y escritas en cada bloque
+FILAS_POR_BLOQUE = 1_000_000
+
+# Exponente de la ley de potencias de la actividad por usuario (mayor = más sesgo)
+SESGO_ACTIVIDAD = 1.1
+
+NOMBRES = ['Ana', 'Carlos', 'María', 'Juan', 'Luisa', 'Andrés', 'Camila', 'Santiago',
+           'Valentina', 'Sebastián', 'Daniela', 'Felipe', 'Laura', 'Mateo', 'Sofía', 'Nicolás']
+
+# (valor canónico, peso relativo)
+CIUDADES = [('Bogotá', 30), ('Medellín', 20), ('Cali', 15), ('Barranquilla', 10),
+            ('Cartagena', 8), ('Bucaramanga', 6), ('Pereira', 5), ('Manizales', 3),
+            ('Santa Marta', 2), ('Cúcuta', 1)]
+
+INTERESES = [('Música', 20), ('Viajes', 18), ('Deportes', 15), ('Cine', 12), ('Tecnología', 10),
+             ('Arte', 8), ('Cocina', 7), ('Lectura', 5), ('Fotografía', 3), ('Baile', 2)]
+
+GENEROS = [('Femenino', 50), ('Masculino', 48), ('No binario', 2)]
+
+TIPOS_INTERACCION = [('like', 60), ('dislike', 30), ('superlike', 10)]
+
+# Probabilidad de match según el tipo
+PROBABILIDAD_MATCH = {'like': 0.4, 'dislike': 0.0, 'superlike': 0.7}
+
+ESTADOS_PUBLICACION = [('PUBLICADO', 45), ('publicado', 35), ('borrador', 20)]
+
+TAGS = ['musica', 'viajes', 'deportes', 'cine', 'arte', 'cocina', 'lectura', 'fotografia',
+        'rock', 'pop', 'poesia', 'historia', 'opinion', 'podcast', 'futbol', 'recetas']
+
+# Fracción de valores "sucios" en cada columna de texto
+FRACCION_SUCIOS = 0.1
+
+def _pesos(opciones):
+    valores = np.array([valor for valor, _ in opciones], dtype=object)
+    pesos = np.array([peso for _, peso in opciones], dtype=float)
+    return valores, pesos / pesos.sum()
+
+def _ensuciar(rng, valores):
+    """Aplica a una fracción de los textos mayúsculas/minúsculas, espacios o tildes faltantes."""
+    serie = pd.Series(np.asarray(valores, dtype=object), dtype=object)
+    variante = np.where(rng.random(len(serie)) < FRACCION_SUCIOS, rng.integers(0, 4, len(serie)), -1)
+    transformaciones = (
+        lambda s: s.str.upper(),
+        lambda s: s.str.lower(),
+        lambda s: '  ' + s + ' ',
+        lambda s: s.str.translate(str.maketrans('áéíóúÁÉÍÓÚ', 'aeiouAEIOU'))
+    )
+    for numero, transformar in enumerate(transformaciones):
+        elegidos = variante == numero
+        if elegidos.any():
+            serie[elegidos] = transformar(serie[elegidos])
+    return serie.to_numpy()
+
+def _generador(semilla, tabla, bloque):
+    """Generador independiente para cada (tabla, bloque), de modo que la salida no depende del orden."""
+    return np.random.default_rng([semilla, tabla, bloque])
+
+def _bloques(total):
+    for numero, inicio in enumerate(range(0, total, FILAS_POR_BLOQUE)):
+        yield numero, inicio, min(FILAS_POR_BLOQUE, total - inicio)
+
+def _probabilidades_actividad(n_usuarios, semilla):
+    """Peso de cada usuario en la actividad: ley de potencias sobre un orden aleatorio de usuarios."""
+    rangos = np.random.default_rng([semilla, 99]).permutation(n_usuarios) + 1
+    pesos = 1.0 / rangos ** SESGO_ACTIVIDAD
+    return pesos / pesos.sum()
+
+def generar_usuarios(n, semilla=0, inicio=0, bloque=0):
+    """
+    Genera un bloque de usuarios.
+
+    Args:
+        n (int): Número de usuarios del bloque
+        semilla (int): Semilla de la generación
+        inicio (int): Posición del primer usuario (los ids empiezan en inicio + 1)
+        bloque (int): Número de bloque (elige el generador)
+
+    Returns:
+        pd.DataFrame: Columnas de usuarios.csv más 'biografia'
+    """
+    rng = _generador(semilla, 0, bloque)
+    ciudades, p_ciudades = _pesos(CIUDADES)
+    intereses, p_intereses = _pesos(INTERESES)
+    generos, p_generos = _pesos(GENEROS)
+
+    edades = rng.integers(18, 61, n).astype(object)
+    edades[rng.random(n) < 0.005] = 'N/A'  # Edades no válidas que el cargador descarta
+
+    # Entre 1 y 4 intereses distintos por usuario, separados por comas. Muestreo
+    # ponderado sin reemplazo vectorizado: se toman las k mayores claves log(u) / peso
+    cantidad = rng.integers(1, 5, n)
+    claves = np.log(rng.random((n, len(intereses)))) / p_intereses
+    orden = np.argsort(-claves, axis=1)
+    elegidos = pd.Series(intereses[orden[:, 0]], dtype=object)
+    for columna in range(1, 4):
+        elegidos = elegidos.where(cantidad <= columna, elegidos + ', ' + intereses[orden[:, columna]])
+
+    biografias = np.where(rng.random(n) < 0.6, None, 'Hola, me gusta conocer gente nueva')
+    return pd.DataFrame({
+        'id_usuario': np.arange(inicio + 1, inicio + n + 1),
+        'nombre': _ensuciar(rng, rng.choice(NOMBRES, n)),
+        'edad': edades,
+        'genero': rng.choice(generos, n, p=p_generos),
+        'ciudad': _ensuciar(rng, rng.choice(ciudades, n, p=p_ciudades)),
+        'intereses': _ensuciar(rng, elegidos),
+        'biografia': biografias
+    })
+
+def generar_interacciones(n, n_usuarios, semilla=0, inicio=0, bloque=0, probabilidades=None,
+                          fecha_inicial='2025-01-01', segundos_entre=30):
+    """
+    Genera un bloque de interacciones en orden cronológico.
+
+    Args:
+        n (int): Número de interacciones del bloque
+        n_usuarios (int): Usuarios existentes (ids 1..n_usuarios); un 0,1 % de las
+            interacciones apunta a usuarios inexistentes
+        semilla (int): Semilla de la generación
+        inicio (int): Posición de la primera interacción (ids e instantes siguen desde ahí)
+        bloque (int): Número de bloque (elige el generador)
+        probabilidades (np.ndarray): Peso de cada usuario (ver _probabilidades_actividad)
+        fecha_inicial (str): Fecha de la primera interacción
+        segundos_entre (int): Separación media entre interacciones
+
+    Returns:
+        pd.DataFrame: Columnas de interacciones.json
+    """
+    rng = _generador(semilla, 1, bloque)
+    if probabilidades is None:
+        probabilidades = _probabilidades_actividad(n_usuarios, semilla)
+    tipos, p_tipos = _pesos(TIPOS_INTERACCION)
+
+    usuarios = rng.choice(n_usuarios, n, p=probabilidades) + 1
+    huerfanas = rng.random(n) < 0.001
+    usuarios[huerfanas] = n_usuarios + 1 + rng.integers(0, 1000, int(huerfanas.sum()))
+
+    codigos_tipo = rng.choice(len(tipos), n, p=p_tipos)
+    tipo = tipos[codigos_tipo]
+    limites = np.array([PROBABILIDAD_MATCH[t] for t in tipos])[codigos_tipo]
+    match = (rng.random(n) < limites).astype(object)
+    como_texto = np.flatnonzero(rng.random(n) < 0.01)  # Banderas serializadas como texto
+    match[como_texto] = np.where(match[como_texto].astype(bool), 'true', 'False')
+
+    posiciones = np.arange(inicio, inicio + n)
+    segundos = posiciones * segundos_entre + rng.integers(0, segundos_entre, n)
+    fechas = np.datetime64(fecha_inicial, 's') + segundos.astype('timedelta64[s]')
+    return pd.DataFrame({
+        'id_interaccion': posiciones + 1,
+        'id_usuario': usuarios,
+        'tipo': _ensuciar(rng, tipo),
+        'match': match,
+        'fecha': np.datetime_as_string(fechas, unit='s')
+    })
+
+def generar_publicaciones(n, n_usuarios, semilla=0, inicio=0, bloque=0, probabilidades=None):
+    """
+    Genera un bloque de publicaciones de voz.
+
+    Args:
+        n (int): Número de publicaciones del bloque
+        n_usuarios (int): Usuarios existentes
+        semilla (int): Semilla de la generación
+        inicio (int): Posición de la primera publicación
+        bloque (int): Número de bloque (elige el generador)
+        probabilidades (np.ndarray): Peso de cada usuario (ver _probabilidades_actividad)
+
+    Returns:
+        pd.DataFrame: Columnas de publicaciones.json
+    """
+    rng = _generador(semilla, 2, bloque)
+    if probabilidades is None:
+        probabilidades = _probabilidades_actividad(n_usuarios, semilla)
+    estados, p_estados = _pesos(ESTADOS_PUBLICACION)
+    cantidad = rng.integers(1, 4, n)
+    # Tags distintos por publicación: las primeras columnas de una permutación aleatoria por fila
+    orden = np.argsort(rng.random((n, len(TAGS))), axis=1)[:, :3]
+    matriz = _ensuciar(rng, np.array(TAGS, dtype=object)[orden].ravel()).reshape(n, 3)
+    tags = [fila[:k].tolist() for fila, k in zip(matriz, cantidad)]
+    return pd.DataFrame({
+        'id_publicacion': np.arange(inicio + 101, inicio + n + 101),
+        'id_usuario': rng.choice(n_usuarios, n, p=probabilidades) + 1,
+        'duracion_segundos': rng.gamma(2.0, 40.0, n).astype(int).clip(5, 600),
+        'tags': tags,
+        'estado': rng.choice(estados, n, p=p_estados)
+    })
+
+def escribir_conjunto(directorio, n_usuarios, n_interacciones, n_publicaciones=0, semilla=0):
+    """
+    Escribe un conjunto completo de datos sintéticos, bloque por bloque.
+
+    Args:
+        directorio (str): Directorio de salida
+        n_usuarios (int): Filas de usuarios.csv
+        n_interacciones (int): Líneas de interacciones.jsonl
+        n_publicaciones (int): Líneas de publicaciones.jsonl (0 para no generarlo)
+        semilla (int): Semilla de la generación
+
+    Returns:
+        dict: Rutas de los archivos escritos ('usuarios', 'interacciones' y 'publicaciones')
+    """
+    os.makedirs(directorio, exist_ok=True)
+    rutas = {
+        'usuarios': os.path.join(directorio, 'usuarios.csv'),
+        'interacciones': os.path.join(directorio, 'interacciones.jsonl'),
+        'publicaciones': os.path.join(directorio, 'publicaciones.jsonl') if n_publicaciones else None
+    }
+    probabilidades = _probabilidades_actividad(n_usuarios, semilla)
+
+    with open(rutas['usuarios'], 'w', encoding='utf-8', newline='') as f:
+        for numero, inicio, n in _bloques(n_usuarios):
+            generar_usuarios(n, semilla, inicio, numero).to_csv(f, index=False, header=(numero == 0))
+
+    with open(rutas['interacciones'], 'w', encoding='utf-8') as f:
+        for numero, inicio, n in _bloques(n_interacciones):
+            df = generar_interacciones(n, n_usuarios, semilla, inicio, numero, probabilidades)
+            f.write(df.to_json(orient='records', lines=True, force_ascii=False))
+
+    if n_publicaciones:
+        with open(rutas['publicaciones'], 'w', encoding='utf-8') as f:
+            for numero, inicio, n in _bloques(n_publicaciones):
+                df = generar_publicaciones(n, n_usuarios, semilla, inicio, numero, probabilidades)
+                f.write(df.to_json(orient='records', lines=True, force_ascii=False))
+    return rutas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera datos sintéticos para los benchmarks.')
+    parser.add_argument('--usuarios', type=int, default=1_000)
+    parser.add_argument('--interacciones', type=int, default=10_000)
+    parser.add_argument('--publicaciones', type=int, default=1_000)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--directorio', default='datos_bench')
+    args = parser.parse_args(argv)
+
+    rutas = escribir_conjunto(args.directorio, args.usuarios, args.interacciones, args.publicaciones, args.semilla)
+    for nombre, ruta in rutas.items():
+        if ruta:
+            print(f"   ✓ {nombre}: {ruta} ({os.path.getsize(ruta) / 1024 ** 2:.1f} MB)")
+
+if __name__ == '__main__':
+    main()
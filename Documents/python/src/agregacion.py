@@ -0,0 +1,562 @@
+"""
+Módulo de agregación para la app de citas.
+Calcula todas las métricas del análisis con una sola pasada sobre usuarios y una
+sola pasada (o una pasada por bloque) sobre interacciones. La ciudad de cada
+interacción se obtiene con un arreglo de búsqueda id -> fila, sin hacer merge.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.preprocesamiento import convertir_fechas
+from src.intereses import tokenizar_intereses, conteo_intereses, intereses_por_grupo
+from src.sketches import (
+    nuevo_frecuentes, agregar_conteos_frecuentes, combinar_frecuentes, error_frecuentes, top_frecuentes,
+    frecuentes_a_dict, frecuentes_desde_dict, agregar_hll_por_grupo, combinar_hll_por_grupo,
+    estimar_por_grupo, hll_a_dict, hll_desde_dict
+)
+
+# Un arreglo de búsqueda directo (indexado por id) se usa si los ids no son
+# mucho más grandes que el número de filas; si no, se busca con searchsorted
+FACTOR_DENSIDAD_IDS = 8
+
+# Código de día de las fechas faltantes (NaT convertido a int64)
+DIA_NULO = np.iinfo('int64').min
+
+def codigos_dia(fechas):
+    """
+    Convierte fechas en códigos de día enteros (días desde 1970-01-01).
+
+    Args:
+        fechas (pd.Series): Fechas como datetime64 o como texto ISO (ver
+            preprocesamiento.convertir_fechas)
+
+    Returns:
+        np.ndarray: Códigos int64; las fechas faltantes valen DIA_NULO
+    """
+    if not pd.api.types.is_datetime64_any_dtype(fechas.dtype):
+        fechas, _ = convertir_fechas(fechas)
+    return fechas.to_numpy().astype('datetime64[D]').astype('int64')
+
+def fechas_desde_codigos(codigos):
+    """Índice de fechas (a medianoche) a partir de códigos de día."""
+    return pd.DatetimeIndex(pd.to_datetime(np.asarray(codigos, dtype='int64'), unit='D'), name='fecha')
+
+def contar_por_dia(fechas):
+    """
+    Cuenta fechas por día agrupando códigos enteros, sin crear objetos por fila.
+
+    Args:
+        fechas (pd.Series): Fechas como datetime64 o como texto ISO
+
+    Returns:
+        tuple: (códigos de día ordenados, conteos); se omiten las fechas faltantes
+    """
+    dias = codigos_dia(fechas)
+    return np.unique(dias[dias != DIA_NULO], return_counts=True)
+
+def contar_valores(serie, ordenar=True):
+    """
+    value_counts que omite las categorías sin observaciones.
+
+    En columnas categóricas value_counts incluye todas las categorías, también las
+    que no aparecen en la selección (por ejemplo, ciudades sin matches).
+    Con ordenar=False los valores quedan en orden de primera aparición, que es lo
+    que necesitan los conteos por bloque para desempatar al final como value_counts.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.value_counts(sort=ordenar)
+
+    # Contar por códigos y desempatar por primera aparición, igual que con texto
+    codigos = serie.cat.codes.to_numpy()
+    codigos = codigos[codigos >= 0]
+    presentes = pd.unique(codigos)
+    conteos = np.bincount(codigos, minlength=len(serie.cat.categories))[presentes]
+    indice = pd.Index(serie.cat.categories[presentes], name=serie.name)
+    conteos = pd.Series(conteos, index=indice, name='count')
+    return conteos.sort_values(ascending=False, kind='stable') if ordenar else conteos
+
+def _es_denso(ids):
+    """Indica si conviene indexar directamente un arreglo por estos ids."""
+    return len(ids) > 0 and ids.min() >= 0 and ids.max() < FACTOR_DENSIDAD_IDS * len(ids) + 1024
+
+def conteo_por_id(ids, nombre='id_usuario'):
+    """
+    Cuenta ocurrencias de cada id (bincount si los ids son densos).
+
+    Args:
+        ids (np.ndarray): Ids enteros
+        nombre (str): Nombre del índice del resultado
+
+    Returns:
+        pd.Series: Id -> ocurrencias
+    """
+    if not _es_denso(ids):
+        return pd.Series(ids, name=nombre).value_counts()
+    conteos = np.bincount(ids)
+    presentes = np.flatnonzero(conteos)
+    return pd.Series(conteos[presentes], index=pd.Index(presentes, name=nombre), name='count')
+
+def _primera_aparicion(ids, desplazamiento=0, nombre='id_usuario'):
+    """
+    Posición de la primera fila de cada id (arreglo directo si los ids son densos).
+
+    'desplazamiento' se suma a las posiciones: son filas del flujo completo, no del bloque.
+    """
+    if not _es_denso(ids):
+        unicos, primeras = np.unique(ids, return_index=True)
+        return pd.Series(primeras + desplazamiento, index=pd.Index(unicos, name=nombre), name='posicion')
+    # Al asignar en orden inverso, la escritura que queda es la de la primera fila
+    tabla = np.full(ids.max() + 1, -1, dtype='int64')
+    tabla[ids[::-1]] = np.arange(len(ids) - 1, -1, -1)
+    presentes = np.flatnonzero(tabla >= 0)
+    return pd.Series(tabla[presentes] + desplazamiento, index=pd.Index(presentes, name=nombre), name='posicion')
+
+def _minimo_posiciones(acumulado, nuevas):
+    """Une dos series de posiciones quedándose con la menor de cada id."""
+    if acumulado.empty:
+        return nuevas.astype('int64')
+    if nuevas.empty:
+        return acumulado
+    indice = acumulado.index.union(nuevas.index)
+    return np.fmin(acumulado.reindex(indice), nuevas.reindex(indice)).astype('int64')
+
+def construir_indice_usuarios(df_usuarios):
+    """
+    Construye el índice id_usuario -> posición de fila y los códigos de ciudad por fila.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios ya limpio
+
+    Returns:
+        dict: Índice con 'tabla' (arreglo directo por id, o None), 'ids_ordenados' y
+            'posiciones_ordenadas' (búsqueda binaria), 'codigos_ciudad' y 'ciudades'
+    """
+    ids = df_usuarios['id_usuario'].to_numpy(dtype='int64')
+
+    ciudad = df_usuarios['ciudad'] if 'ciudad' in df_usuarios.columns else pd.Series([None] * len(ids))
+    if isinstance(ciudad.dtype, pd.CategoricalDtype):
+        codigos_ciudad = ciudad.cat.codes.to_numpy().astype('int64')
+        ciudades = ciudad.cat.categories
+    else:
+        codigos_ciudad, ciudades = pd.factorize(ciudad)
+
+    indice = {'tabla': None, 'codigos_ciudad': codigos_ciudad, 'ciudades': ciudades}
+    if _es_denso(ids):
+        # Si un id se repite, gana la primera fila (como drop_duplicates)
+        tabla = np.full(ids.max() + 1, -1, dtype='int64')
+        tabla[ids[::-1]] = np.arange(len(ids) - 1, -1, -1)
+        indice['tabla'] = tabla
+    else:
+        orden = np.argsort(ids, kind='stable')
+        indice['ids_ordenados'] = ids[orden]
+        indice['posiciones_ordenadas'] = orden
+    return indice
+
+def posiciones_de(indice, ids):
+    """
+    Devuelve la posición de fila de cada id en df_usuarios (-1 si no existe).
+
+    Args:
+        indice (dict): Índice creado con construir_indice_usuarios
+        ids (array-like): Ids de usuario a buscar
+
+    Returns:
+        np.ndarray: Posiciones de fila
+    """
+    ids = np.asarray(ids, dtype='int64')
+    posiciones = np.full(len(ids), -1, dtype='int64')
+
+    tabla = indice['tabla']
+    if tabla is not None:
+        dentro = (ids >= 0) & (ids < len(tabla))
+        posiciones[dentro] = tabla[ids[dentro]]
+        return posiciones
+
+    ordenados = indice.get('ids_ordenados')
+    if ordenados is None or len(ordenados) == 0:
+        return posiciones
+    lugar = np.minimum(np.searchsorted(ordenados, ids), len(ordenados) - 1)
+    encontrados = ordenados[lugar] == ids
+    posiciones[encontrados] = indice['posiciones_ordenadas'][lugar[encontrados]]
+    return posiciones
+
+def top_k_conteos(conteos, k, desempate=None):
+    """
+    Devuelve los k mayores conteos, ordenados de mayor a menor, en O(N + k log k).
+
+    Selecciona con argpartition en lugar de ordenar la serie completa. Los empates
+    se resuelven por 'desempate' (menor primero) o, si no se indica, por posición en la
+    serie, igual que sort_values(kind='stable').
+
+    Args:
+        conteos (pd.Series): Conteos indexados por etiqueta
+        k (int): Número de elementos a devolver
+        desempate (pd.Series): Clave de desempate por etiqueta (p. ej. la posición de la
+            primera aparición, para ordenar como value_counts); las etiquetas sin clave
+            van después de las demás
+
+    Returns:
+        pd.Series: Los k mayores conteos
+    """
+    valores = conteos.to_numpy()
+    if desempate is None:
+        claves = np.arange(len(valores))
+    else:
+        claves = desempate.reindex(conteos.index).to_numpy(dtype='float64', na_value=np.inf)
+    if k <= 0:
+        return conteos.iloc[:0]
+    if k >= len(valores):
+        return conteos.iloc[np.lexsort((claves, -valores))]
+
+    # Umbral = k-ésimo mayor valor; se toman todos los mayores y los empatados de menor clave
+    umbral = valores[np.argpartition(valores, len(valores) - k)[len(valores) - k]]
+    mayores = np.flatnonzero(valores > umbral)
+    empatados = np.flatnonzero(valores == umbral)
+    faltan = k - len(mayores)
+    if faltan < len(empatados):
+        empatados = empatados[np.argpartition(claves[empatados], faltan - 1)[:faltan]]
+    elegidos = np.concatenate([mayores, empatados])
+    return conteos.iloc[elegidos[np.lexsort((claves[elegidos], -valores[elegidos]))]]
+
+def columna_nombre(df_usuarios):
+    """Devuelve la columna con el nombre visible del usuario ('nombre' o 'nombre_usuario')."""
+    return 'nombre' if 'nombre' in df_usuarios.columns else 'nombre_usuario'
+
+def resolver_nombres(df_usuarios, indice_usuarios, ids):
+    """
+    Obtiene el nombre de cada id de usuario con una sola búsqueda vectorizada.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios
+        indice_usuarios (dict): Índice creado con construir_indice_usuarios
+        ids (array-like): Ids de usuario
+
+    Returns:
+        list: Nombre de cada id, o None si el usuario no existe
+    """
+    posiciones = posiciones_de(indice_usuarios, ids)
+    nombres = df_usuarios[columna_nombre(df_usuarios)].to_numpy(dtype=object)
+    return [nombres[p] if p >= 0 else None for p in posiciones]
+
+def agregar_usuarios(df_usuarios, top_intereses=5):
+    """
+    Calcula las métricas de usuarios en una sola pasada por columna.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios ya limpio
+        top_intereses (int): Número de intereses a incluir en 'top_intereses'
+
+    Returns:
+        dict: Estadísticas de edad, top intereses (individuales), intereses por ciudad,
+            usuarios por ciudad y por género
+    """
+    edades = df_usuarios['edad'].to_numpy()
+    hay_edades = len(edades) > 0
+    resultados = {
+        'edad_promedio': edades.mean(dtype='float64') if hay_edades else np.nan,
+        'edad_mediana': np.median(edades) if hay_edades else np.nan,
+        'edad_min': edades.min() if hay_edades else np.nan,
+        'edad_max': edades.max() if hay_edades else np.nan
+    }
+    # Los intereses se cuentan de forma individual, no por combinación completa
+    incidencia = tokenizar_intereses(df_usuarios['intereses'])
+    resultados['top_intereses'] = conteo_intereses(incidencia).head(top_intereses)
+    resultados['intereses_por_ciudad'] = intereses_por_grupo(incidencia, df_usuarios['ciudad'])
+    resultados['usuarios_por_ciudad'] = contar_valores(df_usuarios['ciudad'])
+    resultados['distribucion_genero'] = contar_valores(df_usuarios['genero'])
+    return resultados
+
+def nuevo_estado(aproximado=False):
+    """
+    Crea un estado de agregación vacío.
+
+    Args:
+        aproximado (bool): Si es True, las interacciones por usuario no se cuentan de
+            forma exacta: se usan sketches de memoria acotada (ver src.sketches) para
+            el ranking de usuarios activos y los usuarios distintos por ciudad y día
+
+    Returns:
+        dict: Contadores de interacciones listos para acumular bloques
+    """
+    estado = {
+        'total_interacciones': 0,
+        'total_matches': 0,
+        'tipos_interaccion': pd.Series(dtype='int64'),
+        'interacciones_por_usuario': pd.Series(dtype='int64'),
+        'primera_interaccion_usuario': pd.Series(dtype='int64'),  # id -> fila de su primera interacción
+        'matches_por_ciudad': pd.Series(dtype='int64'),
+        'actividad_diaria': pd.Series(dtype='int64')
+    }
+    if aproximado:
+        estado['sketches'] = {
+            'usuarios_activos': nuevo_frecuentes(),
+            'usuarios_por_ciudad': {},  # ciudad -> HyperLogLog de id_usuario
+            'usuarios_por_dia': {}      # día (días desde 1970-01-01) -> HyperLogLog de id_usuario
+        }
+    return estado
+
+def sumar_conteos(acumulado, nuevos):
+    """
+    Suma dos series de conteos alineando sus índices (las etiquetas nuevas se agregan).
+
+    Las etiquetas conservan el orden de primera aparición (las de 'acumulado' y luego
+    las nuevas de 'nuevos'), así un sort_values estable desempata igual que value_counts
+    sobre todos los datos juntos.
+
+    Args:
+        acumulado (pd.Series): Conteos acumulados (puede estar vacía)
+        nuevos (pd.Series): Conteos a sumar
+
+    Returns:
+        pd.Series: Conteos int64
+    """
+    if acumulado.empty:
+        return nuevos.astype('int64')
+    # Series.add ordena la unión de índices; se alinea antes para mantener el orden
+    indice = acumulado.index.append(nuevos.index.difference(acumulado.index, sort=False))
+    return acumulado.reindex(indice, fill_value=0).add(
+        nuevos.reindex(indice, fill_value=0)).astype('int64')
+
+def acumular_interacciones(estado, df_bloque, indice_usuarios):
+    """
+    Agrega un bloque de interacciones al estado en una sola pasada.
+
+    Args:
+        estado (dict): Estado creado con nuevo_estado()
+        df_bloque (pd.DataFrame): Bloque de interacciones ya limpio
+        indice_usuarios (dict): Índice creado con construir_indice_usuarios
+
+    Returns:
+        dict: El mismo estado actualizado
+    """
+    es_match = (df_bloque['match'] == True).to_numpy(dtype=bool, na_value=False)
+    ids = df_bloque['id_usuario'].to_numpy(dtype='int64')
+    desplazamiento = estado['total_interacciones']
+
+    estado['total_interacciones'] += len(df_bloque)
+    estado['total_matches'] += int(es_match.sum())
+    estado['tipos_interaccion'] = sumar_conteos(
+        estado['tipos_interaccion'], contar_valores(df_bloque['tipo'], ordenar=False))
+    sketches = estado.get('sketches')
+    if sketches is None:
+        estado['interacciones_por_usuario'] = sumar_conteos(
+            estado['interacciones_por_usuario'], conteo_por_id(ids))
+        # Primera aparición de cada usuario: desempata el ranking igual que value_counts
+        estado['primera_interaccion_usuario'] = _minimo_posiciones(
+            estado['primera_interaccion_usuario'], _primera_aparicion(ids, desplazamiento))
+    else:
+        agregar_conteos_frecuentes(sketches['usuarios_activos'], conteo_por_id(ids))
+
+    # Ciudad de cada interacción por búsqueda en el índice; los usuarios desconocidos
+    # no cuentan (equivale al merge 'inner')
+    posiciones_todas = posiciones_de(indice_usuarios, ids)
+    posiciones = posiciones_todas[es_match]
+    codigos = indice_usuarios['codigos_ciudad'][posiciones[posiciones >= 0]]
+    codigos = codigos[codigos >= 0]
+    ciudades = indice_usuarios['ciudades']
+    conteos = np.bincount(codigos, minlength=len(ciudades))
+    presentes = pd.unique(codigos)
+    # Sin ordenar por conteo: el orden de primera aparición desempata en resultados_interacciones
+    matches_ciudad = pd.Series(conteos[presentes], index=pd.Index(ciudades[presentes], name='ciudad'),
+                               name='count')
+    estado['matches_por_ciudad'] = sumar_conteos(estado['matches_por_ciudad'], matches_ciudad)
+
+    # Interacciones por día: se agrupan códigos de día enteros y solo los días distintos
+    # pasan al índice de fechas (a medianoche)
+    dias = None
+    if 'fecha' in df_bloque.columns:
+        dias = codigos_dia(df_bloque['fecha'])
+        unicos, conteos = np.unique(dias[dias != DIA_NULO], return_counts=True)
+        por_dia = pd.Series(conteos, index=fechas_desde_codigos(unicos), name='count')
+        estado['actividad_diaria'] = sumar_conteos(estado['actividad_diaria'], por_dia)
+
+    if sketches is not None:
+        # Usuarios distintos por ciudad y por día (HyperLogLog por grupo)
+        conocidos = posiciones_todas >= 0
+        codigos_usuario = np.full(len(ids), -1, dtype='int64')
+        codigos_usuario[conocidos] = indice_usuarios['codigos_ciudad'][posiciones_todas[conocidos]]
+        con_ciudad = codigos_usuario >= 0
+        agregar_hll_por_grupo(sketches['usuarios_por_ciudad'],
+                              np.asarray(ciudades)[codigos_usuario[con_ciudad]], ids[con_ciudad])
+        if dias is not None:
+            con_fecha = dias != DIA_NULO
+            agregar_hll_por_grupo(sketches['usuarios_por_dia'], dias[con_fecha], ids[con_fecha])
+    return estado
+
+def combinar_estados(estado_a, estado_b):
+    """
+    Combina dos estados parciales en uno nuevo.
+
+    El orden importa solo para desempatar usuarios activos: el resultado equivale a
+    acumular las interacciones de 'estado_a' y luego las de 'estado_b'.
+
+    Args:
+        estado_a (dict): Primer estado
+        estado_b (dict): Segundo estado (exacto o aproximado, igual que el primero)
+
+    Returns:
+        dict: Estado con los conteos de ambos
+    """
+    combinado = nuevo_estado(aproximado='sketches' in estado_a)
+    for clave in combinado:
+        if clave == 'sketches':
+            a, b = estado_a['sketches'], estado_b['sketches']
+            combinado[clave] = {
+                'usuarios_activos': combinar_frecuentes(a['usuarios_activos'], b['usuarios_activos']),
+                'usuarios_por_ciudad': combinar_hll_por_grupo(a['usuarios_por_ciudad'], b['usuarios_por_ciudad']),
+                'usuarios_por_dia': combinar_hll_por_grupo(a['usuarios_por_dia'], b['usuarios_por_dia'])
+            }
+        elif clave == 'primera_interaccion_usuario':
+            # Las filas del segundo estado van después de todas las del primero
+            combinado[clave] = _minimo_posiciones(
+                estado_a[clave], estado_b[clave] + estado_a['total_interacciones'])
+        elif isinstance(combinado[clave], pd.Series):
+            combinado[clave] = sumar_conteos(estado_a[clave], estado_b[clave])
+        else:
+            combinado[clave] = estado_a[clave] + estado_b[clave]
+    return combinado
+
+def _serie_a_dict(serie):
+    """Convierte una serie de conteos en listas serializables con json."""
+    if isinstance(serie.index, pd.DatetimeIndex):
+        indice, tipo = serie.index.strftime('%Y-%m-%d').tolist(), 'fecha'
+    else:
+        indice, tipo = serie.index.tolist(), 'valor'
+    return {'tipo': tipo, 'nombre': serie.index.name, 'indice': indice,
+            'valores': serie.to_numpy(dtype='int64').tolist()}
+
+def _serie_desde_dict(datos):
+    """Reconstruye una serie de conteos guardada con _serie_a_dict."""
+    if not datos['indice']:
+        return pd.Series(dtype='int64')
+    if datos['tipo'] == 'fecha':
+        indice = pd.DatetimeIndex(pd.to_datetime(datos['indice']), name=datos['nombre'])
+    else:
+        indice = pd.Index(datos['indice'], name=datos['nombre'])
+    return pd.Series(datos['valores'], index=indice, dtype='int64', name='count')
+
+def estado_a_dict(estado):
+    """
+    Convierte un estado de agregación en un diccionario serializable con json.
+
+    Args:
+        estado (dict): Estado creado con nuevo_estado() y acumulado
+
+    Returns:
+        dict: Totales como enteros y series como {'indice': [...], 'valores': [...]}
+    """
+    datos = {clave: _serie_a_dict(valor) if isinstance(valor, pd.Series) else int(valor)
+             for clave, valor in estado.items() if clave != 'sketches'}
+    if 'sketches' in estado:
+        sketches = estado['sketches']
+        datos['sketches'] = {
+            'usuarios_activos': frecuentes_a_dict(sketches['usuarios_activos']),
+            'usuarios_por_ciudad': {ciudad: hll_a_dict(hll) for ciudad, hll in sketches['usuarios_por_ciudad'].items()},
+            'usuarios_por_dia': {str(dia): hll_a_dict(hll) for dia, hll in sketches['usuarios_por_dia'].items()}
+        }
+    return datos
+
+def estado_desde_dict(datos):
+    """
+    Reconstruye un estado guardado con estado_a_dict.
+
+    Las claves que falten (estados guardados por versiones anteriores) quedan vacías.
+
+    Args:
+        datos (dict): Diccionario leído del JSON
+
+    Returns:
+        dict: Estado listo para seguir acumulando o combinar
+    """
+    estado = nuevo_estado(aproximado='sketches' in datos)
+    for clave, valor in estado.items():
+        if clave == 'sketches':
+            sketches = datos['sketches']
+            estado[clave] = {
+                'usuarios_activos': frecuentes_desde_dict(sketches['usuarios_activos']),
+                'usuarios_por_ciudad': {ciudad: hll_desde_dict(hll)
+                                        for ciudad, hll in sketches['usuarios_por_ciudad'].items()},
+                'usuarios_por_dia': {int(dia): hll_desde_dict(hll) for dia, hll in sketches['usuarios_por_dia'].items()}
+            }
+        elif clave in datos:
+            estado[clave] = _serie_desde_dict(datos[clave]) if isinstance(valor, pd.Series) else datos[clave]
+    return estado
+
+def resultados_interacciones(estado, top_k=5):
+    """
+    Convierte un estado de agregación en las métricas de interacciones del análisis.
+
+    Args:
+        estado (dict): Estado acumulado
+        top_k (int): Número de usuarios más activos a incluir
+
+    Returns:
+        dict: Métricas con las mismas claves que usa realizar_analisis
+    """
+    total = estado['total_interacciones']
+    resultados = {
+        'total_interacciones': total,
+        'total_matches': estado['total_matches'],
+        'tasa_match': (estado['total_matches'] / total) * 100 if total else 0.0,
+        'tipos_interaccion': estado['tipos_interaccion'].sort_values(ascending=False, kind='stable'),
+        'usuarios_activos': top_k_conteos(estado['interacciones_por_usuario'], top_k,
+                                          estado['primera_interaccion_usuario']),
+        'matches_por_ciudad': estado['matches_por_ciudad'].sort_values(ascending=False, kind='stable'),
+        'actividad_diaria': estado['actividad_diaria'].sort_index()
+    }
+    if 'sketches' in estado:
+        # Modo aproximado: ranking desde el sketch de frecuentes y usuarios distintos con HyperLogLog
+        sketches = estado['sketches']
+        resultados['usuarios_activos'] = top_frecuentes(sketches['usuarios_activos'], top_k)
+        resultados['error_usuarios_activos'] = error_frecuentes(sketches['usuarios_activos'])
+        resultados['usuarios_distintos_por_ciudad'] = estimar_por_grupo(
+            sketches['usuarios_por_ciudad'], 'ciudad').sort_values(ascending=False, kind='stable')
+        por_dia = estimar_por_grupo(sketches['usuarios_por_dia'], 'fecha').sort_index()
+        por_dia.index = fechas_desde_codigos(por_dia.index)
+        resultados['usuarios_distintos_por_dia'] = por_dia
+    return resultados
+
+def resultados_desde_estado(df_usuarios, estado, top_k=5, indice_usuarios=None):
+    """
+    Combina las métricas de usuarios con un estado de interacciones ya acumulado.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios ya limpio
+        estado (dict): Estado de interacciones (acumulado, combinado o leído de disco)
+        top_k (int): Número de usuarios más activos a incluir
+        indice_usuarios (dict): Índice ya construido (opcional)
+
+    Returns:
+        dict: Resultados con las mismas claves que produce realizar_analisis, más
+            'nombres_usuarios_activos' (nombres alineados con 'usuarios_activos') y
+            'actividad_diaria' (interacciones por día)
+    """
+    if indice_usuarios is None:
+        indice_usuarios = construir_indice_usuarios(df_usuarios)
+    resultados = agregar_usuarios(df_usuarios)
+    resultados.update(resultados_interacciones(estado, top_k))
+    resultados['nombres_usuarios_activos'] = resolver_nombres(
+        df_usuarios, indice_usuarios, resultados['usuarios_activos'].index)
+    return resultados
+
+def agregar_todo(df_usuarios, bloques_interacciones, top_k=5, aproximado=False):
+    """
+    Calcula el diccionario completo de resultados del análisis.
+
+    Recorre una vez los usuarios y una vez cada bloque de interacciones.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios ya limpio
+        bloques_interacciones (iterable): DataFrames de interacciones (uno o varios bloques)
+        top_k (int): Número de usuarios más activos a incluir
+        aproximado (bool): Usar sketches en lugar de conteos exactos por usuario (ver nuevo_estado)
+
+    Returns:
+        dict: Resultados (ver resultados_desde_estado)
+    """
+    indice = construir_indice_usuarios(df_usuarios)
+    estado = nuevo_estado(aproximado)
+    for df_bloque in bloques_interacciones:
+        acumular_interacciones(estado, df_bloque, indice)
+    return resultados_desde_estado(df_usuarios, estado, top_k, indice)
@@ -6,148 +6,226 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Ahora importar los módulos
-from src.preprocesamiento import cargar_datos, manejar_nulos, estandarizar_texto, limpieza_especifica
-from src.visualizacion import (
-    graficar_distribucion_edad,
-    graficar_intereses_populares,
-    graficar_genero_distribucion
+from src.preprocesamiento import (
+    cargar_usuarios,
+    iterar_interacciones,
+    manejar_nulos,
+    estandarizar_texto,
+    reporte_memoria,
+    limpieza_especifica,
+    TAMANO_CHUNK
 )
+from src.cache_datos import cargar_con_cache
+from src.carga_concurrente import cargar_concurrente
+from src.agregacion import agregar_todo, construir_indice_usuarios, resultados_desde_estado
+from src.incremental import actualizar_estado, RUTA_ESTADO
+from src.particiones import agregar_particiones, es_particionada, listar_particiones
+from src.instrumentacion import evento, etapa
 
 # Rutas de los archivos
 USUARIOS_PATH = 'data/usuarios.csv' 
 INTERACCIONES_PATH = 'data/interacciones.json'
 
-def realizar_analisis():
+def _cargar_y_limpiar(ruta_usuarios, ruta_interacciones):
+    """Carga ambos archivos a la vez y limpia los usuarios mientras se leen las interacciones."""
+    datos = cargar_concurrente(
+        {'usuarios': ruta_usuarios, 'interacciones': ruta_interacciones},
+        al_cargar=lambda nombre, df: _limpiar_usuarios(df) if nombre == 'usuarios' else None)
+    return datos['usuarios'], datos['interacciones']
+
+def _limpiar_usuarios(df_usuarios):
+    """Aplica las funciones de limpieza de usuarios usadas por el análisis."""
+    df_usuarios = manejar_nulos(df_usuarios, 'biografia')
+    df_usuarios = estandarizar_texto(df_usuarios, 'intereses')
+    df_usuarios = estandarizar_texto(df_usuarios, 'nombre')
+    return df_usuarios
+
+def realizar_analisis(ruta_usuarios=USUARIOS_PATH, ruta_interacciones=INTERACCIONES_PATH,
+                      tamano_chunk=None, usar_cache=False, combinar=False, top_k=5,
+                      incremental=False, ruta_estado=RUTA_ESTADO, aproximado=False, procesos=None):
     """
     Función principal que realiza el análisis completo de datos de la app tipo Tinder.
     
+    Args:
+        ruta_usuarios (str): Ruta al CSV de usuarios
+        ruta_interacciones (str): Ruta al JSON (o JSON Lines) de interacciones, o un
+            directorio o patrón glob con varias particiones (p. ej. 'data/interacciones/*.jsonl');
+            las particiones se agregan en paralelo (ver particiones.agregar_particiones) y
+            df_combinado y df_interacciones se devuelven como None
+        tamano_chunk (int): Si se indica, las interacciones se procesan por bloques de
+            este tamaño sin cargarlas completas; df_combinado y df_interacciones se
+            devuelven como None
+        usar_cache (bool): Si es True, los datos limpios se leen de la caché en disco
+            (ver cache_datos) cuando los archivos fuente no cambiaron
+        combinar (bool): Si es True, también se construye df_combinado (merge de
+            usuarios e interacciones); si no, se devuelve None en su lugar
+        top_k (int): Número de usuarios en el ranking de más activos
+        incremental (bool): Si es True, solo se agregan las interacciones posteriores a la
+            última ejecución y se suman al estado guardado en 'ruta_estado' (ver
+            incremental.actualizar_estado); df_combinado y df_interacciones se devuelven como None
+        ruta_estado (str): Archivo del estado incremental
+        aproximado (bool): Si es True, el ranking de usuarios activos y los usuarios
+            distintos por ciudad y por día se calculan con sketches de memoria acotada
+            (ver src.sketches) en lugar de un contador exacto por usuario
+        procesos (int): Procesos para agregar las particiones (por defecto uno por núcleo)
+    
     Returns:
         tuple: (df_combinado, df_usuarios, df_interacciones, resultados_analisis)
     """
-    print("=" * 60)
-    print("📊 ANÁLISIS DE DATOS - APP DE CITAS")
-    print("=" * 60)
+    evento('inicio_analisis', "=" * 60 + "\n📊 ANÁLISIS DE DATOS - APP DE CITAS\n" + "=" * 60)
     
     # 1. CARGA Y PREPROCESAMIENTO
-    print("\n🔄 1. Cargando y limpiando datos...")
-    df_usuarios, df_interacciones = cargar_datos(USUARIOS_PATH, INTERACCIONES_PATH)
-    
-    # Aplicar funciones de limpieza
-    df_usuarios = manejar_nulos(df_usuarios, 'biografia')
-    df_usuarios = estandarizar_texto(df_usuarios, 'intereses')
-    df_usuarios = estandarizar_texto(df_usuarios, 'nombre')
-    
-    print(f"   ✓ {len(df_usuarios)} usuarios cargados")
-    print(f"   ✓ {len(df_interacciones)} interacciones cargadas")
+    particiones = listar_particiones(ruta_interacciones) if es_particionada(ruta_interacciones) else None
+    if particiones and incremental:
+        raise ValueError('El modo incremental necesita un único archivo de interacciones')
+    with etapa('carga', "\n🔄 1. Cargando y limpiando datos..."):
+        if particiones or incremental or tamano_chunk:
+            df_usuarios = _limpiar_usuarios(cargar_usuarios(ruta_usuarios))
+            df_interacciones = None
+            evento('usuarios_cargados', f"   ✓ {len(df_usuarios)} usuarios cargados", usuarios=len(df_usuarios))
+            if particiones:
+                evento('modo_interacciones', f"   ✓ Interacciones en {len(particiones)} particiones",
+                       modo='particiones', particiones=len(particiones))
+            elif incremental:
+                evento('modo_interacciones', f"   ✓ Interacciones en modo incremental (estado en '{ruta_estado}')",
+                       modo='incremental', ruta_estado=ruta_estado)
+            else:
+                evento('modo_interacciones',
+                       f"   ✓ Interacciones en modo streaming (bloques de {tamano_chunk} registros)",
+                       modo='streaming', tamano_chunk=tamano_chunk)
+        else:
+            if usar_cache:
+                df_usuarios, df_interacciones = cargar_con_cache(
+                    [ruta_usuarios, ruta_interacciones], _cargar_y_limpiar, 'analisis')
+            else:
+                df_usuarios, df_interacciones = _cargar_y_limpiar(ruta_usuarios, ruta_interacciones)
+            evento('usuarios_cargados', f"   ✓ {len(df_usuarios)} usuarios cargados", usuarios=len(df_usuarios))
+            evento('interacciones_cargadas', f"   ✓ {len(df_interacciones)} interacciones cargadas",
+                   interacciones=len(df_interacciones))
+        
+        # Memoria ocupada con el esquema compacto frente a los tipos por defecto
+        memoria = [reporte_memoria(df) for df in (df_usuarios, df_interacciones) if df is not None]
+        bytes_total = sum(m['bytes'] for m in memoria)
+        ahorro_total = sum(m['ahorro'] for m in memoria)
+        evento('memoria_datos',
+               f"   ✓ Memoria: {bytes_total / 1024:.1f} KB ({ahorro_total / 1024:.1f} KB ahorrados con el esquema de tipos)",
+               bytes=bytes_total, ahorro=ahorro_total)
     
     # 2. COMBINACIÓN DE DATOS
-    print("\n🔗 2. Combinando datos...")
-    df_combinado = pd.merge(df_usuarios, df_interacciones, on='id_usuario', how='inner')
-    print(f"   ✓ {len(df_combinado)} registros combinados")
+    # Las métricas no necesitan el merge: la ciudad de cada interacción se busca en
+    # un índice id_usuario -> fila. El DataFrame combinado solo se arma si se pide.
+    with etapa('combinacion', "\n🔗 2. Combinando datos..."):
+        if combinar and df_interacciones is not None:
+            df_combinado = pd.merge(df_usuarios, df_interacciones, on='id_usuario', how='inner')
+            evento('datos_combinados', f"   ✓ {len(df_combinado)} registros combinados", registros=len(df_combinado))
+        else:
+            df_combinado = None
+            evento('datos_combinados', "   ✓ Índice de ciudades por usuario (sin merge)", registros=None)
     
     # 3. ANÁLISIS ESTADÍSTICO
-    print("\n📈 3. Realizando análisis estadísticos...")
-    
-    resultados = {}
-    
-    # Análisis 1: Estadísticas de edad
-    resultados['edad_promedio'] = df_usuarios['edad'].mean()
-    resultados['edad_mediana'] = df_usuarios['edad'].median()
-    resultados['edad_min'] = df_usuarios['edad'].min()
-    resultados['edad_max'] = df_usuarios['edad'].max()
+    # Una pasada sobre usuarios y una sobre interacciones (o sobre cada bloque)
+    with etapa('estadisticas', "\n📈 3. Realizando análisis estadísticos..."):
+        if incremental:
+            indice = construir_indice_usuarios(df_usuarios)
+            estado, info = actualizar_estado(ruta_interacciones, indice, ruta_estado,
+                                             tamano_chunk=tamano_chunk or TAMANO_CHUNK, aproximado=aproximado)
+            evento('interacciones_nuevas', f"   ✓ {info['nuevas']} interacciones nuevas desde la última ejecución",
+                   nuevas=info['nuevas'])
+            resultados = resultados_desde_estado(df_usuarios, estado, top_k, indice)
+        elif particiones:
+            resultados = agregar_particiones(df_usuarios, particiones, procesos=procesos, top_k=top_k,
+                                             aproximado=aproximado, tamano_chunk=tamano_chunk or TAMANO_CHUNK)
+            evento('particiones_agregadas', f"   ✓ {len(particiones)} particiones agregadas",
+                   particiones=len(particiones))
+        else:
+            if tamano_chunk:
+                bloques = iterar_interacciones(ruta_interacciones, tamano_chunk=tamano_chunk)
+            else:
+                bloques = [df_interacciones]
+            resultados = agregar_todo(df_usuarios, bloques, top_k=top_k, aproximado=aproximado)
+        evento('metricas_analisis', total_interacciones=int(resultados['total_interacciones']),
+               total_matches=int(resultados['total_matches']), tasa_match=float(resultados['tasa_match']))
     
-    print(f"\n   👥 DEMOGRAFÍA:")
-    print(f"      • Edad promedio: {resultados['edad_promedio']:.1f} años")
-    print(f"      • Edad mediana: {resultados['edad_mediana']:.0f} años")
-    print(f"      • Rango de edad: {resultados['edad_min']}-{resultados['edad_max']} años")
+    _imprimir_resultados(resultados)
     
-    # Análisis 2: Intereses más populares
-    resultados['top_intereses'] = df_usuarios['intereses'].value_counts().head(5)
+    evento('fin_analisis', "\n" + "=" * 60 + "\n✅ Análisis completado exitosamente\n" + "=" * 60)
     
-    print(f"\n   ❤️ TOP 5 INTERESES:")
+    return df_combinado, df_usuarios, df_interacciones, resultados
+
+def _imprimir_resultados(resultados):
+    """Muestra en consola el resumen de cada análisis (como un único evento)."""
+    lineas = []
+    lineas.append(f"\n   👥 DEMOGRAFÍA:")
+    lineas.append(f"      • Edad promedio: {resultados['edad_promedio']:.1f} años")
+    lineas.append(f"      • Edad mediana: {resultados['edad_mediana']:.0f} años")
+    lineas.append(f"      • Rango de edad: {resultados['edad_min']}-{resultados['edad_max']} años")
+    
+    lineas.append(f"\n   ❤️ TOP 5 INTERESES:")
     for interes, count in resultados['top_intereses'].items():
-        print(f"      • {interes.capitalize()}: {count} usuarios")
-    
-    # Análisis 3: Tasa de matches
-    total_interacciones = len(df_interacciones)
-    total_matches = df_interacciones['match'].sum()
-    resultados['tasa_match'] = (total_matches / total_interacciones) * 100
+        lineas.append(f"      • {interes.capitalize()}: {count} usuarios")
     
-    print(f"\n   💘 MÉTRICAS DE MATCHES:")
-    print(f"      • Total interacciones: {total_interacciones}")
-    print(f"      • Matches exitosos: {total_matches}")
-    print(f"      • Tasa de éxito: {resultados['tasa_match']:.1f}%")
+    lineas.append(f"\n   💘 MÉTRICAS DE MATCHES:")
+    lineas.append(f"      • Total interacciones: {resultados['total_interacciones']}")
+    lineas.append(f"      • Matches exitosos: {resultados['total_matches']}")
+    lineas.append(f"      • Tasa de éxito: {resultados['tasa_match']:.1f}%")
     
-    # Análisis 4: Distribución por ciudad
-    resultados['usuarios_por_ciudad'] = df_usuarios['ciudad'].value_counts()
-    
-    print(f"\n   🏙️ DISTRIBUCIÓN GEOGRÁFICA:")
+    lineas.append(f"\n   🏙️ DISTRIBUCIÓN GEOGRÁFICA:")
     for ciudad, count in resultados['usuarios_por_ciudad'].items():
-        print(f"      • {ciudad}: {count} usuarios")
-    
-    # Análisis 5: Distribución por género
-    resultados['distribucion_genero'] = df_usuarios['genero'].value_counts()
+        lineas.append(f"      • {ciudad}: {count} usuarios")
     
-    print(f"\n   👫 DISTRIBUCIÓN POR GÉNERO:")
+    lineas.append(f"\n   👫 DISTRIBUCIÓN POR GÉNERO:")
     for genero, count in resultados['distribucion_genero'].items():
         genero_texto = 'Masculino' if genero == 'M' else 'Femenino'
-        print(f"      • {genero_texto}: {count} usuarios")
+        lineas.append(f"      • {genero_texto}: {count} usuarios")
     
-    # Análisis 6: Tipos de interacción
-    resultados['tipos_interaccion'] = df_interacciones['tipo'].value_counts()
-    
-    print(f"\n   🎯 TIPOS DE INTERACCIÓN:")
+    lineas.append(f"\n   🎯 TIPOS DE INTERACCIÓN:")
     for tipo, count in resultados['tipos_interaccion'].items():
-        print(f"      • {tipo.capitalize()}: {count}")
-    
-    # Análisis 7: Usuarios más activos
-    usuarios_activos = df_interacciones['id_usuario'].value_counts().head(5)
-    resultados['usuarios_activos'] = usuarios_activos
-    
-    print(f"\n   🔥 TOP 5 USUARIOS MÁS ACTIVOS:")
-    for id_usuario, count in usuarios_activos.items():
-        usuario = df_usuarios[df_usuarios['id_usuario'] == id_usuario]
-        if not usuario.empty:
-            nombre = usuario['nombre'].values[0]
-            print(f"      • {nombre}: {count} interacciones")
+        lineas.append(f"      • {tipo.capitalize()}: {count}")
+    
+    # Los nombres ya vienen resueltos en bloque por el motor de agregación
+    lineas.append(f"\n   🔥 TOP {len(resultados['usuarios_activos'])} USUARIOS MÁS ACTIVOS:")
+    activos = zip(resultados['usuarios_activos'].items(), resultados['nombres_usuarios_activos'])
+    for (id_usuario, count), nombre in activos:
+        if nombre is not None:
+            lineas.append(f"      • {nombre}: {count} interacciones")
         else:
-            print(f"      • Usuario ID {id_usuario}: {count} interacciones (usuario no encontrado)")
-    
-    # Análisis 8: Matches por ciudad
-    df_matches = df_combinado[df_combinado['match'] == True]
-    resultados['matches_por_ciudad'] = df_matches['ciudad'].value_counts()
+            lineas.append(f"      • Usuario ID {id_usuario}: {count} interacciones (usuario no encontrado)")
+    if 'error_usuarios_activos' in resultados:
+        lineas.append(f"      (aproximado: a cada conteo le pueden faltar hasta {resultados['error_usuarios_activos']:.0f} interacciones)")
     
-    print(f"\n   💑 MATCHES POR CIUDAD:")
+    lineas.append(f"\n   💑 MATCHES POR CIUDAD:")
     for ciudad, count in resultados['matches_por_ciudad'].items():
-        print(f"      • {ciudad}: {count} matches")
+        lineas.append(f"      • {ciudad}: {count} matches")
     
-    print("\n" + "=" * 60)
-    print("✅ Análisis completado exitosamente")
-    print("=" * 60)
+    if 'usuarios_distintos_por_ciudad' in resultados:
+        lineas.append(f"\n   🧮 USUARIOS DISTINTOS CON INTERACCIONES (aprox.):")
+        for ciudad, count in resultados['usuarios_distintos_por_ciudad'].items():
+            lineas.append(f"      • {ciudad}: ~{count} usuarios")
+        por_dia = resultados['usuarios_distintos_por_dia']
+        if not por_dia.empty:
+            lineas.append(f"      • Promedio diario: ~{por_dia.mean():.1f} usuarios en {len(por_dia)} días")
     
-    return df_combinado, df_usuarios, df_interacciones, resultados
+    evento('resumen_resultados', '\n'.join(lineas))
 
-def generar_tablas_html(df_usuarios, df_interacciones, resultados):
+def calcular_tablas(df_usuarios, df_interacciones, resultados, filas_usuarios=10):
     """
-    Genera tablas HTML para el reporte.
+    Calcula los DataFrames de las tablas del reporte.
     
     Args:
         df_usuarios: DataFrame de usuarios
-        df_interacciones: DataFrame de interacciones
+        df_interacciones: DataFrame de interacciones (no se usa; los totales salen de 'resultados')
         resultados: Diccionario con resultados del análisis
+        filas_usuarios: Filas de la tabla de usuarios (None para incluirlos todos)
     
     Returns:
-        dict: Diccionario con las tablas en formato HTML
+        dict: Nombre de la tabla -> DataFrame
     """
     tablas = {}
     
     # Tabla 1: Top usuarios por edad
-    df_top_usuarios = df_usuarios[['nombre', 'edad', 'ciudad', 'intereses']].head(10)
-    tablas['top_usuarios'] = df_top_usuarios.to_html(
-        classes='table table-striped table-hover',
-        index=False,
-        border=0
-    )
+    tablas['top_usuarios'] = df_usuarios[['nombre', 'edad', 'ciudad', 'intereses']]
+    if filas_usuarios is not None:
+        tablas['top_usuarios'] = tablas['top_usuarios'].head(filas_usuarios)
     
     # Tabla 2: Estadísticas por ciudad
     stats_ciudad = df_usuarios.groupby('ciudad').agg({
@@ -155,38 +233,47 @@ def generar_tablas_html(df_usuarios, df_interacciones, resultados):
         'edad': 'mean'
     }).round(1)
     stats_ciudad.columns = ['Número de Usuarios', 'Edad Promedio']
-    tablas['stats_ciudad'] = stats_ciudad.to_html(
-        classes='table table-striped table-hover',
-        border=0
-    )
+    tablas['stats_ciudad'] = stats_ciudad
     
     # Tabla 3: Top intereses
-    df_intereses = pd.DataFrame({
+    tablas['top_intereses'] = pd.DataFrame({
         'Interés': resultados['top_intereses'].index,
         'Número de Usuarios': resultados['top_intereses'].values
     })
-    tablas['top_intereses'] = df_intereses.to_html(
-        classes='table table-striped table-hover',
-        index=False,
-        border=0
-    )
     
     # Tabla 4: Resumen de matches
-    df_matches_summary = pd.DataFrame({
+    tablas['matches_summary'] = pd.DataFrame({
         'Métrica': ['Total Interacciones', 'Matches Exitosos', 'Tasa de Éxito'],
         'Valor': [
-            len(df_interacciones),
-            df_interacciones['match'].sum(),
+            resultados['total_interacciones'],
+            resultados['total_matches'],
             f"{resultados['tasa_match']:.1f}%"
         ]
     })
-    tablas['matches_summary'] = df_matches_summary.to_html(
-        classes='table table-striped table-hover',
-        index=False,
-        border=0
-    )
     
     return tablas
 
+def generar_tablas_html(df_usuarios, df_interacciones, resultados):
+    """
+    Genera tablas HTML para el reporte.
+    
+    Args:
+        df_usuarios: DataFrame de usuarios
+        df_interacciones: DataFrame de interacciones
+        resultados: Diccionario con resultados del análisis
+    
+    Returns:
+        dict: Diccionario con las tablas en formato HTML
+    """
+    tablas = {}
+    for nombre, df in calcular_tablas(df_usuarios, df_interacciones, resultados).items():
+        # Solo la tabla por ciudad muestra el índice (la ciudad)
+        tablas[nombre] = df.to_html(
+            classes='table table-striped table-hover',
+            index=(nombre == 'stats_ciudad'),
+            border=0
+        )
+    return tablas
+
 if __name__ == '__main__':
     df_combinado, df_usuarios, df_interacciones, resultados = realizar_analisis()
\ No newline at end of file
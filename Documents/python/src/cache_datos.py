@@ -0,0 +1,288 @@
+"""
+Módulo de caché en disco para los DataFrames ya limpios.
+Guarda el resultado de cargar y limpiar los archivos fuente en formato columnar
+(Feather/Arrow) para que las ejecuciones siguientes lo lean con memory-map en
+lugar de volver a parsear el CSV y el JSON.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from src.preprocesamiento import cargar_datos, limpiar_datos_completo
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow es opcional: sin él se usa pickle
+    pa = None
+    feather = None
+
+# Directorio por defecto de la caché (relativo al directorio de ejecución)
+DIRECTORIO_CACHE = os.path.join('.cache', 'datos')
+
+# Tamaño máximo de la caché antes de desalojar las entradas menos usadas
+TAMANO_MAXIMO_CACHE = 2 * 1024 ** 3
+
+# Cambiar este número invalida todas las entradas existentes (p. ej. si cambia la limpieza)
+VERSION_CACHE = 4
+
+NOMBRE_INDICE = 'indice.json'
+
+def huella_archivo(ruta):
+    """
+    Obtiene los metadatos que identifican rápidamente un archivo fuente.
+
+    Args:
+        ruta (str): Ruta al archivo
+
+    Returns:
+        dict: Ruta absoluta, tamaño en bytes y fecha de modificación (ns)
+    """
+    info = os.stat(ruta)
+    return {
+        'ruta': os.path.abspath(ruta),
+        'tamano': info.st_size,
+        'mtime_ns': info.st_mtime_ns
+    }
+
+def hash_contenido(ruta, tamano_bloque=1 << 20):
+    """
+    Calcula el hash del contenido de un archivo leyéndolo por bloques.
+
+    Args:
+        ruta (str): Ruta al archivo
+        tamano_bloque (int): Bytes leídos en cada iteración
+
+    Returns:
+        str: Hash BLAKE2b en hexadecimal
+    """
+    h = hashlib.blake2b(digest_size=20)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _leer_indice(directorio_cache):
+    """Lee el índice de la caché; si no existe o está dañado devuelve uno vacío."""
+    ruta = os.path.join(directorio_cache, NOMBRE_INDICE)
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _guardar_indice(directorio_cache, indice):
+    """Escribe el índice de forma atómica para no dejarlo a medias."""
+    os.makedirs(directorio_cache, exist_ok=True)
+    ruta = os.path.join(directorio_cache, NOMBRE_INDICE)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, indent=2)
+    os.replace(temporal, ruta)
+
+def _misma_huella(fuente, huella):
+    """Compara ruta, tamaño y mtime sin mirar el contenido."""
+    return all(fuente[campo] == huella[campo] for campo in ('ruta', 'tamano', 'mtime_ns'))
+
+def _clave_entrada(nombre, fuentes):
+    """Calcula la clave de una entrada a partir del nombre, las rutas y los hashes."""
+    h = hashlib.sha256(f'{VERSION_CACHE}|{nombre}'.encode('utf-8'))
+    for fuente in fuentes:
+        h.update(f"|{fuente['ruta']}|{fuente['hash']}".encode('utf-8'))
+    return h.hexdigest()[:32]
+
+def _escribir_df(df, ruta_base):
+    """Guarda un DataFrame en Feather sin compresión (o pickle si falta pyarrow)."""
+    if feather is not None:
+        ruta = ruta_base + '.feather'
+        tabla = pa.Table.from_pandas(df, preserve_index=True)
+        feather.write_feather(tabla, ruta, compression='uncompressed')
+    else:
+        ruta = ruta_base + '.pkl'
+        df.to_pickle(ruta)
+    return ruta
+
+def _leer_df(ruta):
+    """Lee un DataFrame de la caché, usando memory-map cuando es Feather."""
+    if ruta.endswith('.feather'):
+        tabla = feather.read_table(ruta, memory_map=True)
+        return tabla.to_pandas(split_blocks=True)
+    return pd.read_pickle(ruta)
+
+def _eliminar_entrada(directorio_cache, entrada):
+    """Borra del disco los archivos de una entrada."""
+    for archivo in entrada['archivos']:
+        try:
+            os.remove(os.path.join(directorio_cache, archivo))
+        except FileNotFoundError:
+            pass
+
+def podar_cache(directorio_cache=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO_CACHE, indice=None):
+    """
+    Desaloja las entradas menos usadas recientemente hasta respetar el tamaño máximo.
+
+    Args:
+        directorio_cache (str): Directorio de la caché
+        tamano_maximo (int): Tamaño total permitido en bytes
+        indice (dict): Índice ya cargado (opcional)
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    if indice is None:
+        indice = _leer_indice(directorio_cache)
+
+    total = sum(entrada['bytes'] for entrada in indice.values())
+    eliminadas = 0
+    for clave in sorted(indice, key=lambda c: indice[c]['ultimo_acceso']):
+        if total <= tamano_maximo:
+            break
+        entrada = indice.pop(clave)
+        _eliminar_entrada(directorio_cache, entrada)
+        total -= entrada['bytes']
+        eliminadas += 1
+
+    if eliminadas:
+        _guardar_indice(directorio_cache, indice)
+    return eliminadas
+
+def invalidar_cache(directorio_cache=DIRECTORIO_CACHE, ruta_fuente=None, nombre=None):
+    """
+    Elimina entradas de la caché de forma explícita.
+
+    Sin filtros borra todas las entradas. Con 'ruta_fuente' borra las que dependen
+    de ese archivo, y con 'nombre' las generadas por esa carga.
+
+    Args:
+        directorio_cache (str): Directorio de la caché
+        ruta_fuente (str): Archivo fuente cuyas entradas se invalidan
+        nombre (str): Nombre de la carga cuyas entradas se invalidan
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    indice = _leer_indice(directorio_cache)
+    ruta_abs = os.path.abspath(ruta_fuente) if ruta_fuente else None
+
+    claves = []
+    for clave, entrada in indice.items():
+        if nombre is not None and entrada['nombre'] != nombre:
+            continue
+        if ruta_abs is not None and all(f['ruta'] != ruta_abs for f in entrada['fuentes']):
+            continue
+        claves.append(clave)
+
+    for clave in claves:
+        _eliminar_entrada(directorio_cache, indice.pop(clave))
+    if claves:
+        _guardar_indice(directorio_cache, indice)
+    return len(claves)
+
+def cargar_con_cache(rutas_fuente, funcion_carga, nombre, directorio_cache=DIRECTORIO_CACHE,
+                     tamano_maximo=TAMANO_MAXIMO_CACHE):
+    """
+    Devuelve los DataFrames producidos por 'funcion_carga', usando la caché si es posible.
+
+    La búsqueda se hace primero por ruta, tamaño y mtime (sin leer los archivos).
+    Si no coincide, se calcula el hash del contenido: un archivo tocado pero sin
+    cambios reutiliza la entrada existente. Solo si el contenido cambió se vuelve
+    a ejecutar 'funcion_carga'.
+
+    Args:
+        rutas_fuente (list): Rutas de los archivos fuente, en el orden que recibe funcion_carga
+        funcion_carga (callable): Función que recibe las rutas y devuelve una tupla de DataFrames
+        nombre (str): Identificador de la carga (distingue limpiezas distintas de los mismos archivos)
+        directorio_cache (str): Directorio de la caché
+        tamano_maximo (int): Tamaño total permitido en bytes
+
+    Returns:
+        tuple: DataFrames devueltos por funcion_carga (o leídos de la caché)
+    """
+    huellas = [huella_archivo(ruta) for ruta in rutas_fuente]
+    indice = _leer_indice(directorio_cache)
+
+    # 1. Coincidencia rápida por metadatos
+    clave = None
+    for clave_entrada, entrada in indice.items():
+        if (entrada['nombre'] == nombre and entrada['version'] == VERSION_CACHE
+                and len(entrada['fuentes']) == len(huellas)
+                and all(_misma_huella(f, h) for f, h in zip(entrada['fuentes'], huellas))):
+            clave = clave_entrada
+            break
+
+    # 2. Coincidencia por contenido
+    if clave is None:
+        for huella in huellas:
+            huella['hash'] = hash_contenido(huella['ruta'])
+        clave = _clave_entrada(nombre, huellas)
+        if clave in indice:
+            indice[clave]['fuentes'] = huellas
+        else:
+            clave = None
+
+    if clave is not None:
+        entrada = indice[clave]
+        try:
+            dfs = tuple(_leer_df(os.path.join(directorio_cache, archivo)) for archivo in entrada['archivos'])
+        except (OSError, ValueError):
+            # Archivos borrados o dañados: se descarta la entrada y se regenera
+            _eliminar_entrada(directorio_cache, indice.pop(clave))
+        else:
+            entrada['ultimo_acceso'] = time.time()
+            _guardar_indice(directorio_cache, indice)
+            return dfs
+
+    # 3. Fallo de caché: cargar, limpiar y guardar
+    dfs = tuple(funcion_carga(*rutas_fuente))
+    for huella in huellas:
+        huella.setdefault('hash', hash_contenido(huella['ruta']))
+    clave = _clave_entrada(nombre, huellas)
+
+    # Las entradas anteriores de la misma carga sobre las mismas rutas ya no sirven
+    rutas = [huella['ruta'] for huella in huellas]
+    for clave_vieja in [c for c, e in indice.items()
+                        if e['nombre'] == nombre and [f['ruta'] for f in e['fuentes']] == rutas]:
+        _eliminar_entrada(directorio_cache, indice.pop(clave_vieja))
+
+    os.makedirs(directorio_cache, exist_ok=True)
+    archivos = []
+    for i, df in enumerate(dfs):
+        ruta = _escribir_df(df, os.path.join(directorio_cache, f'{clave}_{i}'))
+        archivos.append(os.path.basename(ruta))
+
+    indice[clave] = {
+        'nombre': nombre,
+        'version': VERSION_CACHE,
+        'fuentes': huellas,
+        'archivos': archivos,
+        'bytes': sum(os.path.getsize(os.path.join(directorio_cache, a)) for a in archivos),
+        'ultimo_acceso': time.time()
+    }
+    _guardar_indice(directorio_cache, indice)
+    podar_cache(directorio_cache, tamano_maximo, indice)
+    return dfs
+
+def _cargar_y_limpiar_completo(ruta_usuarios, ruta_interacciones):
+    """Carga ambos archivos y aplica limpiar_datos_completo."""
+    return limpiar_datos_completo(*cargar_datos(ruta_usuarios, ruta_interacciones))
+
+def cargar_datos_limpios(ruta_usuarios, ruta_interacciones, directorio_cache=DIRECTORIO_CACHE,
+                         tamano_maximo=TAMANO_MAXIMO_CACHE):
+    """
+    Equivalente a cargar_datos + limpiar_datos_completo, pasando por la caché.
+    
+    Args:
+        ruta_usuarios (str): Ruta al CSV de usuarios
+        ruta_interacciones (str): Ruta al JSON de interacciones
+        directorio_cache (str): Directorio de la caché
+        tamano_maximo (int): Tamaño total permitido en bytes
+    
+    Returns:
+        tuple: (df_usuarios_limpio, df_interacciones_limpio)
+    """
+    return cargar_con_cache([ruta_usuarios, ruta_interacciones], _cargar_y_limpiar_completo,
+                            'limpiar_datos_completo', directorio_cache, tamano_maximo)
@@ -0,0 +1,121 @@
+"""
+Módulo de caché de gráficos para el reporte.
+Cada gráfico se identifica por el hash de su resumen (los datos ya agregados que
+recibe su función de dibujo) y de los parámetros de estilo. Si los datos no
+cambiaron, la imagen se lee del disco en lugar de volver a dibujarse.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# Directorio por defecto de la caché de gráficos
+DIRECTORIO_CACHE_GRAFICOS = os.path.join('.cache', 'graficos')
+
+# Tamaño máximo de la caché antes de desalojar las imágenes menos usadas
+TAMANO_MAXIMO_GRAFICOS = 256 * 1024 ** 2
+
+def _actualizar_hash(h, valor):
+    """Agrega al hash una representación canónica del valor (recursiva)."""
+    if isinstance(valor, dict):
+        h.update(b'dict')
+        for clave in sorted(valor, key=str):
+            h.update(str(clave).encode('utf-8'))
+            _actualizar_hash(h, valor[clave])
+    elif isinstance(valor, (list, tuple)):
+        h.update(f'seq{len(valor)}'.encode('utf-8'))
+        for elemento in valor:
+            _actualizar_hash(h, elemento)
+    elif isinstance(valor, pd.Series):
+        h.update(f'serie|{valor.name}|{valor.dtype}|{valor.index.name}'.encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, np.ndarray):
+        h.update(f'arreglo|{valor.dtype}|{valor.shape}'.encode('utf-8'))
+        h.update(np.ascontiguousarray(valor).tobytes())
+    else:
+        h.update(f'{type(valor).__name__}|{valor!r}'.encode('utf-8'))
+
+def clave_grafico(nombre, resumen, estilo):
+    """
+    Calcula la clave de un gráfico a partir de su resumen y su estilo.
+
+    Args:
+        nombre (str): Nombre de la función de dibujo
+        resumen: Datos agregados que recibe la función de dibujo
+        estilo (dict): Parámetros de estilo (dpi, formato, tamaño de fuente, versión, ...)
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    h = hashlib.sha256(nombre.encode('utf-8'))
+    _actualizar_hash(h, estilo)
+    _actualizar_hash(h, resumen)
+    return h.hexdigest()
+
+def _ruta(directorio, clave, formato):
+    return os.path.join(directorio, f'{clave}.{formato}')
+
+def leer_grafico(clave, formato='png', directorio=DIRECTORIO_CACHE_GRAFICOS):
+    """
+    Lee una imagen de la caché y la marca como usada recientemente.
+
+    Returns:
+        bytes: Contenido de la imagen, o None si no está en la caché
+    """
+    ruta = _ruta(directorio, clave, formato)
+    try:
+        with open(ruta, 'rb') as f:
+            contenido = f.read()
+    except FileNotFoundError:
+        return None
+    os.utime(ruta)  # La fecha de modificación hace de "último uso" para el LRU
+    return contenido
+
+def guardar_grafico(clave, contenido, formato='png', directorio=DIRECTORIO_CACHE_GRAFICOS,
+                    tamano_maximo=TAMANO_MAXIMO_GRAFICOS):
+    """
+    Guarda una imagen en la caché y desaloja las menos usadas si se supera el tamaño máximo.
+
+    Args:
+        clave (str): Clave calculada con clave_grafico
+        contenido (bytes): Imagen codificada (PNG o SVG)
+        formato (str): Extensión del archivo
+        directorio (str): Directorio de la caché
+        tamano_maximo (int): Tamaño total permitido en bytes
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta(directorio, clave, formato)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(contenido)
+    os.replace(temporal, ruta)
+    podar_directorio(directorio, tamano_maximo)
+
+def podar_directorio(directorio=DIRECTORIO_CACHE_GRAFICOS, tamano_maximo=TAMANO_MAXIMO_GRAFICOS):
+    """
+    Elimina las imágenes usadas hace más tiempo hasta respetar el tamaño máximo (LRU).
+
+    Returns:
+        int: Número de archivos eliminados
+    """
+    archivos = []
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and not entrada.name.endswith('.tmp'):
+                info = entrada.stat()
+                archivos.append((info.st_mtime, info.st_size, entrada.path))
+
+    total = sum(tamano for _, tamano, _ in archivos)
+    eliminados = 0
+    for _, tamano, ruta in sorted(archivos):
+        if total <= tamano_maximo:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total -= tamano
+        eliminados += 1
+    return eliminados
@@ -0,0 +1,101 @@
+"""
+Carga concurrente de usuarios, interacciones y publicaciones para la app de citas.
+Cada fuente se lee y se parsea en un hilo propio, coordinados con asyncio: mientras
+un archivo espera al disco (o al almacenamiento de red) los demás avanzan, y cada
+DataFrame se entrega en cuanto está listo, de modo que la etapa siguiente puede
+empezar con la primera fuente sin esperar a las otras.
+
+    datos = cargar_concurrente({'usuarios': 'data/usuarios.csv',
+                                'interacciones': 'data/interacciones.json',
+                                'publicaciones': 'data/publicaciones.json'})
+"""
+
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.preprocesamiento import cargar_usuarios, cargar_interacciones, cargar_publicaciones
+from src.instrumentacion import registrar_etapa, rss_actual
+
+# Fuentes conocidas: nombre -> función que carga la ruta con su esquema de tipos
+CARGADORES = {
+    'usuarios': cargar_usuarios,
+    'interacciones': cargar_interacciones,
+    'publicaciones': cargar_publicaciones
+}
+
+async def iterar_fuentes(rutas, ejecutor=None):
+    """
+    Carga las fuentes a la vez y las entrega en el orden en que terminan.
+
+    La latencia de cada fuente (desde el inicio hasta que su DataFrame está listo) se
+    registra como una etapa con su nombre (ver instrumentacion.registrar_etapa).
+
+    Args:
+        rutas (dict): Nombre de la fuente (ver CARGADORES) -> ruta del archivo
+        ejecutor (ThreadPoolExecutor): Pool de hilos para leer y parsear; por defecto
+            uno con un hilo por fuente
+
+    Yields:
+        tuple: (nombre de la fuente, DataFrame)
+    """
+    desconocidas = set(rutas) - set(CARGADORES)
+    if desconocidas:
+        raise ValueError(f"Fuentes desconocidas: {', '.join(sorted(desconocidas))}")
+
+    loop = asyncio.get_running_loop()
+    propio = ejecutor is None
+    if propio:
+        ejecutor = ThreadPoolExecutor(max_workers=max(len(rutas), 1), thread_name_prefix='carga')
+    inicio = time.perf_counter()
+
+    async def _cargar(nombre, ruta):
+        df = await loop.run_in_executor(ejecutor, CARGADORES[nombre], ruta)
+        return nombre, df, time.perf_counter() - inicio
+
+    try:
+        for tarea in asyncio.as_completed([_cargar(nombre, ruta) for nombre, ruta in rutas.items()]):
+            nombre, df, segundos = await tarea
+            registrar_etapa(nombre, segundos, rss_actual(), fuente=nombre, filas=len(df))
+            yield nombre, df
+    finally:
+        if propio:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+async def cargar_fuentes(rutas, al_cargar=None, ejecutor=None):
+    """
+    Carga las fuentes a la vez y aplica 'al_cargar' a cada una en cuanto está lista.
+
+    Args:
+        rutas (dict): Nombre de la fuente (ver CARGADORES) -> ruta del archivo
+        al_cargar (callable): Función opcional (nombre, df); puede ser una corrutina. Si
+            devuelve algo distinto de None, ese valor reemplaza al DataFrame
+        ejecutor (ThreadPoolExecutor): Pool de hilos (ver iterar_fuentes)
+
+    Returns:
+        dict: Nombre de la fuente -> DataFrame (o el valor devuelto por 'al_cargar')
+    """
+    datos = {}
+    async for nombre, df in iterar_fuentes(rutas, ejecutor):
+        if al_cargar is not None:
+            resultado = al_cargar(nombre, df)
+            if inspect.isawaitable(resultado):
+                resultado = await resultado
+            if resultado is not None:
+                df = resultado
+        datos[nombre] = df
+    return datos
+
+def cargar_concurrente(rutas, al_cargar=None):
+    """
+    Versión síncrona de cargar_fuentes (no usar dentro de un event loop en marcha).
+
+    Args:
+        rutas (dict): Nombre de la fuente (ver CARGADORES) -> ruta del archivo
+        al_cargar (callable): Ver cargar_fuentes
+
+    Returns:
+        dict: Nombre de la fuente -> DataFrame
+    """
+    return asyncio.run(cargar_fuentes(rutas, al_cargar))
@@ -0,0 +1,181 @@
+"""
+Línea de comandos unificada de las herramientas de análisis.
+
+    python src/cli.py analizar [opciones]    # Solo métricas (sin gráficos)
+    python src/cli.py reporte [opciones]     # Reporte HTML completo (ver generar_reporte.py)
+    python src/cli.py validar [opciones]     # Revisa columnas y valores de los datos
+    python src/cli.py consultar [filtros]    # Filtra y agrega interacciones (ver src/consultas.py)
+    python src/cli.py servir [opciones]      # Servicio HTTP con los datos en memoria (ver src/servicio.py)
+
+Cada subcomando importa solo lo que necesita: pandas se carga al ejecutar un
+subcomando (no para mostrar la ayuda) y matplotlib/seaborn solo cuando se dibuja.
+También se aceptan los nombres en inglés (analyze, report, validate, query, serve).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import instrumentacion
+
+# Rutas por defecto (las mismas que src/analisis.py y src/publicaciones.py, sin importarlos)
+USUARIOS_PATH = 'data/usuarios.csv'
+INTERACCIONES_PATH = 'data/interacciones.json'
+PUBLICACIONES_PATH = 'data/publicaciones.json'
+
+def _agregar_opciones_datos(parser):
+    parser.add_argument('--usuarios', default=USUARIOS_PATH, help='CSV de usuarios')
+    parser.add_argument('--interacciones', default=INTERACCIONES_PATH,
+                        help='Archivo de interacciones, o directorio/patrón glob con varias particiones')
+
+def _agregar_opciones_salida(parser):
+    parser.add_argument('--eventos', metavar='RUTA', help='Escribir los eventos como JSON Lines')
+    parser.add_argument('--silencioso', action='store_true', help='No mostrar el progreso en consola')
+
+def comando_analizar(args):
+    """Calcula las métricas del análisis sin dibujar nada."""
+    from src.analisis import realizar_analisis
+
+    _, df_usuarios, _, resultados = realizar_analisis(
+        args.usuarios, args.interacciones, tamano_chunk=args.chunk, top_k=args.top_k,
+        incremental=args.incremental, aproximado=args.aproximado, procesos=args.procesos)
+    if args.json:
+        indicadores = {
+            'total_usuarios': len(df_usuarios),
+            'edad_promedio': float(resultados['edad_promedio']),
+            'total_interacciones': int(resultados['total_interacciones']),
+            'total_matches': int(resultados['total_matches']),
+            'tasa_match': float(resultados['tasa_match']),
+            'usuarios_activos': {str(k): int(v) for k, v in resultados['usuarios_activos'].items()},
+            'matches_por_ciudad': {str(k): int(v) for k, v in resultados['matches_por_ciudad'].items()}
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(indicadores, f, ensure_ascii=False, indent=2)
+        instrumentacion.evento('indicadores_guardados', f"   ✓ Indicadores guardados en '{args.json}'", ruta=args.json)
+    return 0
+
+def comando_validar(args):
+    """Carga los datos y revisa columnas requeridas y valores que no se pudieron convertir."""
+    from src.preprocesamiento import cargar_datos, validar_datos
+
+    with instrumentacion.etapa('validacion', "\n🔎 Validando datos..."):
+        df_usuarios, df_interacciones = cargar_datos(args.usuarios, args.interacciones)
+        validacion = validar_datos(df_usuarios, df_interacciones)
+        for error in validacion['errores']:
+            instrumentacion.evento('error_validacion', f"   ✗ {error}", error=error)
+        nulos = {columna: int(cantidad) for columna, cantidad in df_interacciones.isna().sum().items() if cantidad}
+        for columna, cantidad in nulos.items():
+            instrumentacion.evento('valores_nulos', f"   ⚠️ {cantidad} interacciones sin '{columna}' válido",
+                                   columna=columna, cantidad=cantidad)
+        instrumentacion.evento('resultado_validacion',
+                               f"   ✓ {len(df_usuarios)} usuarios y {len(df_interacciones)} interacciones revisados",
+                               usuarios=len(df_usuarios), interacciones=len(df_interacciones),
+                               errores=len(validacion['errores']), nulos=nulos)
+    return 1 if validacion['errores'] else 0
+
+def comando_consultar(args):
+    """Filtra y agrega interacciones con los índices de src/consultas.py."""
+    from src.preprocesamiento import cargar_datos, limpiar_datos_completo
+    from src.consultas import construir_indices, consultar
+
+    with instrumentacion.etapa('indices', "\n🗂️ Construyendo índices..."):
+        df_usuarios, df_interacciones = limpiar_datos_completo(*cargar_datos(args.usuarios, args.interacciones))
+        indices = construir_indices(df_usuarios, df_interacciones)
+    fecha = (args.desde, args.hasta) if args.desde or args.hasta else None
+    with instrumentacion.etapa('consulta'):
+        resultado = consultar(indices, por=args.por, ciudad=args.ciudad, genero=args.genero, tipo=args.tipo,
+                              edad=tuple(args.edad) if args.edad else None, fecha=fecha)
+    if args.por is None:
+        instrumentacion.evento('resultado_consulta',
+                               f"   ✓ {resultado['interacciones']} interacciones, {resultado['matches']} matches "
+                               f"({resultado['tasa_match']:.2f}%), {resultado['usuarios']} usuarios",
+                               **resultado)
+    else:
+        instrumentacion.evento('resultado_consulta', resultado.to_string(), filas=len(resultado))
+    return 0
+
+def comando_servir(args):
+    """Inicia el servicio HTTP residente del reporte."""
+    from src.servicio import servir
+
+    servir(args.host, args.puerto, args.usuarios, args.interacciones, ruta_publicaciones=args.publicaciones)
+    return 0
+
+def crear_parser():
+    """Construye el parser con los subcomandos."""
+    parser = argparse.ArgumentParser(description='Herramientas de análisis de la app de citas.')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    analizar = subcomandos.add_parser('analizar', aliases=['analyze'],
+                                      help='Calcula las métricas (sin gráficos)')
+    _agregar_opciones_datos(analizar)
+    analizar.add_argument('--chunk', type=int, default=None,
+                          help='Procesar las interacciones por bloques de este tamaño')
+    analizar.add_argument('--top-k', type=int, default=5, help='Usuarios en el ranking de más activos')
+    analizar.add_argument('--incremental', action='store_true',
+                          help='Agregar solo las interacciones nuevas desde la ejecución anterior')
+    analizar.add_argument('--aproximado', action='store_true',
+                          help='Ranking y usuarios distintos con sketches de memoria acotada')
+    analizar.add_argument('--procesos', type=int, default=None, help='Procesos para las particiones')
+    analizar.add_argument('--json', metavar='RUTA', help='Guardar los indicadores principales en JSON')
+    _agregar_opciones_salida(analizar)
+    analizar.set_defaults(funcion=comando_analizar)
+
+    # Las opciones del reporte son las de generar_reporte.py (se le pasan tal cual)
+    reporte = subcomandos.add_parser('reporte', aliases=['report'], add_help=False,
+                                     help='Genera reporte.html (opciones: reporte --help)')
+    reporte.set_defaults(funcion=None)
+
+    consulta = subcomandos.add_parser('consultar', aliases=['query'],
+                                      help='Filtra y agrega interacciones por ciudad, género, tipo, edad y fecha')
+    _agregar_opciones_datos(consulta)
+    consulta.add_argument('--ciudad', nargs='+', help='Una o varias ciudades (sin distinguir mayúsculas ni tildes)')
+    consulta.add_argument('--genero', nargs='+', help='Uno o varios géneros')
+    consulta.add_argument('--tipo', nargs='+', help='Uno o varios tipos de interacción')
+    consulta.add_argument('--edad', nargs=2, type=int, metavar=('MIN', 'MAX'), help='Rango de edades (inclusivo)')
+    consulta.add_argument('--desde', help='Primer día (AAAA-MM-DD)')
+    consulta.add_argument('--hasta', help='Último día (AAAA-MM-DD)')
+    consulta.add_argument('--por', choices=['ciudad', 'genero', 'tipo', 'edad', 'dia'],
+                          help='Agrupar el resultado por esta dimensión')
+    _agregar_opciones_salida(consulta)
+    consulta.set_defaults(funcion=comando_consultar)
+
+    servicio = subcomandos.add_parser('servir', aliases=['serve'],
+                                      help='Sirve el reporte, los gráficos y los indicadores por HTTP')
+    _agregar_opciones_datos(servicio)
+    servicio.add_argument('--host', default='127.0.0.1', help='Dirección en la que escuchar')
+    servicio.add_argument('--puerto', type=int, default=8000, help='Puerto HTTP')
+    servicio.add_argument('--publicaciones', default=PUBLICACIONES_PATH,
+                          help='Archivo de publicaciones de voz (la sección se omite si no existe)')
+    _agregar_opciones_salida(servicio)
+    servicio.set_defaults(funcion=comando_servir)
+
+    validar = subcomandos.add_parser('validar', aliases=['validate'], help='Valida los archivos de datos')
+    _agregar_opciones_datos(validar)
+    _agregar_opciones_salida(validar)
+    validar.set_defaults(funcion=comando_validar)
+    return parser
+
+def main(argv=None):
+    """Punto de entrada: devuelve el código de salida del subcomando."""
+    parser = crear_parser()
+    args, resto = parser.parse_known_args(argv)
+    if args.funcion is None:
+        from src.generar_reporte import main as generar_reporte
+        generar_reporte(resto)
+        return 0
+    if resto:
+        parser.error(f"argumentos no reconocidos: {' '.join(resto)}")
+
+    instrumentacion.configurar(consola=not args.silencioso, eventos=args.eventos)
+    try:
+        return args.funcion(args)
+    finally:
+        instrumentacion.finalizar()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Módulo de consultas sobre usuarios e interacciones para la app de citas.
+Construye una vez índices por dimensión (ciudad, género, tipo, edad y día) sobre
+los DataFrames limpios y responde filtros + agregados sin recorrer todas las filas:
+el filtro más selectivo da las filas candidatas y los demás se comprueban solo
+sobre ellas.
+
+    indices = construir_indices(df_usuarios, df_interacciones)
+    consultar(indices, ciudad='Cali', tipo='superlike', fecha=('2025-10-01', '2025-10-07'))
+    consultar(indices, edad=(25, 30), por='dia')
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.agregacion import codigos_dia, construir_indice_usuarios, fechas_desde_codigos, posiciones_de, DIA_NULO
+from src.preprocesamiento import normalizar_serie
+
+# Dimensiones indexadas: las de texto se comparan sin mayúsculas ni tildes y
+# 'edad' y 'dia' admiten rangos (ver filtrar)
+DIMENSIONES_TEXTO = ('ciudad', 'genero', 'tipo')
+DIMENSIONES_RANGO = ('edad', 'dia')
+
+# Normalización con la que se comparan los valores de las dimensiones de texto
+REGLA_BUSQUEDA = {'caso': 'minusculas', 'sin_acentos': True}
+
+def _tipo_posiciones(n):
+    """Entero más pequeño que puede guardar posiciones de fila en [0, n)."""
+    return 'int32' if n < np.iinfo('int32').max else 'int64'
+
+def _codigos_compactos(codigos, cardinalidad):
+    """Reduce los códigos (-1 = sin valor) al entero más pequeño que los contiene."""
+    for tipo in ('int8', 'int16', 'int32'):
+        if cardinalidad < np.iinfo(tipo).max:
+            return codigos.astype(tipo)
+    return codigos.astype('int64')
+
+def _indice_cubetas(codigos, cardinalidad):
+    """
+    Ordena las filas por código: las filas con el código c son orden[limites[c + 1]:limites[c + 2]].
+
+    La cubeta 0 guarda las filas sin valor (código -1), que ningún filtro selecciona.
+    Dentro de cada cubeta las filas quedan en su orden original.
+    """
+    conteos = np.bincount(codigos.astype('int64') + 1, minlength=cardinalidad + 1)
+    limites = np.concatenate(([0], np.cumsum(conteos)))
+    orden = np.argsort(codigos, kind='stable').astype(_tipo_posiciones(len(codigos)))
+    return {'orden': orden, 'limites': limites}
+
+def _dimension_texto(serie_usuarios, posiciones):
+    """Códigos por interacción de una columna de texto de usuarios (o de interacciones)."""
+    if isinstance(serie_usuarios.dtype, pd.CategoricalDtype):
+        codigos, categorias = serie_usuarios.cat.codes.to_numpy().astype('int64'), serie_usuarios.cat.categories
+    else:
+        codigos, categorias = pd.factorize(serie_usuarios)
+    if posiciones is not None:
+        # Columna de usuarios: cada interacción toma el código de su usuario
+        codigos = np.where(posiciones >= 0, codigos[np.maximum(posiciones, 0)], -1)
+    claves = normalizar_serie(pd.Series(np.asarray(categorias, dtype=object)), REGLA_BUSQUEDA).to_numpy()
+    return codigos, {'etiquetas': pd.Index(categorias), 'claves': claves}
+
+def construir_indices(df_usuarios, df_interacciones):
+    """
+    Construye los índices de consulta sobre los DataFrames limpios.
+
+    Cada dimensión guarda un código compacto por interacción y las filas ordenadas
+    por ese código, de modo que un valor (o un rango de edades o días) es un tramo
+    contiguo del orden. Cuesta unos 4-8 bytes por interacción y dimensión.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios ya limpio
+        df_interacciones (pd.DataFrame): DataFrame de interacciones ya limpio
+
+    Returns:
+        dict: Índices con 'n', 'codigos_usuario', 'match' y una entrada por dimensión
+    """
+    ids = df_interacciones['id_usuario'].to_numpy(dtype='int64')
+    posiciones = posiciones_de(construir_indice_usuarios(df_usuarios), ids)
+    # Usuarios como códigos 0..k-1: contar distintos es marcar una tabla de k posiciones
+    codigos_usuario, usuarios = pd.factorize(ids)
+    indices = {
+        'n': len(df_interacciones),
+        'codigos_usuario': codigos_usuario.astype(_tipo_posiciones(len(usuarios))),
+        'total_usuarios': len(usuarios),
+        'match': (df_interacciones['match'] == True).to_numpy(dtype=bool, na_value=False),
+        'dimensiones': {}
+    }
+
+    fuentes = {'ciudad': (df_usuarios, posiciones), 'genero': (df_usuarios, posiciones),
+               'tipo': (df_interacciones, None)}
+    for dimension in DIMENSIONES_TEXTO:
+        df, pos = fuentes[dimension]
+        if dimension not in df.columns:
+            continue
+        codigos, descripcion = _dimension_texto(df[dimension], pos)
+        indices['dimensiones'][dimension] = dict(descripcion, minimo=0, codigos=codigos)
+
+    # Edad y día se guardan desplazados por su mínimo, así que los códigos son contiguos
+    if 'edad' in df_usuarios.columns:
+        edades = pd.to_numeric(df_usuarios['edad'], errors='coerce').to_numpy(dtype='float64')
+        edad = np.where(posiciones >= 0, edades[np.maximum(posiciones, 0)], np.nan)
+        validas = ~np.isnan(edad)
+        minimo = int(edad[validas].min()) if validas.any() else 0
+        codigos = np.where(validas, np.nan_to_num(edad) - minimo, -1).astype('int64')
+        indices['dimensiones']['edad'] = {'minimo': minimo, 'codigos': codigos}
+    if 'fecha' in df_interacciones.columns:
+        dias = codigos_dia(df_interacciones['fecha'])
+        validos = dias != DIA_NULO
+        minimo = int(dias[validos].min()) if validos.any() else 0
+        codigos = np.where(validos, dias - minimo, -1)
+        indices['dimensiones']['dia'] = {'minimo': minimo, 'codigos': codigos}
+
+    for dimension in indices['dimensiones'].values():
+        codigos = dimension['codigos']
+        cardinalidad = int(codigos.max()) + 1 if len(codigos) else 0
+        if 'etiquetas' in dimension:
+            cardinalidad = len(dimension['etiquetas'])
+        dimension['cardinalidad'] = cardinalidad
+        dimension['codigos'] = _codigos_compactos(codigos, cardinalidad)
+        dimension.update(_indice_cubetas(dimension['codigos'], cardinalidad))
+    return indices
+
+def _codigos_texto(dimension, valores):
+    """Códigos de las categorías que coinciden (sin mayúsculas ni tildes) con los valores pedidos."""
+    if isinstance(valores, str) or not np.iterable(valores):
+        valores = [valores]
+    buscados = set(normalizar_serie(pd.Series(list(valores), dtype=object), REGLA_BUSQUEDA))
+    return np.flatnonzero(np.isin(dimension['claves'], list(buscados)))
+
+def _dia(valor):
+    """Código de día (días desde 1970-01-01) de una fecha en texto, Timestamp o date."""
+    return int(pd.Timestamp(valor).to_datetime64().astype('datetime64[D]').astype('int64'))
+
+def _rango(dimension, nombre, valor):
+    """Rango inclusivo [desde, hasta] de códigos para un valor o una tupla (desde, hasta)."""
+    desde, hasta = valor if isinstance(valor, (tuple, list)) else (valor, valor)
+    if nombre == 'dia':
+        desde = _dia(desde) if desde is not None else None
+        hasta = _dia(hasta) if hasta is not None else None
+    desde = 0 if desde is None else max(int(desde) - dimension['minimo'], 0)
+    hasta = dimension['cardinalidad'] - 1 if hasta is None else min(int(hasta) - dimension['minimo'],
+                                                                   dimension['cardinalidad'] - 1)
+    return desde, hasta
+
+def _tramos(dimension, codigos):
+    """Tramos (inicio, fin) del orden que contienen las filas con esos códigos."""
+    limites = dimension['limites']
+    return [(limites[c + 1], limites[c + 2]) for c in codigos if limites[c + 2] > limites[c + 1]]
+
+def filtrar(indices, ciudad=None, genero=None, tipo=None, edad=None, fecha=None):
+    """
+    Devuelve las posiciones de las interacciones que cumplen todos los filtros.
+
+    Los filtros de texto aceptan un valor o una lista y se comparan sin mayúsculas ni
+    tildes. 'edad' acepta un número o una tupla (mínima, máxima) y 'fecha' una fecha o
+    una tupla (desde, hasta); ambos extremos son inclusivos y pueden ser None.
+    El filtro con menos filas se lee de su índice y los demás se comprueban sobre esas
+    filas con los códigos de cada dimensión.
+
+    Args:
+        indices (dict): Índices creados con construir_indices
+        ciudad, genero, tipo: Valores de texto buscados
+        edad: Edad o rango de edades del usuario
+        fecha: Día o rango de días de la interacción
+
+    Returns:
+        np.ndarray: Posiciones de fila en df_interacciones (sin un orden garantizado)
+    """
+    pedidos = {'ciudad': ciudad, 'genero': genero, 'tipo': tipo, 'edad': edad, 'dia': fecha}
+    condiciones = []
+    for nombre, valor in pedidos.items():
+        if valor is None:
+            continue
+        dimension = indices['dimensiones'].get(nombre)
+        if dimension is None:
+            raise ValueError(f"No hay datos para filtrar por '{nombre}'")
+        if nombre in DIMENSIONES_RANGO:
+            desde, hasta = _rango(dimension, nombre, valor)
+            codigos = np.arange(desde, hasta + 1)
+            # Un rango de códigos es un único tramo contiguo del orden
+            limites = dimension['limites']
+            tramos = [(limites[desde + 1], limites[hasta + 2])] if hasta >= desde else []
+        else:
+            codigos = _codigos_texto(dimension, valor)
+            tramos = _tramos(dimension, codigos)
+        filas = sum(fin - inicio for inicio, fin in tramos)
+        condiciones.append((filas, dimension, codigos, tramos))
+
+    tipo_posiciones = _tipo_posiciones(indices['n'])
+    if not condiciones:
+        return np.arange(indices['n'], dtype=tipo_posiciones)
+
+    condiciones.sort(key=lambda condicion: condicion[0])
+    _, dimension, _, tramos = condiciones[0]
+    if not tramos:
+        return np.empty(0, dtype=tipo_posiciones)
+    posiciones = np.concatenate([dimension['orden'][inicio:fin] for inicio, fin in tramos])
+
+    for _, dimension, codigos, _ in condiciones[1:]:
+        # Tabla de códigos permitidos: una búsqueda por fila candidata
+        permitidos = np.zeros(dimension['cardinalidad'] + 1, dtype=bool)
+        permitidos[np.asarray(codigos, dtype='int64') + 1] = True
+        posiciones = posiciones[permitidos[dimension['codigos'][posiciones].astype('int64') + 1]]
+    return posiciones
+
+def _etiquetas(dimension, nombre):
+    """Etiquetas legibles de los códigos de una dimensión (categorías, edades o fechas)."""
+    codigos = np.arange(dimension['cardinalidad'])
+    if nombre == 'dia':
+        return fechas_desde_codigos(codigos + dimension['minimo'])
+    if nombre == 'edad':
+        return pd.Index(codigos + dimension['minimo'], name='edad')
+    return pd.Index(dimension['etiquetas'], name=nombre)
+
+def resumir(indices, posiciones, por=None):
+    """
+    Agrega las interacciones seleccionadas.
+
+    Args:
+        indices (dict): Índices creados con construir_indices
+        posiciones (np.ndarray): Posiciones devueltas por filtrar
+        por (str): Dimensión por la que agrupar ('ciudad', 'genero', 'tipo', 'edad' o 'dia')
+
+    Returns:
+        dict | pd.DataFrame: Sin 'por', un diccionario con 'interacciones', 'matches',
+            'tasa_match' (%) y 'usuarios' (distintos); con 'por', un DataFrame con
+            'interacciones', 'matches' y 'tasa_match' por valor de la dimensión
+    """
+    match = indices['match'][posiciones]
+    if por is None:
+        total = len(posiciones)
+        matches = int(match.sum())
+        vistos = np.zeros(indices['total_usuarios'], dtype=bool)
+        vistos[indices['codigos_usuario'][posiciones]] = True
+        return {
+            'interacciones': total,
+            'matches': matches,
+            'tasa_match': (matches / total) * 100 if total else 0.0,
+            'usuarios': int(vistos.sum())
+        }
+
+    dimension = indices['dimensiones'].get(por)
+    if dimension is None:
+        raise ValueError(f"No hay datos para agrupar por '{por}'")
+    codigos = dimension['codigos'][posiciones].astype('int64') + 1
+    tamano = dimension['cardinalidad'] + 1
+    interacciones = np.bincount(codigos, minlength=tamano)[1:]
+    matches = np.bincount(codigos, weights=match, minlength=tamano)[1:].astype('int64')
+    presentes = interacciones > 0
+    tasa = np.divide(matches * 100.0, interacciones, out=np.zeros(len(interacciones)), where=presentes)
+    tabla = pd.DataFrame({'interacciones': interacciones, 'matches': matches, 'tasa_match': tasa},
+                         index=_etiquetas(dimension, por))
+    return tabla[presentes]
+
+def consultar(indices, por=None, **filtros):
+    """
+    Filtra y agrega en una sola llamada (ver filtrar y resumir).
+
+    Args:
+        indices (dict): Índices creados con construir_indices
+        por (str): Dimensión por la que agrupar, o None para un total
+        **filtros: ciudad, genero, tipo, edad y/o fecha
+
+    Returns:
+        dict | pd.DataFrame: Resultado de resumir
+    """
+    return resumir(indices, filtrar(indices, **filtros), por)
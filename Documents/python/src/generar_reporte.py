@@ -2,63 +2,430 @@
 Script para generar el reporte HTML con visualizaciones y tablas.
 """
 
-from analisis import realizar_analisis, generar_tablas_html
-from visualizacion import (
-    graficar_distribucion_edad,
-    graficar_intereses_populares,
-    graficar_genero_distribucion,
-    graficar_tasa_match,
-    graficar_matches_por_ciudad,
-    graficar_tipos_interaccion,
-    graficar_actividad_temporal
+import sys
+import os
+import json
+import base64
+import argparse
+import pandas as pd
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analisis import realizar_analisis, generar_tablas_html, calcular_tablas, INTERACCIONES_PATH
+from src.tablas import escribir_tablas, FORMATOS_TABLA
+from src.visualizacion import (
+    resumen_distribucion_edad,
+    resumen_intereses_populares,
+    resumenes_desde_resultados,
+    resumen_a_json,
+    iterar_graficos,
+    TIPOS_MIME
 )
+from src.publicaciones import analizar_publicaciones, PUBLICACIONES_PATH
+from src.cache_graficos import DIRECTORIO_CACHE_GRAFICOS
+from src import instrumentacion
+from src.instrumentacion import evento, etapa
 from datetime import datetime
 
-def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados, tablas):
+# Mensaje de progreso de cada gráfico del reporte
+DESCRIPCION_GRAFICOS = {
+    'edad': 'Gráfico de distribución de edad',
+    'intereses': 'Gráfico de intereses populares',
+    'genero': 'Gráfico de distribución por género',
+    'tasa_match': 'Gráfico de tasa de match',
+    'matches_ciudad': 'Gráfico de matches por ciudad',
+    'tipos': 'Gráfico de tipos de interacción',
+    'actividad': 'Gráfico de actividad temporal',
+    'publicaciones_ciudad': 'Gráfico de publicaciones por ciudad',
+    'estado_publicaciones': 'Gráfico de estado de publicaciones',
+    'duracion_estado': 'Gráfico de duración por estado'
+}
+
+# Texto alternativo de cada gráfico
+TEXTO_ALTERNATIVO = {
+    'edad': 'Distribución de Edad',
+    'intereses': 'Intereses Populares',
+    'genero': 'Distribución Género',
+    'tasa_match': 'Tasa de Match',
+    'matches_ciudad': 'Matches por Ciudad',
+    'tipos': 'Tipos de Interacción',
+    'actividad': 'Actividad Temporal',
+    'publicaciones_ciudad': 'Publicaciones por Ciudad',
+    'estado_publicaciones': 'Estado de Publicaciones',
+    'duracion_estado': 'Duración por Estado'
+}
+
+# Modos de salida de los gráficos:
+#   'incrustado': imágenes en base64 dentro del HTML (un único archivo autocontenido)
+#   'archivos': una imagen por gráfico en 'graficos/', cargadas con loading="lazy"
+#   'json': solo los datos agregados; el navegador dibuja con Chart.js
+MODOS_GRAFICOS = ('incrustado', 'archivos', 'json')
+
+DIRECTORIO_GRAFICOS = 'graficos'
+
+# Dibujo en el navegador (modo 'json'): cada <canvas data-grafico="clave"> se dibuja
+# con los datos de #datos-graficos cuando entra en pantalla
+SCRIPT_GRAFICOS_CLIENTE = """
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"></script>
+    <script>
+        (function() {
+            const datos = JSON.parse(document.getElementById('datos-graficos').textContent);
+            const colores = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8', '#FFD700'];
+            const barras = (s, etiqueta) => ({
+                type: 'bar',
+                data: {labels: s.etiquetas, datasets: [{label: etiqueta, data: s.valores, backgroundColor: colores}]}
+            });
+            const torta = (etiquetas, valores) => ({
+                type: 'pie',
+                data: {labels: etiquetas, datasets: [{data: valores, backgroundColor: colores}]}
+            });
+            const configuraciones = {
+                edad: d => ({
+                    type: 'bar',
+                    data: {
+                        labels: d.bordes.slice(0, -1).map((b, i) => b.toFixed(1) + '–' + d.bordes[i + 1].toFixed(1)),
+                        datasets: [{label: 'Usuarios (media ' + d.media.toFixed(1) + ' años)', data: d.conteos,
+                                    backgroundColor: '#FF6B6B'}]
+                    }
+                }),
+                intereses: d => Object.assign(barras(d.conteo, 'Usuarios'), {options: {indexAxis: 'y'}}),
+                genero: d => torta(d.etiquetas, d.valores),
+                tasa_match: d => torta(['Matches 💘', 'Sin Match 💔'], [d.matches, d.sin_match]),
+                matches_ciudad: d => barras(d, 'Matches'),
+                tipos: d => barras(d, 'Cantidad'),
+                actividad: d => d && {
+                    type: 'line',
+                    data: {labels: d.etiquetas, datasets: [{label: 'Interacciones', data: d.valores,
+                                                            borderColor: '#4ECDC4'}]}
+                },
+                publicaciones_ciudad: d => barras(d, 'Publicaciones'),
+                estado_publicaciones: d => torta(d.etiquetas, d.valores),
+                duracion_estado: d => barras(d, 'Segundos')
+            };
+            const dibujar = lienzo => {
+                const clave = lienzo.dataset.grafico;
+                const configuracion = configuraciones[clave](datos[clave]);
+                if (configuracion) {
+                    configuracion.options = Object.assign({maintainAspectRatio: false}, configuracion.options);
+                    new Chart(lienzo, configuracion);
+                } else {
+                    lienzo.replaceWith('Datos de fecha no disponibles');
+                }
+            };
+            const lienzos = document.querySelectorAll('canvas[data-grafico]');
+            if (!('IntersectionObserver' in window)) {
+                lienzos.forEach(dibujar);
+                return;
+            }
+            const observador = new IntersectionObserver(entradas => entradas.forEach(entrada => {
+                if (entrada.isIntersecting) {
+                    observador.unobserve(entrada.target);
+                    dibujar(entrada.target);
+                }
+            }), {rootMargin: '200px'});
+            lienzos.forEach(lienzo => observador.observe(lienzo));
+        })();
+    </script>
+"""
+
+def iterar_elementos_graficos(resumenes, modo='incrustado', formato='png', directorio_reporte='.', procesos=None,
+                              directorio_cache=None):
     """
-    Genera el HTML completo del reporte.
+    Produce el elemento HTML de cada gráfico según el modo de salida.
+    
+    El dibujo empieza al llamar a la función (si hay varios procesos); los elementos
+    se entregan en el orden de 'resumenes' a medida que cada gráfico está listo.
+    
+    Args:
+        resumenes: Clave del gráfico -> resumen (ver calcular_resumenes_graficos)
+        modo: Uno de MODOS_GRAFICOS
+        formato: 'png' o 'svg' (no se usa en el modo 'json')
+        directorio_reporte: Directorio donde se guarda el HTML; en el modo 'archivos' las
+            imágenes se escriben en su subdirectorio DIRECTORIO_GRAFICOS
+        procesos: Número de procesos para dibujar los gráficos en paralelo
+        directorio_cache: Directorio de la caché de gráficos (None la desactiva)
+    
+    Returns:
+        iterator: Pares (clave del gráfico, elemento HTML)
+    """
+    if modo not in MODOS_GRAFICOS:
+        raise ValueError(f'Modo de gráficos no soportado: {modo}')
+    
+    if modo == 'json':
+        # No se dibuja nada en el servidor: solo viajan los datos agregados (ver script_graficos)
+        def _lienzos():
+            for clave in resumenes:
+                evento('grafico_listo', f"   ✓ {DESCRIPCION_GRAFICOS[clave]} (datos para el navegador)",
+                       grafico=clave, modo=modo)
+                yield clave, (f'<div class="chart-canvas"><canvas data-grafico="{clave}" '
+                              f'aria-label="{TEXTO_ALTERNATIVO[clave]}" role="img"></canvas></div>')
+        return _lienzos()
+    
+    imagenes = iterar_graficos(
+        resumenes, procesos=procesos, directorio_cache=directorio_cache, formato=formato,
+        al_terminar=lambda clave: evento('grafico_listo', f"   ✓ {DESCRIPCION_GRAFICOS[clave]}",
+                                         grafico=clave, modo=modo))
+    
+    if modo == 'incrustado':
+        return ((clave, f'<img src="data:{TIPOS_MIME[formato]};base64,{imagen}" '
+                        f'alt="{TEXTO_ALTERNATIVO[clave]}" class="chart">')
+                for clave, imagen in imagenes)
+    
+    # Modo 'archivos': una imagen por gráfico, cargada solo cuando se acerca a la pantalla
+    os.makedirs(os.path.join(directorio_reporte, DIRECTORIO_GRAFICOS), exist_ok=True)
+    def _archivos():
+        for clave, imagen in imagenes:
+            ruta_relativa = f'{DIRECTORIO_GRAFICOS}/{clave}.{formato}'
+            with open(os.path.join(directorio_reporte, ruta_relativa), 'wb') as f:
+                f.write(base64.b64decode(imagen))
+            yield clave, (f'<img src="{ruta_relativa}" alt="{TEXTO_ALTERNATIVO[clave]}" '
+                          f'class="chart" loading="lazy" decoding="async">')
+    return _archivos()
+
+def script_graficos(resumenes, modo='incrustado'):
+    """
+    HTML adicional para el final de <body>: en el modo 'json', los datos de los gráficos y
+    el script que los dibuja en el navegador; en los demás modos, nada.
+    """
+    if modo != 'json':
+        return ''
+    datos = json.dumps({clave: resumen_a_json(resumen) for clave, resumen in resumenes.items()},
+                       ensure_ascii=False).replace('</', '<\\/')
+    return f'\n    <script type="application/json" id="datos-graficos">{datos}</script>' + SCRIPT_GRAFICOS_CLIENTE
+
+# Inicialización de DataTables: las tablas con data-url cargan sus filas por AJAX
+# (JSON o NDJSON) y solo crean los nodos de la página visible (deferRender)
+SCRIPT_TABLAS = """    <!-- Script para DataTables -->
+    <script>
+        $(document).ready(function() {
+            $('.table').each(function() {
+                const url = $(this).data('url');
+                const opciones = {
+                    "language": {
+                        "url": "//cdn.datatables.net/plug-ins/1.13.7/i18n/es-ES.json"
+                    },
+                    "pageLength": 10,
+                    "order": []
+                };
+                if (url) {
+                    opciones.deferRender = true;
+                    opciones.ajax = url.endsWith('.ndjson')
+                        ? {url: url, dataType: 'text',
+                           dataSrc: texto => texto.split('\\n').filter(linea => linea).map(linea => JSON.parse(linea))}
+                        : {url: url, dataSrc: 'data'};
+                }
+                $(this).DataTable(opciones);
+            });
+        });
+    </script>"""
+
+# Modos de las tablas: 'html' incrusta las tablas con to_html; 'json' y 'ndjson'
+# escriben un archivo de datos por tabla en 'tablas/' (ver src.tablas)
+MODOS_TABLAS = ('html',) + FORMATOS_TABLA
+
+def preparar_tablas(df_usuarios, df_interacciones, resultados, modo='html', directorio_reporte='.'):
+    """
+    Produce el HTML de cada tabla según el modo.
+    
+    En los modos de archivo la tabla de usuarios incluye a todos los usuarios (no solo
+    una muestra): las filas viven en el archivo de datos y el navegador solo pinta la
+    página visible.
     
     Args:
         df_usuarios: DataFrame de usuarios
         df_interacciones: DataFrame de interacciones
-        df_combinado: DataFrame combinado
         resultados: Diccionario con resultados del análisis
-        tablas: Diccionario con tablas HTML
+        modo: Uno de MODOS_TABLAS
+        directorio_reporte: Directorio donde se guarda el HTML
     
     Returns:
-        str: Contenido HTML completo
+        dict: Nombre de la tabla -> HTML
+    """
+    if modo not in MODOS_TABLAS:
+        raise ValueError(f'Modo de tablas no soportado: {modo}')
+    if modo == 'html':
+        return generar_tablas_html(df_usuarios, df_interacciones, resultados)
+    tablas_df = calcular_tablas(df_usuarios, df_interacciones, resultados, filas_usuarios=None)
+    return escribir_tablas(tablas_df, directorio_reporte, formato=modo)
+
+def calcular_resumenes_graficos(df_usuarios, df_interacciones, resultados):
     """
+    Calcula los datos ya agregados que necesita cada gráfico del reporte.
     
-    # Generar todas las visualizaciones
-    print("\n📊 Generando visualizaciones...")
+    Los conteos que el análisis ya dejó en 'resultados' (género, matches, tipos,
+    matches por ciudad y actividad diaria) se reutilizan; solo se recorren los datos
+    de usuarios para el histograma de edades y los intereses.
     
-    graficos = {}
-    graficos['edad'] = graficar_distribucion_edad(df_usuarios)
-    print("   ✓ Gráfico de distribución de edad")
+    Args:
+        df_usuarios: DataFrame de usuarios
+        df_interacciones: DataFrame de interacciones (puede ser None en modo por bloques)
+        resultados: Diccionario con resultados del análisis
     
-    graficos['intereses'] = graficar_intereses_populares(df_usuarios)
-    print("   ✓ Gráfico de intereses populares")
+    Returns:
+        dict: Clave del gráfico -> resumen (ver visualizacion.DIBUJOS_REPORTE)
+    """
+    reutilizados = resumenes_desde_resultados(resultados)
+    resumenes = {
+        'edad': resumen_distribucion_edad(df_usuarios),
+        'intereses': resumen_intereses_populares(df_usuarios),
+        'genero': reutilizados['genero'],
+        'tasa_match': reutilizados['tasa_match'],
+        'matches_ciudad': reutilizados['matches_ciudad'],
+        'tipos': reutilizados['tipos'],
+        'actividad': reutilizados['actividad']
+    }
+    # Gráficos de la sección de publicaciones (solo si se analizaron publicaciones)
+    for clave in GRAFICOS_PUBLICACIONES:
+        if clave in reutilizados:
+            resumenes[clave] = reutilizados[clave]
+    return resumenes
+
+# Título y descripción de cada gráfico en la sección "Análisis Visual"
+# (la descripción se completa con los resultados del análisis)
+CONTENEDORES_GRAFICOS = {
+    'edad': ('Distribución de Edades',
+             'Este gráfico muestra cómo se distribuyen las edades de los usuarios en la plataforma. \n'
+             '                    La línea punteada indica la edad promedio de {edad_promedio:.1f} años.'),
+    'intereses': ('Intereses Más Populares',
+                  'Los intereses más comunes entre los usuarios, destacando las preferencias principales \n'
+                  '                    de la comunidad de la app.'),
+    'genero': ('Distribución por Género', 'Balance de género en la plataforma.'),
+    'tasa_match': ('Tasa de Éxito de Matches', 'Proporción de interacciones que resultan en match.'),
+    'matches_ciudad': ('Matches por Ciudad',
+                       'Ciudades con mayor actividad de matches, mostrando dónde la app tiene más éxito.'),
+    'tipos': ('Tipos de Interacción',
+              'Distribución de los tipos de interacciones (likes, superlikes, dislikes) en la plataforma.'),
+    'actividad': ('Actividad en el Tiempo',
+                  'Evolución de la actividad de usuarios a lo largo del tiempo, mostrando tendencias y picos de uso.'),
+    'publicaciones_ciudad': ('Publicaciones por Ciudad',
+                             'Publicaciones de voz publicadas según la ciudad de su autor.'),
+    'estado_publicaciones': ('Estado de Publicaciones',
+                             'El {tasa_publicacion:.1f}% de las publicaciones está publicado; el resto son borradores.'),
+    'duracion_estado': ('Duración Promedio por Estado',
+                        'Duración media en segundos de las notas de voz publicadas y de los borradores.')
+}
+
+# Gráficos que se muestran lado a lado (a media anchura) en una misma fila
+FILA_GRAFICOS = ('genero', 'tasa_match')
+
+# Gráficos que van en la sección "Publicaciones de Voz" en lugar de "Análisis Visual"
+GRAFICOS_PUBLICACIONES = ('publicaciones_ciudad', 'estado_publicaciones', 'duracion_estado')
+
+# Título de cada tabla en la sección "Datos Detallados", en orden de aparición
+TITULOS_TABLAS = {
+    'matches_summary': 'Resumen de Matches',
+    'top_intereses': 'Top Intereses',
+    'stats_ciudad': 'Estadísticas por Ciudad',
+    'top_usuarios': 'Muestra de Usuarios'
+}
+
+def _contenedor_grafico(clave, elemento, resultados):
+    """HTML del contenedor de un gráfico (título, imagen o lienzo y descripción)."""
+    titulo, descripcion = CONTENEDORES_GRAFICOS[clave]
+    clase = 'chart-container-half' if clave in FILA_GRAFICOS else 'chart-container'
+    html = f"""
+            <div class="{clase}">
+                <h3 class="chart-title">{titulo}</h3>
+                {elemento}
+                <p class="chart-description">
+                    {descripcion.format(**resultados)}
+                </p>
+            </div>
+"""
+    if clave == FILA_GRAFICOS[0]:
+        html = '\n            <div class="chart-row">' + html
+    elif clave == FILA_GRAFICOS[-1]:
+        html += '            </div>\n'
+    return html
+
+def _seccion_publicaciones(publicaciones, graficos):
+    """
+    Genera la sección "Publicaciones de Voz": indicadores, gráficos y percentiles de duración.
+    
+    Args:
+        publicaciones: Métricas de publicaciones (ver publicaciones.analizar_publicaciones)
+        graficos: Pares (clave del gráfico, elemento HTML) de GRAFICOS_PUBLICACIONES
+    
+    Returns:
+        iterator: Fragmentos de HTML de la sección
+    """
+    relacion = publicaciones['relacion_publicado_borrador']
+    cadencia = publicaciones['publicaciones_por_usuario']
+    yield f"""
+        <!-- Publicaciones de Voz -->
+        <section class="section">
+            <h2 class="section-title">🎙️ Publicaciones de Voz</h2>
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <div class="stat-number">{publicaciones['total_publicaciones']}</div>
+                    <div class="stat-label">Publicaciones Totales</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-number">{publicaciones['tasa_publicacion']:.1f}%</div>
+                    <div class="stat-label">Publicadas</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-number">{'—' if relacion is None else f'{relacion:.1f}'}</div>
+                    <div class="stat-label">Publicadas por Borrador</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-number">{publicaciones['usuarios_que_publican']}</div>
+                    <div class="stat-label">Usuarios que Publican (mediana {cadencia['p50']:.0f} c/u)</div>
+                </div>
+            </div>
+"""
+    for clave, elemento in graficos:
+        yield _contenedor_grafico(clave, elemento, publicaciones)
     
-    graficos['genero'] = graficar_genero_distribucion(df_usuarios)
-    print("   ✓ Gráfico de distribución por género")
+    # Una fila por estado y por ciudad (tabla plana: DataTables no admite celdas combinadas)
+    percentiles = pd.concat({'Estado': publicaciones['duracion_por_estado'],
+                             'Ciudad': publicaciones['duracion_por_ciudad']}, names=['Dimensión', 'Grupo'])
+    percentiles = (percentiles.astype({'publicaciones': 'int64'}).round({'media': 1}).reset_index()
+                   .rename(columns={'publicaciones': 'Publicaciones', 'media': 'Media'}))
+    por_usuario = pd.DataFrame([publicaciones['duracion_por_usuario']], index=['Duración media por usuario'])
+    tags = pd.DataFrame({'Tag': publicaciones['top_tags'].index, 'Publicaciones': publicaciones['top_tags'].values})
+    for titulo, tabla, indice in (('Percentiles de Duración (segundos)', percentiles, False),
+                                  ('Percentiles de Duración por Usuario (segundos)', por_usuario, True),
+                                  ('Tags Más Usados', tags, False)):
+        yield f"""
+            <div class="table-container">
+                <h3 class="table-title">{titulo}</h3>
+                {tabla.to_html(classes='table table-striped table-hover', index=indice, border=0)}
+            </div>
+"""
+    yield """        </section>
+"""
+
+def secciones_reporte(df_usuarios, df_interacciones, resultados, tablas, procesos=None,
+                      directorio_cache_graficos=None, modo_graficos='incrustado', formato_graficos='png',
+                      directorio_reporte='.'):
+    """
+    Genera el HTML del reporte sección por sección.
     
-    graficos['tasa_match'] = graficar_tasa_match(df_interacciones)
-    print("   ✓ Gráfico de tasa de match")
+    Los gráficos se empiezan a dibujar antes de entregar el encabezado, de modo que
+    quien escribe el archivo puede ir volcando el encabezado, los indicadores y los
+    hallazgos mientras el pool de procesos sigue dibujando. Cada gráfico se entrega
+    en cuanto está listo.
     
-    graficos['matches_ciudad'] = graficar_matches_por_ciudad(df_combinado)
-    print("   ✓ Gráfico de matches por ciudad")
+    Args:
+        (ver generar_html_reporte)
     
-    graficos['tipos'] = graficar_tipos_interaccion(df_interacciones)
-    print("   ✓ Gráfico de tipos de interacción")
+    Returns:
+        iterator: Fragmentos de HTML en el orden del documento
+    """
+    # Generar todas las visualizaciones
+    evento('inicio_graficos', "\n📊 Generando visualizaciones...", modo=modo_graficos, formato=formato_graficos)
     
-    graficos['actividad'] = graficar_actividad_temporal(df_interacciones)
-    print("   ✓ Gráfico de actividad temporal")
+    resumenes = calcular_resumenes_graficos(df_usuarios, df_interacciones, resultados)
+    elementos = iterar_elementos_graficos(
+        resumenes, modo=modo_graficos, formato=formato_graficos, directorio_reporte=directorio_reporte,
+        procesos=procesos, directorio_cache=directorio_cache_graficos)
     
     # Fecha actual
     fecha_reporte = datetime.now().strftime("%d/%m/%Y %H:%M")
     
-    # Construir HTML
-    html = f"""
+    yield f"""
 <!DOCTYPE html>
 <html lang="es">
 <head>
@@ -84,7 +451,9 @@ def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados
             <p class="subtitle">Análisis Completo de Usuarios e Interacciones</p>
             <p class="date">Generado el: {fecha_reporte}</p>
         </header>
-
+"""
+    
+    yield f"""
         <!-- Resumen Ejecutivo -->
         <section class="section">
             <h2 class="section-title">📋 Resumen Ejecutivo</h2>
@@ -94,11 +463,11 @@ def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados
                     <div class="stat-label">Usuarios Registrados</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-number">{len(df_interacciones)}</div>
+                    <div class="stat-number">{resultados['total_interacciones']}</div>
                     <div class="stat-label">Interacciones Totales</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-number">{df_interacciones['match'].sum()}</div>
+                    <div class="stat-number">{resultados['total_matches']}</div>
                     <div class="stat-label">Matches Exitosos</div>
                 </div>
                 <div class="stat-card">
@@ -107,7 +476,9 @@ def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados
                 </div>
             </div>
         </section>
-
+"""
+    
+    yield f"""
         <!-- Hallazgos Clave -->
         <section class="section">
             <h2 class="section-title">🔍 Hallazgos Clave</h2>
@@ -146,97 +517,48 @@ def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados
                 </div>
             </div>
         </section>
-
+"""
+    
+    # Visualizaciones: cada gráfico se entrega en cuanto está dibujado
+    yield """
         <!-- Visualizaciones -->
         <section class="section">
             <h2 class="section-title">📊 Análisis Visual</h2>
-            
-            <div class="chart-container">
-                <h3 class="chart-title">Distribución de Edades</h3>
-                <img src="data:image/png;base64,{graficos['edad']}" alt="Distribución de Edad" class="chart">
-                <p class="chart-description">
-                    Este gráfico muestra cómo se distribuyen las edades de los usuarios en la plataforma. 
-                    La línea punteada indica la edad promedio de {resultados['edad_promedio']:.1f} años.
-                </p>
-            </div>
-
-            <div class="chart-container">
-                <h3 class="chart-title">Intereses Más Populares</h3>
-                <img src="data:image/png;base64,{graficos['intereses']}" alt="Intereses Populares" class="chart">
-                <p class="chart-description">
-                    Los intereses más comunes entre los usuarios, destacando las preferencias principales 
-                    de la comunidad de la app.
-                </p>
-            </div>
-
-            <div class="chart-row">
-                <div class="chart-container-half">
-                    <h3 class="chart-title">Distribución por Género</h3>
-                    <img src="data:image/png;base64,{graficos['genero']}" alt="Distribución Género" class="chart">
-                    <p class="chart-description">
-                        Balance de género en la plataforma.
-                    </p>
-                </div>
-
-                <div class="chart-container-half">
-                    <h3 class="chart-title">Tasa de Éxito de Matches</h3>
-                    <img src="data:image/png;base64,{graficos['tasa_match']}" alt="Tasa de Match" class="chart">
-                    <p class="chart-description">
-                        Proporción de interacciones que resultan en match.
-                    </p>
-                </div>
-            </div>
-
-            <div class="chart-container">
-                <h3 class="chart-title">Matches por Ciudad</h3>
-                <img src="data:image/png;base64,{graficos['matches_ciudad']}" alt="Matches por Ciudad" class="chart">
-                <p class="chart-description">
-                    Ciudades con mayor actividad de matches, mostrando dónde la app tiene más éxito.
-                </p>
-            </div>
-
-            <div class="chart-container">
-                <h3 class="chart-title">Tipos de Interacción</h3>
-                <img src="data:image/png;base64,{graficos['tipos']}" alt="Tipos de Interacción" class="chart">
-                <p class="chart-description">
-                    Distribución de los tipos de interacciones (likes, superlikes, dislikes) en la plataforma.
-                </p>
-            </div>
-
-            <div class="chart-container">
-                <h3 class="chart-title">Actividad en el Tiempo</h3>
-                <img src="data:image/png;base64,{graficos['actividad']}" alt="Actividad Temporal" class="chart">
-                <p class="chart-description">
-                    Evolución de la actividad de usuarios a lo largo del tiempo, mostrando tendencias y picos de uso.
-                </p>
-            </div>
-        </section>
-
+"""
+    # Los gráficos de publicaciones se guardan para su propia sección, sin depender de
+    # en qué posición lleguen
+    graficos_publicaciones = {}
+    for clave, elemento in elementos:
+        if clave in GRAFICOS_PUBLICACIONES:
+            graficos_publicaciones[clave] = elemento
+        else:
+            yield _contenedor_grafico(clave, elemento, resultados)
+    yield """        </section>
+"""
+    
+    if 'publicaciones' in resultados:
+        yield from _seccion_publicaciones(
+            resultados['publicaciones'],
+            [(clave, graficos_publicaciones[clave]) for clave in GRAFICOS_PUBLICACIONES
+             if clave in graficos_publicaciones])
+    
+    # Tablas de datos
+    yield """
         <!-- Tablas de Datos -->
         <section class="section">
             <h2 class="section-title">📈 Datos Detallados</h2>
-            
-            <div class="table-container">
-                <h3 class="table-title">Resumen de Matches</h3>
-                {tablas['matches_summary']}
-            </div>
-
-            <div class="table-container">
-                <h3 class="table-title">Top Intereses</h3>
-                {tablas['top_intereses']}
-            </div>
-
-            <div class="table-container">
-                <h3 class="table-title">Estadísticas por Ciudad</h3>
-                {tablas['stats_ciudad']}
-            </div>
-
+"""
+    for nombre, titulo in TITULOS_TABLAS.items():
+        yield f"""
             <div class="table-container">
-                <h3 class="table-title">Muestra de Usuarios</h3>
-                {tablas['top_usuarios']}
+                <h3 class="table-title">{titulo}</h3>
+                {tablas[nombre]}
             </div>
-        </section>
-
+"""
+    yield """        </section>
+"""
+    
+    yield f"""
         <!-- Footer -->
         <footer class="footer">
             <p>Reporte generado automáticamente por el sistema de análisis</p>
@@ -244,52 +566,126 @@ def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados
         </footer>
     </div>
 
-    <!-- Script para DataTables -->
-    <script>
-        $(document).ready(function() {{
-            $('.table').DataTable({{
-                "language": {{
-                    "url": "//cdn.datatables.net/plug-ins/1.13.7/i18n/es-ES.json"
-                }},
-                "pageLength": 10,
-                "order": []
-            }});
-        }});
-    </script>
+{SCRIPT_TABLAS}{script_graficos(resumenes, modo_graficos)}
 </body>
 </html>
 """
-    
-    return html
 
-def main():
-    """Función principal que ejecuta todo el proceso."""
-    print("\n" + "=" * 60)
-    print("🚀 INICIANDO GENERACIÓN DE REPORTE")
-    print("=" * 60)
+def generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados, tablas, procesos=None,
+                         directorio_cache_graficos=None, modo_graficos='incrustado', formato_graficos='png',
+                         directorio_reporte='.'):
+    """
+    Genera el HTML completo del reporte.
     
-    # 1. Realizar análisis
-    df_combinado, df_usuarios, df_interacciones, resultados = realizar_analisis()
+    Para reportes grandes conviene escribir_reporte, que vuelca cada sección al
+    archivo en lugar de armar todo el texto en memoria.
     
-    # 2. Generar tablas HTML
-    print("\n📋 Generando tablas HTML...")
-    tablas = generar_tablas_html(df_usuarios, df_interacciones, resultados)
-    print("   ✓ Tablas generadas")
+    Args:
+        df_usuarios: DataFrame de usuarios
+        df_interacciones: DataFrame de interacciones
+        df_combinado: DataFrame combinado (puede ser None; no se usa para los gráficos)
+        resultados: Diccionario con resultados del análisis
+        tablas: Diccionario con tablas HTML
+        procesos: Número de procesos para dibujar los gráficos en paralelo
+            (None o 1 los dibuja uno tras otro en el proceso actual)
+        directorio_cache_graficos: Directorio de la caché de gráficos (None la desactiva)
+        modo_graficos: 'incrustado', 'archivos' o 'json' (ver MODOS_GRAFICOS)
+        formato_graficos: 'png' o 'svg'
+        directorio_reporte: Directorio donde se guardará el HTML (para el modo 'archivos')
     
-    # 3. Generar HTML completo
-    html_contenido = generar_html_reporte(df_usuarios, df_interacciones, df_combinado, resultados, tablas)
+    Returns:
+        str: Contenido HTML completo
+    """
+    return ''.join(secciones_reporte(
+        df_usuarios, df_interacciones, resultados, tablas, procesos=procesos,
+        directorio_cache_graficos=directorio_cache_graficos, modo_graficos=modo_graficos,
+        formato_graficos=formato_graficos, directorio_reporte=directorio_reporte))
+
+def escribir_reporte(ruta, df_usuarios, df_interacciones, resultados, tablas, **opciones):
+    """
+    Escribe el reporte en disco sección por sección, a medida que cada una está lista.
     
-    # 4. Guardar archivo
-    print("\n💾 Guardando reporte...")
-    with open('reporte.html', 'w', encoding='utf-8') as f:
-        f.write(html_contenido)
+    Args:
+        ruta: Ruta del archivo HTML
+        df_usuarios, df_interacciones, resultados, tablas: Ver generar_html_reporte
+        **opciones: procesos, directorio_cache_graficos, modo_graficos y formato_graficos
     
-    print("   ✓ Reporte guardado como 'reporte.html'")
+    Returns:
+        int: Bytes escritos
+    """
+    directorio_reporte = os.path.dirname(os.path.abspath(ruta))
+    escritos = 0
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for seccion in secciones_reporte(df_usuarios, df_interacciones, resultados, tablas,
+                                         directorio_reporte=directorio_reporte, **opciones):
+            escritos += f.write(seccion)
+            f.flush()  # El lector (o quien sigue el archivo) ve cada sección en cuanto se escribe
+    return escritos
+
+def main(argv=None):
+    """Función principal que ejecuta todo el proceso."""
+    parser = argparse.ArgumentParser(description='Genera el reporte HTML del análisis.')
+    parser.add_argument('--graficos', choices=MODOS_GRAFICOS, default='incrustado',
+                        help='Cómo se incluyen los gráficos en el reporte')
+    parser.add_argument('--formato', choices=sorted(TIPOS_MIME), default='png',
+                        help='Formato de imagen de los gráficos')
+    parser.add_argument('--tablas', choices=MODOS_TABLAS, default='html',
+                        help='Tablas incrustadas en el HTML o cargadas desde archivos JSON/NDJSON')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Agregar solo las interacciones nuevas desde la ejecución anterior')
+    parser.add_argument('--interacciones', default=INTERACCIONES_PATH,
+                        help='Archivo de interacciones, o directorio/patrón glob con varias particiones')
+    parser.add_argument('--publicaciones', default=PUBLICACIONES_PATH,
+                        help='Archivo de publicaciones de voz (la sección se omite si no existe)')
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='Procesos para agregar las particiones (por defecto uno por núcleo)')
+    parser.add_argument('--eventos', metavar='RUTA',
+                        help='Escribir los eventos de progreso y las mediciones como JSON Lines')
+    parser.add_argument('--prometheus', metavar='RUTA',
+                        help='Escribir la duración y la memoria de cada etapa en formato textfile de Prometheus')
+    parser.add_argument('--perfil', metavar='RUTA',
+                        help='Perfilar la ejecución con cProfile y guardar el resultado (.prof)')
+    parser.add_argument('--memoria-python', action='store_true',
+                        help='Medir con tracemalloc el pico de memoria de Python de cada etapa (más lento)')
+    parser.add_argument('--silencioso', action='store_true',
+                        help='No mostrar el progreso en consola')
+    args = parser.parse_args(argv)
     
-    print("\n" + "=" * 60)
-    print("✅ REPORTE GENERADO EXITOSAMENTE")
-    print("=" * 60)
-    print("\n📄 Abre 'reporte.html' en tu navegador para ver el reporte completo.\n")
+    instrumentacion.configurar(consola=not args.silencioso, eventos=args.eventos, prometheus=args.prometheus,
+                               perfil=args.perfil, memoria_python=args.memoria_python)
+    try:
+        with etapa('reporte_completo', "\n" + "=" * 60 + "\n🚀 INICIANDO GENERACIÓN DE REPORTE\n" + "=" * 60):
+            # 1. Realizar análisis
+            # Los datos limpios se reutilizan desde la caché si los archivos no cambiaron;
+            # con --incremental solo se agregan las interacciones nuevas al estado guardado
+            df_combinado, df_usuarios, df_interacciones, resultados = realizar_analisis(
+                ruta_interacciones=args.interacciones, usar_cache=not args.incremental,
+                incremental=args.incremental, procesos=args.procesos)
+            if os.path.exists(args.publicaciones):
+                resultados['publicaciones'] = analizar_publicaciones(df_usuarios, args.publicaciones)
+            
+            # 2. Generar tablas HTML
+            with etapa('tablas', "\n📋 Generando tablas HTML...", modo=args.tablas):
+                tablas = preparar_tablas(df_usuarios, df_interacciones, resultados, modo=args.tablas)
+                evento('tablas_generadas', "   ✓ Tablas generadas", tablas=len(tablas))
+            
+            # 3. Generar y guardar el HTML sección por sección
+            # Los gráficos se dibujan en paralelo, uno por proceso (como máximo uno por gráfico);
+            # los que no cambiaron desde la última ejecución se leen de la caché de gráficos.
+            # Mientras tanto el encabezado y los hallazgos ya se van escribiendo en el archivo.
+            with etapa('escritura', "\n💾 Guardando reporte...") as datos_etapa:
+                procesos = min(os.cpu_count() or 1, len(DESCRIPCION_GRAFICOS))
+                datos_etapa['bytes'] = escribir_reporte(
+                    'reporte.html', df_usuarios, df_interacciones, resultados, tablas,
+                    procesos=procesos,
+                    directorio_cache_graficos=DIRECTORIO_CACHE_GRAFICOS,
+                    modo_graficos=args.graficos, formato_graficos=args.formato)
+                evento('reporte_guardado', "   ✓ Reporte guardado como 'reporte.html'", ruta='reporte.html')
+        
+        evento('fin_reporte', "\n" + "=" * 60 + "\n✅ REPORTE GENERADO EXITOSAMENTE\n" + "=" * 60 +
+               "\n\n📄 Abre 'reporte.html' en tu navegador para ver el reporte completo.\n")
+    finally:
+        instrumentacion.finalizar()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
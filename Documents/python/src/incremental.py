@@ -0,0 +1,207 @@
+"""
+Módulo de análisis incremental para la app de citas.
+El registro de interacciones solo crece por el final. En lugar de recalcular todo en
+cada ejecución, se guarda en disco el estado de agregación (ver agregacion.nuevo_estado)
+junto con una marca de agua: la última (fecha, id_interaccion) agregada. En la
+ejecución siguiente solo se agregan los registros posteriores a la marca y se suman
+al estado guardado. En archivos JSON Lines además se guarda hasta qué byte se leyó,
+de modo que ni siquiera se vuelve a parsear lo ya procesado.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.agregacion import acumular_interacciones, nuevo_estado, estado_a_dict, estado_desde_dict
+from src.preprocesamiento import iterar_interacciones, TAMANO_CHUNK
+
+# Archivo por defecto del estado incremental
+RUTA_ESTADO = os.path.join('.cache', 'estado_incremental.json')
+
+# Cambiar este número descarta los estados guardados (p. ej. si cambia el formato)
+VERSION_ESTADO = 2
+
+def marca_vacia():
+    """Marca de agua inicial: todavía no se agregó ningún registro."""
+    return {'fecha': None, 'id_interaccion': None}
+
+def cargar_estado(ruta_estado=RUTA_ESTADO):
+    """
+    Lee el estado incremental guardado.
+
+    Args:
+        ruta_estado (str): Ruta del archivo JSON del estado
+
+    Returns:
+        dict: Contenido guardado, o None si no existe, está dañado o es de otra versión
+    """
+    try:
+        with open(ruta_estado, 'r', encoding='utf-8') as f:
+            guardado = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if guardado.get('version') != VERSION_ESTADO:
+        return None
+    return guardado
+
+def guardar_estado(estado, marca, fuente, ruta_estado=RUTA_ESTADO):
+    """
+    Escribe el estado incremental de forma atómica.
+
+    Args:
+        estado (dict): Estado de agregación de interacciones
+        marca (dict): Marca de agua ('fecha' en ISO y 'id_interaccion')
+        fuente (dict): Archivo leído: 'ruta' absoluta y 'desplazamiento' (byte hasta el que se leyó)
+        ruta_estado (str): Ruta del archivo JSON del estado
+    """
+    directorio = os.path.dirname(ruta_estado)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = ruta_estado + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION_ESTADO, 'fuente': fuente, 'marca': marca,
+                   'estado': estado_a_dict(estado)}, f)
+    os.replace(temporal, ruta_estado)
+
+def _comparar_con_marca(df_bloque, marca):
+    """Arreglo booleano: True para los registros posteriores a la marca (fecha, id_interaccion)."""
+    n = len(df_bloque)
+    ids = (df_bloque['id_interaccion'] if 'id_interaccion' in df_bloque.columns
+           else pd.Series([pd.NA] * n, index=df_bloque.index, dtype='Int64'))
+    fechas = (df_bloque['fecha'] if 'fecha' in df_bloque.columns
+              else pd.Series(pd.NaT, index=df_bloque.index, dtype='datetime64[ns]'))
+
+    if marca['id_interaccion'] is None:
+        id_posterior = np.ones(n, dtype=bool)
+    else:
+        id_posterior = (ids > marca['id_interaccion']).to_numpy(dtype=bool, na_value=False)
+    if marca['fecha'] is None:
+        return id_posterior
+
+    fecha_marca = pd.Timestamp(marca['fecha'])
+    fecha_posterior = (fechas > fecha_marca).to_numpy(dtype=bool, na_value=False)
+    misma_fecha = (fechas == fecha_marca).to_numpy(dtype=bool, na_value=False)
+    sin_fecha = fechas.isna().to_numpy()
+    # Orden lexicográfico por (fecha, id); los registros sin fecha solo se comparan por id
+    return fecha_posterior | ((misma_fecha | sin_fecha) & id_posterior)
+
+def filtrar_nuevas(df_bloque, marca):
+    """
+    Devuelve solo las interacciones posteriores a la marca de agua.
+
+    Args:
+        df_bloque (pd.DataFrame): Bloque de interacciones
+        marca (dict): Marca de agua actual
+
+    Returns:
+        pd.DataFrame: Registros aún no agregados
+    """
+    if marca['fecha'] is None and marca['id_interaccion'] is None:
+        return df_bloque
+    return df_bloque[_comparar_con_marca(df_bloque, marca)]
+
+def avanzar_marca(marca, df_bloque):
+    """
+    Calcula la nueva marca de agua tras agregar un bloque: el mayor (fecha, id_interaccion).
+
+    Args:
+        marca (dict): Marca de agua actual
+        df_bloque (pd.DataFrame): Registros recién agregados
+
+    Returns:
+        dict: Nueva marca de agua
+    """
+    if df_bloque.empty:
+        return marca
+    nueva = dict(marca)
+    ids = df_bloque['id_interaccion'] if 'id_interaccion' in df_bloque.columns else None
+    fechas = df_bloque['fecha'] if 'fecha' in df_bloque.columns else None
+
+    if fechas is not None and fechas.notna().any():
+        fecha_max = fechas.max()
+        if nueva['fecha'] is None or fecha_max > pd.Timestamp(nueva['fecha']):
+            nueva['fecha'] = fecha_max.isoformat()
+            nueva['id_interaccion'] = None
+        if fecha_max == pd.Timestamp(nueva['fecha']) and ids is not None:
+            id_max = ids[(fechas == fecha_max).to_numpy(dtype=bool, na_value=False)].max()
+            if pd.notna(id_max) and (nueva['id_interaccion'] is None or id_max > nueva['id_interaccion']):
+                nueva['id_interaccion'] = int(id_max)
+    if ids is not None and fechas is not None:
+        # Registros sin fecha: se recuerda el mayor id para no volver a contarlos
+        sin_fecha = fechas.isna().to_numpy()
+        if sin_fecha.any():
+            id_max = ids[sin_fecha].max()
+            if pd.notna(id_max) and (nueva['id_interaccion'] is None or id_max > nueva['id_interaccion']):
+                nueva['id_interaccion'] = int(id_max)
+    elif ids is not None and ids.notna().any():
+        id_max = int(ids.max())
+        if nueva['id_interaccion'] is None or id_max > nueva['id_interaccion']:
+            nueva['id_interaccion'] = id_max
+    return nueva
+
+def _es_jsonl(ruta):
+    return os.path.splitext(ruta)[1].lower() in ('.jsonl', '.ndjson')
+
+def _desplazamiento_valido(ruta, desplazamiento):
+    """Comprueba que el archivo no se haya truncado y que el byte guardado sea un inicio de línea."""
+    if desplazamiento <= 0 or os.path.getsize(ruta) < desplazamiento:
+        return False
+    with open(ruta, 'rb') as f:
+        f.seek(desplazamiento - 1)
+        return f.read(1) == b'\n'
+
+def actualizar_estado(ruta_interacciones, indice_usuarios, ruta_estado=RUTA_ESTADO, tamano_chunk=TAMANO_CHUNK,
+                      aproximado=False):
+    """
+    Agrega al estado guardado las interacciones nuevas y lo vuelve a guardar.
+
+    Sin estado previo (o si es de otro archivo) se agrega todo el historial. Con
+    JSON Lines la lectura empieza en el byte donde terminó la ejecución anterior;
+    con un arreglo JSON se parsea el archivo, pero solo se agregan los registros
+    posteriores a la marca. En ambos casos la marca evita contar dos veces.
+
+    La ciudad de cada match se resuelve con los usuarios conocidos al agregarlo: un
+    match de un usuario que aún no existe en usuarios.csv no se suma después.
+
+    Args:
+        ruta_interacciones (str): Ruta al JSON o JSON Lines de interacciones
+        indice_usuarios (dict): Índice creado con agregacion.construir_indice_usuarios
+        ruta_estado (str): Ruta del archivo JSON del estado
+        tamano_chunk (int): Registros por bloque de lectura
+        aproximado (bool): Estado con sketches (ver agregacion.nuevo_estado); un estado
+            guardado del otro tipo se descarta y se vuelve a agregar todo
+
+    Returns:
+        tuple: (estado actualizado, dict con 'nuevas', 'marca' y 'desplazamiento' inicial)
+    """
+    ruta_abs = os.path.abspath(ruta_interacciones)
+    guardado = cargar_estado(ruta_estado)
+    if (guardado is not None and guardado['fuente']['ruta'] == ruta_abs
+            and ('sketches' in guardado['estado']) == aproximado):
+        estado = estado_desde_dict(guardado['estado'])
+        marca = guardado['marca']
+        desplazamiento = guardado['fuente']['desplazamiento']
+    else:
+        estado, marca, desplazamiento = nuevo_estado(aproximado), marca_vacia(), 0
+
+    es_jsonl = _es_jsonl(ruta_interacciones)
+    if not es_jsonl or not _desplazamiento_valido(ruta_interacciones, desplazamiento):
+        desplazamiento = 0
+    # Lo que se agregue al archivo mientras se lee se vuelve a leer la próxima vez (y la marca lo filtra)
+    tamano_inicial = os.path.getsize(ruta_interacciones)
+
+    nuevas = 0
+    for df_bloque in iterar_interacciones(ruta_interacciones, tamano_chunk=tamano_chunk,
+                                          desplazamiento=desplazamiento):
+        df_nuevas = filtrar_nuevas(df_bloque, marca)
+        if df_nuevas.empty:
+            continue
+        acumular_interacciones(estado, df_nuevas, indice_usuarios)
+        marca = avanzar_marca(marca, df_nuevas)
+        nuevas += len(df_nuevas)
+
+    fuente = {'ruta': ruta_abs, 'desplazamiento': tamano_inicial if es_jsonl else 0}
+    guardar_estado(estado, marca, fuente, ruta_estado)
+    return estado, {'nuevas': nuevas, 'marca': marca, 'desplazamiento': desplazamiento}
@@ -0,0 +1,282 @@
+"""
+Módulo de instrumentación del pipeline.
+Cada paso del análisis y del reporte emite eventos estructurados (diccionarios con
+'evento', 'ts' y campos propios) en lugar de imprimir directamente. Los eventos con
+'mensaje' se muestran en consola como antes; además pueden escribirse como JSON Lines
+y las duraciones de cada etapa como métricas en formato textfile de Prometheus.
+
+Las etapas (context manager etapa() o decorador cronometrado()) miden el tiempo de
+reloj y el pico de memoria residente mientras están abiertas. De forma opcional se
+puede activar cProfile para toda la ejecución y tracemalloc para el pico de memoria
+de Python por etapa.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Cada cuántos segundos se muestrea la memoria residente mientras hay etapas abiertas
+INTERVALO_MUESTREO = 0.01
+
+# Prefijo de las métricas de Prometheus
+PREFIJO_METRICAS = 'app_citas'
+
+# Funciones que se listan en el evento 'perfil' (ordenadas por tiempo acumulado)
+FUNCIONES_PERFIL = 15
+
+_config = {
+    'consola': True,          # Mostrar el 'mensaje' de los eventos
+    'eventos': None,          # Ruta del archivo JSON Lines de eventos
+    'prometheus': None,       # Ruta del archivo textfile de Prometheus
+    'perfil': None,           # Ruta del volcado de cProfile (.prof)
+    'memoria_python': False   # Pico de memoria de Python por etapa con tracemalloc
+}
+
+_estado = {
+    'archivo_eventos': None,
+    'pila': [],               # Etapas abiertas (la última es la más interna)
+    'metricas': {},           # Ruta de la etapa -> {'segundos', 'ejecuciones', 'rss_pico_bytes'}
+    'perfilador': None,
+    'muestreador': None
+}
+
+def rss_actual():
+    """Memoria residente actual en bytes (None si el sistema no la informa)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Sin /proc solo se conoce el pico del proceso (macOS en bytes, otros Unix en KB)
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+def _muestrear():
+    """Hilo de fondo: actualiza el pico de memoria de las etapas abiertas."""
+    while _estado['pila']:
+        rss = rss_actual()
+        if rss is None:
+            return
+        for abierta in list(_estado['pila']):
+            abierta['rss_pico'] = max(abierta['rss_pico'] or 0, rss)
+        time.sleep(INTERVALO_MUESTREO)
+    _estado['muestreador'] = None
+
+def configurar(consola=True, eventos=None, prometheus=None, perfil=None, memoria_python=False):
+    """
+    Configura las salidas de la instrumentación (llamar una vez, al inicio).
+
+    Args:
+        consola (bool): Mostrar en consola el mensaje de cada evento
+        eventos (str): Ruta del archivo JSON Lines de eventos (None para no escribirlo)
+        prometheus (str): Ruta del archivo textfile de Prometheus que escribe finalizar()
+        perfil (str): Ruta del volcado de cProfile; activa el perfilado de toda la ejecución
+        memoria_python (bool): Medir con tracemalloc el pico de memoria de Python por etapa
+            (más preciso que el RSS por etapa, pero hace más lento el programa)
+    """
+    finalizar()
+    _config.update(consola=consola, eventos=eventos, prometheus=prometheus, perfil=perfil,
+                   memoria_python=memoria_python)
+    _estado['metricas'] = {}
+    if eventos:
+        directorio = os.path.dirname(eventos)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        _estado['archivo_eventos'] = open(eventos, 'a', encoding='utf-8')
+    if memoria_python and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if perfil:
+        _estado['perfilador'] = cProfile.Profile()
+        _estado['perfilador'].enable()
+
+def evento(nombre, mensaje=None, **campos):
+    """
+    Emite un evento estructurado.
+
+    Args:
+        nombre (str): Tipo de evento (p. ej. 'usuarios_cargados')
+        mensaje (str): Texto para la consola (None para no mostrar nada)
+        **campos: Datos del evento (deben ser serializables con json)
+
+    Returns:
+        dict: El evento emitido
+    """
+    registro = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'evento': nombre}
+    if _estado['pila']:
+        registro['etapa'] = _estado['pila'][-1]['ruta']
+    registro.update(campos)
+    if mensaje is not None:
+        registro['mensaje'] = mensaje.strip()
+        if _config['consola']:
+            print(mensaje)
+    if _estado['archivo_eventos'] is not None:
+        _estado['archivo_eventos'].write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        _estado['archivo_eventos'].flush()
+    return registro
+
+def _acumular_metrica(ruta, segundos, rss_pico_bytes):
+    metrica = _estado['metricas'].setdefault(ruta, {'segundos': 0.0, 'ejecuciones': 0, 'rss_pico_bytes': 0})
+    metrica['segundos'] += segundos
+    metrica['ejecuciones'] += 1
+    metrica['rss_pico_bytes'] = max(metrica['rss_pico_bytes'], rss_pico_bytes or 0)
+
+@contextmanager
+def etapa(nombre, mensaje=None, **campos):
+    """
+    Mide una etapa: emite 'inicio_etapa' al entrar y 'fin_etapa' (con duración y memoria) al salir.
+
+    Las etapas se pueden anidar; la ruta de una etapa interna es 'externa/interna'.
+
+    Args:
+        nombre (str): Nombre de la etapa
+        mensaje (str): Texto para la consola al empezar
+        **campos: Datos adicionales para ambos eventos
+
+    Yields:
+        dict: Datos de la etapa; lo que se agregue a 'campos' sale en 'fin_etapa'
+    """
+    padre = _estado['pila'][-1] if _estado['pila'] else None
+    ruta = f"{padre['ruta']}/{nombre}" if padre else nombre
+    evento('inicio_etapa', mensaje, etapa=ruta, **campos)
+
+    actual = {'ruta': ruta, 'rss_pico': rss_actual(), 'python_pico': 0, 'campos': dict(campos)}
+    if tracemalloc.is_tracing():
+        # El pico de tracemalloc es uno solo: se acumula en las etapas abiertas antes de reiniciarlo
+        pico = tracemalloc.get_traced_memory()[1]
+        for abierta in _estado['pila']:
+            abierta['python_pico'] = max(abierta['python_pico'], pico)
+        tracemalloc.reset_peak()
+    _estado['pila'].append(actual)
+    muestreador = _estado['muestreador']
+    if (muestreador is None or not muestreador.is_alive()) and actual['rss_pico'] is not None:
+        _estado['muestreador'] = threading.Thread(target=_muestrear, daemon=True)
+        _estado['muestreador'].start()
+
+    inicio = time.perf_counter()
+    try:
+        yield actual['campos']
+    finally:
+        segundos = time.perf_counter() - inicio
+        _estado['pila'].pop()
+        rss = rss_actual()
+        if rss is not None:
+            actual['rss_pico'] = max(actual['rss_pico'] or 0, rss)
+        resultado = dict(actual['campos'], segundos=round(segundos, 6), rss_pico_bytes=actual['rss_pico'])
+        if tracemalloc.is_tracing():
+            actual['python_pico'] = max(actual['python_pico'], tracemalloc.get_traced_memory()[1])
+            if padre is not None:
+                padre['python_pico'] = max(padre['python_pico'], actual['python_pico'])
+            tracemalloc.reset_peak()
+            resultado['python_pico_bytes'] = actual['python_pico']
+        if padre is not None and actual['rss_pico'] is not None:
+            padre['rss_pico'] = max(padre['rss_pico'] or 0, actual['rss_pico'])
+
+        _acumular_metrica(ruta, segundos, actual['rss_pico'])
+        evento('fin_etapa', etapa=ruta, **resultado)
+
+def registrar_etapa(nombre, segundos, rss_pico_bytes=None, **campos):
+    """
+    Registra una etapa medida en otro proceso (p. ej. un gráfico dibujado en el pool).
+
+    Args:
+        nombre (str): Nombre de la etapa (se anida bajo la etapa abierta actual)
+        segundos (float): Duración medida
+        rss_pico_bytes (int): Pico de memoria del proceso que la ejecutó
+        **campos: Datos adicionales del evento 'fin_etapa'
+    """
+    padre = _estado['pila'][-1] if _estado['pila'] else None
+    ruta = f"{padre['ruta']}/{nombre}" if padre else nombre
+    _acumular_metrica(ruta, segundos, rss_pico_bytes)
+    evento('fin_etapa', etapa=ruta, segundos=round(segundos, 6), rss_pico_bytes=rss_pico_bytes, **campos)
+
+def cronometrado(nombre=None):
+    """
+    Decorador que ejecuta la función dentro de una etapa.
+
+    Args:
+        nombre (str): Nombre de la etapa (por defecto, el de la función)
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre or funcion.__name__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def metricas():
+    """Duración acumulada, ejecuciones y pico de memoria de cada etapa desde configurar()."""
+    return {ruta: dict(valores) for ruta, valores in _estado['metricas'].items()}
+
+def _escapar_etiqueta(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def escribir_prometheus(ruta):
+    """
+    Escribe las métricas de las etapas en formato textfile de Prometheus (de forma atómica,
+    como espera el textfile collector de node_exporter).
+
+    Args:
+        ruta (str): Archivo de salida (convencionalmente con extensión .prom)
+    """
+    definiciones = [
+        ('etapa_segundos', 'segundos', 'Duración acumulada de la etapa en la última ejecución'),
+        ('etapa_ejecuciones', 'ejecuciones', 'Veces que se ejecutó la etapa'),
+        ('etapa_rss_pico_bytes', 'rss_pico_bytes', 'Pico de memoria residente durante la etapa')
+    ]
+    lineas = []
+    for sufijo, campo, ayuda in definiciones:
+        nombre = f'{PREFIJO_METRICAS}_{sufijo}'
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} gauge')
+        for ruta_etapa, valores in _estado['metricas'].items():
+            lineas.append(f'{nombre}{{etapa="{_escapar_etiqueta(ruta_etapa)}"}} {valores[campo]}')
+    lineas.append(f'# HELP {PREFIJO_METRICAS}_ultima_ejecucion_timestamp_seconds Fin de la última ejecución')
+    lineas.append(f'# TYPE {PREFIJO_METRICAS}_ultima_ejecucion_timestamp_seconds gauge')
+    lineas.append(f'{PREFIJO_METRICAS}_ultima_ejecucion_timestamp_seconds {time.time():.3f}')
+
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lineas) + '\n')
+    os.replace(temporal, ruta)
+
+def finalizar():
+    """
+    Cierra la instrumentación: guarda el perfil de cProfile (y emite un evento 'perfil'
+    con las funciones más costosas), escribe las métricas de Prometheus y cierra el
+    archivo de eventos. Se puede llamar aunque no se haya configurado nada.
+    """
+    perfilador = _estado['perfilador']
+    if perfilador is not None:
+        perfilador.disable()
+        _estado['perfilador'] = None
+        perfilador.dump_stats(_config['perfil'])
+        funciones = [
+            {'funcion': f'{archivo}:{linea}({nombre})', 'llamadas': llamadas,
+             'segundos_propios': round(propio, 6), 'segundos_acumulados': round(acumulado, 6)}
+            for (archivo, linea, nombre), (_, llamadas, propio, acumulado, _) in
+            sorted(pstats.Stats(perfilador).stats.items(), key=lambda item: -item[1][3])[:FUNCIONES_PERFIL]
+        ]
+        evento('perfil', archivo=_config['perfil'], funciones=funciones)
+    if _config['memoria_python'] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if _config['prometheus'] and _estado['metricas']:
+        escribir_prometheus(_config['prometheus'])
+    if _estado['archivo_eventos'] is not None:
+        _estado['archivo_eventos'].close()
+        _estado['archivo_eventos'] = None
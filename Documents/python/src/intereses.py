@@ -0,0 +1,136 @@
+"""
+Módulo de intereses para la app de citas.
+Convierte la columna 'intereses' (texto separado por comas, p. ej. "Deportes, Música")
+en una matriz dispersa usuario x interés con códigos enteros, para contar intereses
+individuales, coocurrencias y desgloses por grupo con operaciones de arreglos.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Matriz de incidencia usuario x interés en formato coordenado (COO), ordenada por fila.
+#   filas: posición de fila del usuario en el DataFrame
+#   columnas: código del interés en 'vocabulario'
+#   vocabulario: pd.Index con el texto normalizado de cada interés
+#   n_usuarios: número de filas del DataFrame original
+IncidenciaIntereses = namedtuple('IncidenciaIntereses', ['filas', 'columnas', 'vocabulario', 'n_usuarios'])
+
+def normalizar_interes(texto):
+    """Normaliza un interés individual: sin espacios extremos y en minúsculas."""
+    return texto.strip().lower()
+
+def tokenizar_intereses(serie, separador=',', normalizar=normalizar_interes):
+    """
+    Separa los intereses de cada usuario y construye la matriz de incidencia.
+
+    El texto se divide una sola vez por cada valor distinto de la columna (o por
+    cada categoría si es categórica); después los códigos se expanden a todas las
+    filas con operaciones vectorizadas.
+
+    Args:
+        serie (pd.Series): Columna 'intereses'
+        separador (str): Separador entre intereses
+        normalizar (callable): Función aplicada a cada interés individual
+
+    Returns:
+        IncidenciaIntereses: Matriz usuario x interés y su vocabulario
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype('int64')
+        unicos = serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie)
+
+    # 1. Tokenizar cada valor distinto
+    vocabulario = {}
+    tokens_por_unico = []
+    for texto in unicos:
+        tokens = []
+        for parte in str(texto).split(separador):
+            interes = normalizar(parte)
+            if not interes:
+                continue
+            codigo = vocabulario.setdefault(interes, len(vocabulario))
+            if codigo not in tokens:  # Un interés repetido cuenta una sola vez por usuario
+                tokens.append(codigo)
+        tokens_por_unico.append(tokens)
+
+    longitudes = np.array([len(t) for t in tokens_por_unico] + [0], dtype='int64')
+    inicios = np.concatenate([[0], np.cumsum(longitudes[:-1])])
+    planos = np.array([c for t in tokens_por_unico for c in t], dtype='int64')
+
+    # 2. Expandir a las filas (los nulos, código -1, usan la entrada vacía final)
+    codigos = np.where(codigos >= 0, codigos, len(longitudes) - 1)
+    longitudes_fila = longitudes[codigos]
+    filas = np.repeat(np.arange(len(codigos)), longitudes_fila)
+    desplazamiento = np.arange(len(filas)) - np.repeat(np.cumsum(longitudes_fila) - longitudes_fila, longitudes_fila)
+    columnas = planos[np.repeat(inicios[codigos], longitudes_fila) + desplazamiento] if len(filas) else planos[:0]
+
+    return IncidenciaIntereses(filas, columnas, pd.Index(list(vocabulario), name='interes'), len(codigos))
+
+def conteo_intereses(incidencia):
+    """
+    Cuenta cuántos usuarios tienen cada interés.
+
+    Args:
+        incidencia (IncidenciaIntereses): Matriz creada con tokenizar_intereses
+
+    Returns:
+        pd.Series: Usuarios por interés, de mayor a menor
+    """
+    conteos = np.bincount(incidencia.columnas, minlength=len(incidencia.vocabulario))
+    return pd.Series(conteos, index=incidencia.vocabulario, name='count').sort_values(
+        ascending=False, kind='stable')
+
+def coocurrencia_intereses(incidencia):
+    """
+    Calcula cuántos usuarios comparten cada par de intereses.
+
+    Como las filas están ordenadas, los pares de un mismo usuario están a una
+    distancia menor que su número de intereses: basta con comparar la matriz
+    consigo misma desplazada 1, 2, ... posiciones (O(nnz x máximo de intereses)).
+
+    Args:
+        incidencia (IncidenciaIntereses): Matriz creada con tokenizar_intereses
+
+    Returns:
+        pd.DataFrame: Matriz simétrica interés x interés (la diagonal es el conteo de cada interés)
+    """
+    v = len(incidencia.vocabulario)
+    filas, columnas = incidencia.filas, incidencia.columnas
+    pares = np.bincount(columnas * v + columnas, minlength=v * v)
+
+    max_por_usuario = np.bincount(filas).max() if len(filas) else 0
+    for desplazamiento in range(1, max_por_usuario):
+        mismo_usuario = filas[desplazamiento:] == filas[:-desplazamiento]
+        a = columnas[:-desplazamiento][mismo_usuario]
+        b = columnas[desplazamiento:][mismo_usuario]
+        pares += np.bincount(a * v + b, minlength=v * v) + np.bincount(b * v + a, minlength=v * v)
+
+    return pd.DataFrame(pares.reshape(v, v), index=incidencia.vocabulario, columns=incidencia.vocabulario)
+
+def intereses_por_grupo(incidencia, grupo):
+    """
+    Cuenta usuarios por grupo e interés (por ejemplo, intereses por ciudad).
+
+    Args:
+        incidencia (IncidenciaIntereses): Matriz creada con tokenizar_intereses
+        grupo (pd.Series): Columna de agrupación alineada con las filas (p. ej. 'ciudad')
+
+    Returns:
+        pd.DataFrame: Tabla grupo x interés con el número de usuarios
+    """
+    if isinstance(grupo.dtype, pd.CategoricalDtype):
+        codigos_grupo = grupo.cat.codes.to_numpy().astype('int64')
+        grupos = grupo.cat.categories
+    else:
+        codigos_grupo, grupos = pd.factorize(grupo)
+
+    v = len(incidencia.vocabulario)
+    codigos = codigos_grupo[incidencia.filas]
+    validos = codigos >= 0
+    conteos = np.bincount(codigos[validos] * v + incidencia.columnas[validos], minlength=len(grupos) * v)
+    return pd.DataFrame(conteos.reshape(len(grupos), v), index=pd.Index(grupos, name=grupo.name),
+                        columns=incidencia.vocabulario)
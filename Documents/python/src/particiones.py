@@ -0,0 +1,105 @@
+"""
+Módulo de análisis particionado para la app de citas.
+Las exportaciones de interacciones llegan como varios archivos (uno por día u hora).
+Cada partición se agrega por separado en un proceso distinto y produce un estado
+parcial (ver agregacion.nuevo_estado); los estados se combinan al final con
+agregacion.combinar_estados, de modo que el resultado es el mismo que con un solo archivo.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+from src.agregacion import (
+    acumular_interacciones, combinar_estados, construir_indice_usuarios, nuevo_estado, resultados_desde_estado
+)
+from src.preprocesamiento import iterar_interacciones, TAMANO_CHUNK
+
+# Extensiones que se toman como particiones al recibir un directorio
+EXTENSIONES_PARTICION = ('.json', '.jsonl', '.ndjson')
+
+# Índice de usuarios de cada proceso (se envía una sola vez, al iniciar el proceso)
+_indice_proceso = None
+
+def es_particionada(ruta):
+    """Indica si la ruta es un directorio o un patrón glob (p. ej. 'data/interacciones/*.jsonl')."""
+    return os.path.isdir(ruta) or glob.has_magic(ruta)
+
+def listar_particiones(ruta):
+    """
+    Lista los archivos de interacciones de un directorio o patrón glob.
+
+    Args:
+        ruta (str): Directorio (se toman los .json, .jsonl y .ndjson) o patrón glob
+
+    Returns:
+        list: Rutas de los archivos en orden alfabético
+    """
+    if os.path.isdir(ruta):
+        rutas = [entrada.path for entrada in os.scandir(ruta)
+                 if entrada.is_file() and os.path.splitext(entrada.name)[1].lower() in EXTENSIONES_PARTICION]
+    else:
+        rutas = [r for r in glob.glob(ruta) if os.path.isfile(r)]
+    if not rutas:
+        raise FileNotFoundError(f'No se encontraron archivos de interacciones en: {ruta}')
+    return sorted(rutas)
+
+def _inicializar_proceso(indice_usuarios):
+    global _indice_proceso
+    _indice_proceso = indice_usuarios
+
+def agregar_particion(ruta, indice_usuarios=None, tamano_chunk=TAMANO_CHUNK, aproximado=False):
+    """
+    Agrega una partición completa (leída por bloques) en un estado parcial.
+
+    Args:
+        ruta (str): Archivo JSON o JSON Lines de la partición
+        indice_usuarios (dict): Índice de usuarios; None usa el del proceso
+        tamano_chunk (int): Registros por bloque de lectura
+        aproximado (bool): Estado con sketches (ver agregacion.nuevo_estado)
+
+    Returns:
+        dict: Estado de agregación de la partición
+    """
+    indice = _indice_proceso if indice_usuarios is None else indice_usuarios
+    estado = nuevo_estado(aproximado)
+    for df_bloque in iterar_interacciones(ruta, tamano_chunk=tamano_chunk):
+        acumular_interacciones(estado, df_bloque, indice)
+    return estado
+
+def _agregar_particion_proceso(argumentos):
+    ruta, tamano_chunk, aproximado = argumentos
+    return agregar_particion(ruta, None, tamano_chunk, aproximado)
+
+def agregar_particiones(df_usuarios, rutas, procesos=None, top_k=5, aproximado=False, tamano_chunk=TAMANO_CHUNK):
+    """
+    Agrega varias particiones en paralelo y combina los estados parciales.
+
+    Los estados se combinan en el orden de 'rutas' (no en el que terminan los
+    procesos), así el resultado no depende de la planificación.
+
+    Args:
+        df_usuarios (pd.DataFrame): Usuarios ya limpios
+        rutas (list): Archivos de interacciones (ver listar_particiones)
+        procesos (int): Procesos del pool (por defecto uno por núcleo); con 1 no se crea pool
+        top_k (int): Número de usuarios más activos a incluir
+        aproximado (bool): Usar sketches (ver agregacion.nuevo_estado)
+        tamano_chunk (int): Registros por bloque de lectura dentro de cada partición
+
+    Returns:
+        dict: Resultados con la misma estructura que agregacion.agregar_todo
+    """
+    indice = construir_indice_usuarios(df_usuarios)
+    procesos = min(procesos or os.cpu_count() or 1, len(rutas))
+
+    if procesos <= 1:
+        estados = [agregar_particion(ruta, indice, tamano_chunk, aproximado) for ruta in rutas]
+    else:
+        tareas = [(ruta, tamano_chunk, aproximado) for ruta in rutas]
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                                 initargs=(indice,)) as pool:
+            estados = list(pool.map(_agregar_particion_proceso, tareas))
+
+    estado = reduce(combinar_estados, estados, nuevo_estado(aproximado))
+    return resultados_desde_estado(df_usuarios, estado, top_k, indice)
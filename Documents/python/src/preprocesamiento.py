@@ -4,27 +4,594 @@ Contiene funciones para cargar y limpiar datos de usuarios e interacciones.
 """
 
 import pandas as pd
+import numpy as np
 import json
+import os
+import sys
+import unicodedata
 
-def cargar_datos(ruta_usuarios, ruta_interacciones):
-    # Cargar usuarios
-    df_usuarios = pd.read_csv(ruta_usuarios, encoding='utf-8')
+from src.instrumentacion import evento
+
+# Número de registros por bloque al leer interacciones en modo streaming
+TAMANO_CHUNK = 100_000
+
+# Tamaño de lectura (en caracteres) al recorrer un arreglo JSON por partes
+TAMANO_BLOQUE_LECTURA = 1 << 20
+
+# Esquemas de tipos compactos que aplican los cargadores a cada conjunto de datos.
+# 'category' para texto de baja cardinalidad, enteros pequeños para edades e ids,
+# 'boolean' (nullable) para banderas y 'datetime64' para fechas. Las columnas que
+# no aparecen conservan el tipo que infiere pandas: nombres, biografía y tags, e
+# 'intereses', cuya combinación es casi única por usuario (se cuenta por tokens,
+# ver src.intereses).
+ESQUEMA_USUARIOS = {
+    'id_usuario': 'int32',
+    'edad': 'int8',
+    'genero': 'category',
+    'ciudad': 'category'
+}
+
+ESQUEMA_INTERACCIONES = {
+    'id_interaccion': 'int32',
+    'id_usuario': 'int32',
+    'tipo': 'category',
+    'match': 'boolean',
+    'fecha': 'datetime64'
+}
+
+ESQUEMA_PUBLICACIONES = {
+    'id_publicacion': 'int32',
+    'id_usuario': 'int32',
+    'duracion_segundos': 'int16',
+    'estado': 'category'
+}
+
+# Reglas de normalización de texto que aplica limpiar_datos_completo. Cada columna
+# declara sus pasos (ver normalizar_columnas): 'caso' ('minusculas' o 'mayusculas'),
+# 'sin_acentos' (plegado NFKD: 'Bogotá' -> 'bogota') y 'canonicos' (variantes -> valor
+# canónico). Las columnas que no estén en el DataFrame se ignoran.
+NORMALIZACION_USUARIOS = {
+    'intereses': {'caso': 'minusculas', 'sin_acentos': True},
+    'nombre': {'caso': 'minusculas'},
+    'nombre_usuario': {'caso': 'minusculas'},
+    'ciudad': {'caso': 'minusculas', 'sin_acentos': True}
+}
+
+NORMALIZACION_INTERACCIONES = {
+    'tipo': {'caso': 'mayusculas'}
+}
+
+# Vocabulario de las columnas de banderas (como 'match'). Se compara sin espacios,
+# sin mayúsculas y sin tildes, así que 'Sí', ' TRUE ' y 'si' valen lo mismo
+VALORES_VERDADEROS = ('true', 't', '1', 'si', 's', 'yes', 'y', 'verdadero')
+VALORES_FALSOS = ('false', 'f', '0', 'no', 'n', 'falso')
+
+# Formato de las fechas de interacciones (ISO 8601 sin zona horaria). Los valores que
+# no lo cumplen se interpretan con el parser ISO general de pandas
+FORMATO_FECHA = '%Y-%m-%dT%H:%M:%S'
+
+# Columnas de banderas que limpiar_datos_completo convierte a booleano
+BANDERAS_INTERACCIONES = ['match']
+
+def _convertir_columna(serie, tipo):
+    """Convierte una serie al tipo declarado en un esquema."""
+    if tipo == 'category':
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        serie = serie.cat.remove_unused_categories()
+        # Categorías en orden de primera aparición: value_counts desempata igual que con texto
+        codigos = serie.cat.codes.to_numpy()
+        orden = pd.unique(codigos[codigos >= 0])
+        return serie.cat.reorder_categories(serie.cat.categories[orden])
+    
+    if tipo.startswith('int'):
+        valores = pd.to_numeric(serie, errors='coerce')
+        limites = np.iinfo(tipo)
+        if valores.notna().any() and (valores.min() < limites.min or valores.max() > limites.max):
+            return valores  # No cabe en el tipo reducido: se deja como está
+        if valores.isna().any():
+            return valores.astype(tipo.capitalize())  # Entero nullable ('Int32', ...)
+        return valores.astype(tipo)
+    
+    if tipo == 'boolean':
+        convertida, no_convertibles = convertir_bandera(serie)
+        _avisar_no_convertibles(serie.name, no_convertibles)
+        return convertida
+    
+    if tipo == 'datetime64':
+        convertida, no_convertibles = convertir_fechas(serie)
+        _avisar_no_convertibles(serie.name, no_convertibles, 'fecha')
+        return convertida
+    
+    return serie.astype(tipo)
+
+def _estado_bandera(valor, verdaderos, falsos):
+    """Devuelve 1 (verdadero), 0 (falso) o -1 (no convertible) para un valor distinto."""
+    if isinstance(valor, (bool, np.bool_)):
+        return int(valor)
+    if isinstance(valor, (int, np.integer)) and valor in (0, 1):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)) and valor in (0.0, 1.0):
+        return int(valor)
+    if isinstance(valor, str):
+        texto = _quitar_acentos(valor.strip().lower())
+        if texto in verdaderos:
+            return 1
+        if texto in falsos:
+            return 0
+    return -1
+
+def convertir_bandera(serie, verdaderos=VALORES_VERDADEROS, falsos=VALORES_FALSOS):
+    """
+    Convierte una columna de banderas a booleano nullable.
+    
+    Cada valor distinto (o cada categoría) se interpreta una sola vez y el resultado se
+    reparte a las filas con una tabla indexada por los códigos. Los nulos quedan como
+    <NA>, igual que los valores que no están en el vocabulario, que además se cuentan.
+    
+    Args:
+        serie (pd.Series): Serie de texto, números, objetos o booleanos
+        verdaderos (iterable): Textos que significan True (sin tildes, en minúsculas)
+        falsos (iterable): Textos que significan False (sin tildes, en minúsculas)
+    
+    Returns:
+        tuple: (serie booleana nullable, número de valores no convertibles)
+    """
+    if serie.dtype == 'boolean':
+        return serie, 0
+    if serie.dtype == bool:
+        return serie.astype('boolean'), 0
+    
+    verdaderos = {_quitar_acentos(v.strip().lower()) for v in verdaderos}
+    falsos = {_quitar_acentos(f.strip().lower()) for f in falsos}
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, unicas = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, unicas = pd.factorize(serie)
+    # El último elemento corresponde a los nulos (código -1)
+    tabla = np.array([_estado_bandera(valor, verdaderos, falsos) for valor in unicas] + [-2], dtype='int8')
+    estados = tabla[codigos]
+    convertida = pd.arrays.BooleanArray(estados == 1, estados < 0)
+    return pd.Series(convertida, index=serie.index, name=serie.name), int((estados == -1).sum())
+
+def _avisar_no_convertibles(columna, cantidad, tipo='booleano'):
+    """Emite un evento si algunos valores de una columna no se pudieron interpretar."""
+    if cantidad:
+        evento('valores_no_convertibles',
+               f"   ⚠️ {cantidad} valores de '{columna}' no se pudieron convertir a {tipo}",
+               columna=columna, cantidad=cantidad, tipo=tipo)
+
+def convertir_fechas(serie, formato=FORMATO_FECHA):
+    """
+    Convierte una columna de texto con fechas a datetime64.
+    
+    Cada texto distinto se interpreta una sola vez, primero con el formato explícito y,
+    si no lo cumple, con el parser ISO 8601 general (fechas sin hora, fracciones de
+    segundo o zona horaria, que se pasa a UTC). Los valores que no son fechas quedan
+    como NaT y se cuentan.
+    
+    Args:
+        serie (pd.Series): Serie de texto, categórica o ya datetime64
+        formato (str): Formato de strftime esperado
+    
+    Returns:
+        tuple: (serie datetime64, número de valores no convertibles)
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie, 0
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, unicas = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, unicas = pd.factorize(serie)
+    
+    unicas = pd.Series(unicas, dtype=object)
+    fechas = pd.to_datetime(unicas, format=formato, errors='coerce')
+    pendientes = fechas.isna().to_numpy()
+    if pendientes.any():
+        otras = pd.to_datetime(unicas[pendientes], format='ISO8601', errors='coerce', utc=True)
+        fechas[pendientes] = otras.dt.tz_convert(None).astype(fechas.dtype)
+    no_convertibles = fechas.isna().to_numpy()
+    
+    # El último elemento corresponde a los nulos (código -1)
+    tabla = np.append(fechas.to_numpy(), np.datetime64('NaT'))
+    convertida = pd.Series(tabla[codigos], index=serie.index, name=serie.name)
+    return convertida, int(no_convertibles[codigos[codigos >= 0]].sum())
+
+def convertir_banderas(df, columnas, verdaderos=VALORES_VERDADEROS, falsos=VALORES_FALSOS):
+    """
+    Convierte varias columnas de banderas a booleano nullable (ver convertir_bandera).
+    
+    Args:
+        df (pd.DataFrame): DataFrame a procesar
+        columnas (list): Columnas a convertir (las que no existan se ignoran)
+        verdaderos (iterable): Textos que significan True
+        falsos (iterable): Textos que significan False
+    
+    Returns:
+        dict: Número de valores no convertibles por columna
+    """
+    no_convertibles = {}
+    for columna in columnas:
+        if columna in df.columns:
+            df[columna], no_convertibles[columna] = convertir_bandera(df[columna], verdaderos, falsos)
+            _avisar_no_convertibles(columna, no_convertibles[columna])
+    return no_convertibles
+
+def aplicar_esquema(df, esquema):
+    """
+    Convierte las columnas del DataFrame a los tipos compactos del esquema.
+    
+    Args:
+        df (pd.DataFrame): DataFrame a convertir
+        esquema (dict): Diccionario columna -> tipo (ver ESQUEMA_USUARIOS)
+    
+    Returns:
+        pd.DataFrame: DataFrame con los tipos del esquema
+    """
+    for columna, tipo in esquema.items():
+        if columna in df.columns:
+            df[columna] = _convertir_columna(df[columna], tipo)
+    return df
+
+def reporte_memoria(df):
+    """
+    Compara la memoria del DataFrame con la que ocuparía con los tipos por defecto
+    de pandas (texto como object, enteros int64 y banderas bool).
+    
+    Args:
+        df (pd.DataFrame): DataFrame con el esquema aplicado
+    
+    Returns:
+        dict: 'bytes', 'bytes_sin_esquema' y 'ahorro' (en bytes)
+    """
+    actual = df.memory_usage(deep=True, index=False)
+    sin_esquema = 0
+    for columna in df.columns:
+        serie = df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Un puntero por fila más el objeto str al que apunta cada fila
+            codigos = serie.cat.codes.to_numpy()
+            conteos = np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories))
+            tamanos = np.array([sys.getsizeof(c) for c in serie.cat.categories], dtype='int64')
+            sin_esquema += 8 * len(serie) + int(conteos @ tamanos)
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            sin_esquema += 8 * len(serie)
+        elif serie.dtype == 'boolean':
+            sin_esquema += len(serie)
+        else:
+            sin_esquema += int(actual[columna])
+    
+    total = int(actual.sum())
+    return {'bytes': total, 'bytes_sin_esquema': sin_esquema, 'ahorro': sin_esquema - total}
+
+def cargar_usuarios(ruta_usuarios):
+    """
+    Carga el CSV de usuarios y descarta las filas con edades no válidas.
+    
+    Args:
+        ruta_usuarios (str): Ruta al archivo CSV de usuarios
+    
+    Returns:
+        pd.DataFrame: DataFrame de usuarios con los tipos de ESQUEMA_USUARIOS
+    """
+    # Las columnas categóricas se parsean directamente como 'category'
+    tipos_lectura = {c: 'category' for c, t in ESQUEMA_USUARIOS.items() if t == 'category'}
+    df_usuarios = pd.read_csv(ruta_usuarios, encoding='utf-8', dtype=tipos_lectura)
     
     # Limpiar y convertir edad a numérico
     df_usuarios['edad'] = pd.to_numeric(df_usuarios['edad'], errors='coerce')
     df_usuarios = df_usuarios.dropna(subset=['edad'])  # Eliminar filas con edades no válidas
     df_usuarios['edad'] = df_usuarios['edad'].astype(int)  # Convertir a enteros
+    return aplicar_esquema(df_usuarios, ESQUEMA_USUARIOS)
+
+def cargar_interacciones(ruta_interacciones):
+    """
+    Carga las interacciones (arreglo JSON o JSON Lines) con ESQUEMA_INTERACCIONES.
     
-    # Cargar interacciones
-    with open(ruta_interacciones, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    df_interacciones = pd.DataFrame(data)
+    Args:
+        ruta_interacciones (str): Ruta al archivo de interacciones
+    
+    Returns:
+        pd.DataFrame: DataFrame de interacciones
+    """
+    # Por bloques, para no mantener la lista de diccionarios completa
+    return _concatenar_bloques(iterar_interacciones(ruta_interacciones), ESQUEMA_INTERACCIONES)
+
+def cargar_datos(ruta_usuarios, ruta_interacciones):
+    # Cargar usuarios
+    df_usuarios = cargar_usuarios(ruta_usuarios)
     
-    # Convertir fecha a datetime
-    df_interacciones['fecha'] = pd.to_datetime(df_interacciones['fecha'])
+    # Cargar interacciones
+    df_interacciones = cargar_interacciones(ruta_interacciones)
     
     return df_usuarios, df_interacciones
 
+def cargar_publicaciones(ruta_publicaciones):
+    """
+    Carga las publicaciones de voz (arreglo JSON o JSON Lines) con ESQUEMA_PUBLICACIONES.
+    
+    Args:
+        ruta_publicaciones (str): Ruta al archivo de publicaciones
+    
+    Returns:
+        pd.DataFrame: DataFrame de publicaciones
+    """
+    return _concatenar_bloques(iterar_publicaciones(ruta_publicaciones), ESQUEMA_PUBLICACIONES)
+
+def iterar_publicaciones(ruta_publicaciones, tamano_chunk=TAMANO_CHUNK):
+    """
+    Lee las publicaciones por bloques sin cargar el archivo completo en memoria.
+    
+    Args:
+        ruta_publicaciones (str): Ruta al arreglo JSON o archivo JSON Lines
+        tamano_chunk (int): Número de registros por bloque
+    
+    Yields:
+        pd.DataFrame: Bloque de publicaciones con los tipos de ESQUEMA_PUBLICACIONES
+    """
+    yield from _iterar_bloques(ruta_publicaciones, ESQUEMA_PUBLICACIONES, tamano_chunk)
+
+def _concatenar_bloques(bloques, esquema):
+    """
+    Une los bloques de un cargador conservando las columnas categóricas.
+    
+    Cada bloque tiene sus propias categorías; antes de concatenar se unifican para
+    que el resultado no vuelva a convertirse en texto (object).
+    """
+    bloques = list(bloques)
+    if not bloques:
+        return aplicar_esquema(pd.DataFrame({columna: [] for columna in esquema}), esquema)
+    
+    for columna, tipo in esquema.items():
+        if tipo != 'category' or columna not in bloques[0].columns:
+            continue
+        categorias = pd.unique(np.concatenate([b[columna].cat.categories.to_numpy() for b in bloques]))
+        for b in bloques:
+            b[columna] = b[columna].cat.set_categories(categorias)
+    
+    return pd.concat(bloques, ignore_index=True)
+
+def _detectar_formato(ruta, f):
+    """Devuelve 'json' para un arreglo JSON o 'jsonl' para JSON Lines."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    
+    # Mirar el primer carácter significativo sin consumir el archivo (puede haber más
+    # de un bloque de espacios al inicio)
+    inicio = ''
+    while True:
+        leido = f.read(TAMANO_BLOQUE_LECTURA)
+        inicio = leido.lstrip('\ufeff \t\r\n')
+        if inicio or not leido:
+            break
+    f.seek(0)
+    return 'json' if inicio.startswith('[') else 'jsonl'
+
+def _iterar_registros_jsonl(f):
+    """Genera un diccionario por cada línea no vacía de un archivo JSON Lines."""
+    for linea in f:
+        linea = linea.strip().lstrip('\ufeff')
+        if linea:
+            yield json.loads(linea)
+
+def _iterar_registros_json(f):
+    """
+    Genera los elementos de un arreglo JSON leyendo el archivo por bloques.
+    
+    Solo mantiene en memoria el bloque actual y el registro que se está decodificando.
+    """
+    decodificador = json.JSONDecoder()
+    buffer = f.read(TAMANO_BLOQUE_LECTURA)
+    fin_archivo = not buffer
+    buffer = buffer.lstrip('\ufeff')
+    pos = 0
+    abierto = False
+    
+    while True:
+        # Saltar espacios y separadores entre registros
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        
+        if pos < len(buffer):
+            if not abierto:
+                if buffer[pos] != '[':
+                    raise ValueError('El archivo de interacciones no contiene un arreglo JSON')
+                abierto = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                registro, fin = decodificador.raw_decode(buffer, pos)
+                # Un valor que termina justo en el borde del bloque puede estar truncado
+                if fin < len(buffer) or fin_archivo:
+                    yield registro
+                    pos = fin
+                    continue
+            except json.JSONDecodeError:
+                if fin_archivo:
+                    raise
+        elif fin_archivo:
+            raise ValueError('Arreglo JSON de interacciones incompleto')
+        
+        # Descartar lo ya procesado y leer el siguiente bloque
+        buffer = buffer[pos:]
+        pos = 0
+        siguiente = f.read(TAMANO_BLOQUE_LECTURA)
+        fin_archivo = not siguiente
+        buffer += siguiente
+
+def _bloque_a_dataframe(buffers, esquema):
+    """
+    Convierte los buffers de columnas de un bloque en un DataFrame tipado.
+    
+    Args:
+        buffers (dict): Diccionario columna -> lista de valores
+        esquema (dict): Esquema de tipos a aplicar
+    
+    Returns:
+        pd.DataFrame: Bloque con los tipos del esquema
+    """
+    return aplicar_esquema(pd.DataFrame(buffers), esquema)
+
+def _iterar_bloques(ruta, esquema, tamano_chunk=TAMANO_CHUNK, formato=None, desplazamiento=0):
+    """Lee un arreglo JSON o JSON Lines y genera bloques tipados con el esquema dado."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        if formato is None:
+            formato = _detectar_formato(ruta, f)
+        if desplazamiento:
+            if formato != 'jsonl':
+                raise ValueError('Solo se puede empezar a leer desde un byte en archivos JSON Lines')
+            f.seek(desplazamiento)
+        registros = _iterar_registros_json(f) if formato == 'json' else _iterar_registros_jsonl(f)
+        
+        buffers = {columna: [] for columna in esquema}
+        cantidad = 0
+        for registro in registros:
+            # Columnas no declaradas se agregan rellenando con None los registros previos
+            for columna in registro.keys() - buffers.keys():
+                buffers[columna] = [None] * cantidad
+            for columna, valores in buffers.items():
+                valores.append(registro.get(columna))
+            cantidad += 1
+            
+            if cantidad >= tamano_chunk:
+                yield _bloque_a_dataframe(buffers, esquema)
+                buffers = {columna: [] for columna in esquema}
+                cantidad = 0
+        
+        if cantidad:
+            yield _bloque_a_dataframe(buffers, esquema)
+
+def iterar_interacciones(ruta_interacciones, tamano_chunk=TAMANO_CHUNK, formato=None, desplazamiento=0):
+    """
+    Lee las interacciones por bloques de registros sin cargar el archivo completo.
+    
+    Acepta un arreglo JSON (como 'interacciones.json') o JSON Lines (un objeto por línea).
+    Cada bloque se arma con un buffer por columna, de modo que en memoria solo
+    conviven los registros del bloque actual.
+    
+    Args:
+        ruta_interacciones (str): Ruta al archivo de interacciones
+        tamano_chunk (int): Número máximo de registros por bloque
+        formato (str): 'json', 'jsonl' o None para detectarlo automáticamente
+        desplazamiento (int): Byte (inicio de una línea) desde el que se empieza a leer;
+            solo para JSON Lines, p. ej. para leer únicamente lo agregado al final
+    
+    Yields:
+        pd.DataFrame: Bloque de interacciones con los tipos de ESQUEMA_INTERACCIONES
+    """
+    yield from _iterar_bloques(ruta_interacciones, ESQUEMA_INTERACCIONES, tamano_chunk, formato, desplazamiento)
+
+def _transformar_categorias(serie, funcion):
+    """
+    Aplica una transformación de texto solo a las categorías de una serie categórica.
+    
+    Las categorías que quedan iguales tras la transformación se fusionan en una sola.
+    """
+    nuevas = funcion(serie.cat.categories.to_series()).to_numpy()
+    codigos_nuevos, unicas = pd.factorize(nuevas)
+    codigos = serie.cat.codes.to_numpy()
+    mapeados = np.where(codigos >= 0, codigos_nuevos[codigos], -1)
+    return pd.Series(pd.Categorical.from_codes(mapeados, categories=unicas),
+                     index=serie.index, name=serie.name)
+
+def _quitar_acentos(texto):
+    """Descompone el texto (NFKD) y descarta las marcas diacríticas."""
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def _crear_normalizador(regla):
+    """
+    Compone los pasos de una regla en una única función str -> str.
+    
+    Args:
+        regla (dict): Pasos de normalización (ver normalizar_columnas)
+    
+    Returns:
+        function: Función que normaliza un valor (los que no son texto se devuelven igual)
+    """
+    recortar = regla.get('recortar', True)
+    caso = regla.get('caso')
+    if caso not in (None, 'minusculas', 'mayusculas'):
+        raise ValueError(f"Caso de normalización desconocido: {caso}")
+    sin_acentos = regla.get('sin_acentos', False)
+    
+    def pasos(valor):
+        if recortar:
+            valor = valor.strip()
+        if caso == 'minusculas':
+            valor = valor.lower()
+        elif caso == 'mayusculas':
+            valor = valor.upper()
+        if sin_acentos:
+            valor = _quitar_acentos(valor)
+        return valor
+    
+    # Las claves de 'canonicos' pasan por los mismos pasos, así que pueden escribirse
+    # con mayúsculas o acentos ('Bogotá D.C.': 'bogota')
+    canonicos = {pasos(k): v for k, v in regla.get('canonicos', {}).items()}
+    
+    def normalizar(valor):
+        if not isinstance(valor, str):
+            return valor
+        valor = pasos(valor)
+        return canonicos.get(valor, valor)
+    
+    return normalizar
+
+def normalizar_serie(serie, regla):
+    """
+    Normaliza una serie de texto aplicando la regla solo a sus valores distintos.
+    
+    Los valores únicos (o las categorías, si la serie es categórica) se normalizan una
+    vez y el resultado se reparte a las filas por sus códigos, así que el costo depende
+    de la cardinalidad y no del número de filas. Se conserva el tipo de la serie.
+    
+    Args:
+        serie (pd.Series): Serie categórica, de texto o de objetos
+        regla (dict): Pasos de normalización (ver normalizar_columnas)
+    
+    Returns:
+        pd.Series: Serie normalizada
+    """
+    normalizar = _crear_normalizador(regla)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Las categorías que quedan iguales se fusionan en una sola
+        return _transformar_categorias(serie, lambda categorias: categorias.map(normalizar))
+    
+    codigos, unicas = pd.factorize(serie)
+    # El último elemento es el valor faltante: los códigos -1 (nulos) apuntan a él
+    tabla = np.array([normalizar(valor) for valor in unicas] + [np.nan], dtype=object)
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name, dtype=serie.dtype)
+
+def normalizar_columnas(df, especificacion):
+    """
+    Normaliza varias columnas de texto a partir de una especificación declarativa.
+    
+    Cada regla admite los pasos, en este orden:
+        'recortar' (bool, por defecto True): quita espacios al inicio y al final
+        'caso' ('minusculas' o 'mayusculas'): convierte mayúsculas/minúsculas
+        'sin_acentos' (bool): plegado NFKD que elimina tildes y diacríticos
+        'canonicos' (dict): reemplaza variantes por su valor canónico tras los pasos anteriores
+    
+    Args:
+        df (pd.DataFrame): DataFrame a procesar
+        especificacion (dict): Diccionario columna -> regla (ver NORMALIZACION_USUARIOS)
+    
+    Returns:
+        pd.DataFrame: DataFrame con las columnas normalizadas
+    """
+    for columna, regla in especificacion.items():
+        if columna not in df.columns:
+            continue
+        serie = df[columna]
+        if (isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == 'object'
+                or pd.api.types.is_string_dtype(serie.dtype)):
+            df[columna] = normalizar_serie(serie, regla)
+    return df
+
 def manejar_nulos(df, columna):
     """
     Reemplaza los valores nulos en la columna especificada con 'Sin información'.
@@ -51,10 +618,7 @@ def estandarizar_texto(df, columna):
     Returns:
         pd.DataFrame: DataFrame con texto estandarizado
     """
-    if columna in df.columns and df[columna].dtype == 'object':
-        # Quitar espacios al inicio y final, convertir a minúsculas
-        df[columna] = df[columna].str.strip().str.lower()
-    return df
+    return normalizar_columnas(df, {columna: {'caso': 'minusculas'}})
 
 def limpieza_especifica(df, columna):
     """
@@ -68,10 +632,7 @@ def limpieza_especifica(df, columna):
     Returns:
         pd.DataFrame: DataFrame con valores uniformes
     """
-    if columna in df.columns and df[columna].dtype == 'object':
-        # Convertir a MAYÚSCULAS y quitar espacios
-        df[columna] = df[columna].str.upper().str.strip()
-    return df
+    return normalizar_columnas(df, {columna: {'caso': 'mayusculas'}})
 
 def validar_datos(df_usuarios, df_interacciones):
     """
@@ -95,7 +656,9 @@ def validar_datos(df_usuarios, df_interacciones):
         validacion['usuarios_validos'] = False
         validacion['errores'].append('DataFrame de usuarios está vacío')
     
-    columnas_requeridas_usuarios = ['id_usuario', 'nombre_usuario', 'edad']
+    # El nombre visible puede venir como 'nombre' (usuarios.csv) o 'nombre_usuario'
+    columna_nombre = 'nombre' if 'nombre' in df_usuarios.columns else 'nombre_usuario'
+    columnas_requeridas_usuarios = ['id_usuario', columna_nombre, 'edad']
     for col in columnas_requeridas_usuarios:
         if col not in df_usuarios.columns:
             validacion['usuarios_validos'] = False
@@ -127,18 +690,12 @@ def limpiar_datos_completo(df_usuarios, df_interacciones):
     """
     # Limpiar usuarios
     df_usuarios = manejar_nulos(df_usuarios, 'biografia')
-    df_usuarios = estandarizar_texto(df_usuarios, 'intereses')
-    df_usuarios = estandarizar_texto(df_usuarios, 'nombre_usuario')
-    df_usuarios = estandarizar_texto(df_usuarios, 'ciudad')
+    df_usuarios = normalizar_columnas(df_usuarios, NORMALIZACION_USUARIOS)
     
     # Limpiar interacciones
-    df_interacciones = limpieza_especifica(df_interacciones, 'tipo')
-    
-    # Convertir columna match a booleano si es string
-    if df_interacciones['match'].dtype == 'object':
-        df_interacciones['match'] = df_interacciones['match'].map({
-            'true': True, 'True': True, 'TRUE': True,
-            'false': False, 'False': False, 'FALSE': False
-        })
+    df_interacciones = normalizar_columnas(df_interacciones, NORMALIZACION_INTERACCIONES)
+    
+    # Banderas a booleano nullable (los valores que no se entienden quedan como <NA>)
+    convertir_banderas(df_interacciones, BANDERAS_INTERACCIONES)
     
     return df_usuarios, df_interacciones
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+Módulo de análisis de publicaciones de voz para la app de citas.
+Calcula la relación publicado/borrador, los percentiles de duración por estado, ciudad
+y usuario, la cadencia de publicación y los tags más usados recorriendo el archivo de
+publicaciones por bloques. Como en agregacion, cada bloque se suma a un estado parcial
+que se puede combinar con otros; las duraciones se guardan como histogramas
+(grupo, segundos) -> publicaciones, así que los percentiles son exactos sin guardar
+cada publicación en memoria.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.agregacion import (
+    codigos_dia, construir_indice_usuarios, fechas_desde_codigos, posiciones_de, resolver_nombres,
+    top_k_conteos, conteo_por_id, sumar_conteos, DIA_NULO
+)
+from src.preprocesamiento import iterar_publicaciones, normalizar_serie, TAMANO_CHUNK
+from src.instrumentacion import evento, etapa
+
+# Ruta por defecto del archivo de publicaciones
+PUBLICACIONES_PATH = 'data/publicaciones.json'
+
+# Percentiles de duración que se informan (p50 = mediana)
+PERCENTILES_DURACION = (0.25, 0.5, 0.75, 0.9)
+
+# Estados de publicación tras pasarlos a mayúsculas
+ESTADO_PUBLICADO = 'PUBLICADO'
+ESTADO_BORRADOR = 'BORRADOR'
+
+# Normalización de los tags: 'MUSICA', ' música ' y 'musica' cuentan igual
+REGLA_TAGS = {'caso': 'minusculas', 'sin_acentos': True}
+
+def nuevo_estado_publicaciones():
+    """
+    Crea un estado de publicaciones vacío.
+
+    Returns:
+        dict: Contadores e histogramas listos para acumular bloques
+    """
+    return {
+        'total_publicaciones': 0,
+        'duracion_por_estado': pd.Series(dtype='int64'),   # (estado, segundos) -> publicaciones
+        'duracion_por_ciudad': pd.Series(dtype='int64'),   # (ciudad, segundos) -> publicaciones
+        'publicadas_por_ciudad': pd.Series(dtype='int64'),
+        'publicaciones_por_usuario': pd.Series(dtype='int64'),
+        'publicadas_por_usuario': pd.Series(dtype='int64'),
+        'segundos_por_usuario': pd.Series(dtype='int64'),
+        'tags': pd.Series(dtype='int64'),
+        'publicaciones_por_dia': pd.Series(dtype='int64')
+    }
+
+def _histograma(codigos, etiquetas, segundos, nombre):
+    """
+    Cuenta publicaciones por (grupo, segundos), omitiendo grupos o duraciones faltantes.
+
+    Se cuentan pares de enteros (código del grupo y segundos empaquetados en un int64);
+    las etiquetas de texto solo se buscan para los pares distintos.
+    """
+    validas = (codigos >= 0) & (segundos >= 0)
+    claves, conteos = np.unique((codigos[validas] << 32) | segundos[validas], return_counts=True)
+    indice = pd.MultiIndex.from_arrays(
+        [np.asarray(etiquetas, dtype=object)[claves >> 32], claves & 0xFFFFFFFF], names=[nombre, 'segundos'])
+    return pd.Series(conteos, index=indice, name='count')
+
+def acumular_publicaciones(estado, df_bloque, indice_usuarios):
+    """
+    Agrega un bloque de publicaciones al estado en una sola pasada.
+
+    Args:
+        estado (dict): Estado creado con nuevo_estado_publicaciones()
+        df_bloque (pd.DataFrame): Bloque de publicaciones (ver ESQUEMA_PUBLICACIONES)
+        indice_usuarios (dict): Índice creado con agregacion.construir_indice_usuarios
+
+    Returns:
+        dict: El mismo estado actualizado
+    """
+    # El estado se normaliza sobre sus categorías: 'publicado' y 'PUBLICADO' son uno solo
+    codigos_estado, estados = pd.factorize(normalizar_serie(df_bloque['estado'], {'caso': 'mayusculas'}))
+    segundos = pd.to_numeric(df_bloque['duracion_segundos'], errors='coerce').fillna(-1).to_numpy(dtype='int64')
+    ids = df_bloque['id_usuario'].to_numpy(dtype='int64')
+    publicada = np.isin(codigos_estado, np.flatnonzero(np.asarray(estados) == ESTADO_PUBLICADO))
+
+    estado['total_publicaciones'] += len(df_bloque)
+    estado['duracion_por_estado'] = sumar_conteos(
+        estado['duracion_por_estado'], _histograma(codigos_estado, estados, segundos, 'estado'))
+
+    # Ciudad del autor por búsqueda en el índice; los usuarios desconocidos no tienen ciudad
+    posiciones = posiciones_de(indice_usuarios, ids)
+    codigos = np.full(len(ids), -1, dtype='int64')
+    conocidos = posiciones >= 0
+    codigos[conocidos] = indice_usuarios['codigos_ciudad'][posiciones[conocidos]]
+    ciudades = indice_usuarios['ciudades']
+    estado['duracion_por_ciudad'] = sumar_conteos(
+        estado['duracion_por_ciudad'], _histograma(codigos, ciudades, segundos, 'ciudad'))
+    codigos_publicadas = codigos[publicada & (codigos >= 0)]
+    conteos = np.bincount(codigos_publicadas, minlength=len(ciudades))
+    # Ciudades en orden de primera aparición, igual en un solo bloque o en varios
+    presentes = pd.unique(codigos_publicadas)
+    estado['publicadas_por_ciudad'] = sumar_conteos(
+        estado['publicadas_por_ciudad'],
+        pd.Series(conteos[presentes], index=pd.Index(np.asarray(ciudades)[presentes], name='ciudad'), name='count'))
+
+    # Por usuario solo se guardan sumas: publicaciones, publicadas y segundos grabados
+    estado['publicaciones_por_usuario'] = sumar_conteos(estado['publicaciones_por_usuario'], conteo_por_id(ids))
+    estado['publicadas_por_usuario'] = sumar_conteos(
+        estado['publicadas_por_usuario'], conteo_por_id(ids[publicada]))
+    con_duracion = segundos >= 0
+    suma_segundos = pd.Series(segundos[con_duracion]).groupby(ids[con_duracion], sort=False).sum()
+    estado['segundos_por_usuario'] = sumar_conteos(estado['segundos_por_usuario'], suma_segundos)
+
+    # Tags: se aplanan las listas y cada tag distinto se normaliza una sola vez
+    if 'tags' in df_bloque.columns:
+        tags = normalizar_serie(df_bloque['tags'].explode().dropna().astype(object), REGLA_TAGS)
+        estado['tags'] = sumar_conteos(estado['tags'], tags[tags != ''].value_counts(sort=False))
+
+    # Publicaciones por día (solo si el archivo trae fecha)
+    if 'fecha' in df_bloque.columns:
+        dias = codigos_dia(df_bloque['fecha'])
+        unicos, conteos = np.unique(dias[dias != DIA_NULO], return_counts=True)
+        por_dia = pd.Series(conteos, index=fechas_desde_codigos(unicos), name='count')
+        estado['publicaciones_por_dia'] = sumar_conteos(estado['publicaciones_por_dia'], por_dia)
+    return estado
+
+def combinar_estados_publicaciones(estado_a, estado_b):
+    """
+    Combina dos estados parciales (por ejemplo, de dos archivos o dos procesos).
+
+    Args:
+        estado_a (dict): Primer estado
+        estado_b (dict): Segundo estado
+
+    Returns:
+        dict: Nuevo estado con los conteos de ambos
+    """
+    combinado = nuevo_estado_publicaciones()
+    for clave, valor in combinado.items():
+        if isinstance(valor, pd.Series):
+            combinado[clave] = sumar_conteos(sumar_conteos(valor, estado_a[clave]), estado_b[clave])
+        else:
+            combinado[clave] = estado_a[clave] + estado_b[clave]
+    return combinado
+
+def percentiles_histograma(histograma, percentiles=PERCENTILES_DURACION):
+    """
+    Calcula percentiles exactos por grupo a partir de un histograma (grupo, valor) -> conteo.
+
+    El percentil p de un grupo es el menor valor cuyo acumulado alcanza p * total, igual
+    que np.percentile(..., method='inverted_cdf') sobre los valores sin agrupar.
+
+    Args:
+        histograma (pd.Series): Conteos con índice de dos niveles (grupo, valor)
+        percentiles (tuple): Fracciones entre 0 y 1
+
+    Returns:
+        pd.DataFrame: Una fila por grupo con 'publicaciones', 'media' y 'p25', 'p50', ...
+            ordenada por número de publicaciones
+    """
+    columnas = ['publicaciones', 'media'] + [f'p{round(p * 100)}' for p in percentiles]
+    if histograma.empty:
+        return pd.DataFrame(columns=columnas)
+
+    histograma = histograma.sort_index()
+    grupo = histograma.index.get_level_values(0)
+    valores = pd.Series(histograma.index.get_level_values(1), index=histograma.index)
+    por_grupo = histograma.groupby(level=0, sort=False)
+    acumulado = por_grupo.cumsum().to_numpy()
+    totales = por_grupo.sum()
+
+    tabla = pd.DataFrame({'publicaciones': totales,
+                          'media': (histograma * valores).groupby(level=0, sort=False).sum() / totales})
+    total_fila = totales.reindex(grupo).to_numpy()
+    for p in percentiles:
+        # Primera fila de cada grupo en la que el acumulado llega al objetivo
+        alcanza = acumulado >= np.ceil(p * total_fila)
+        tabla[f'p{round(p * 100)}'] = valores[alcanza].groupby(level=0, sort=False).first()
+    tabla.index.name = histograma.index.names[0]
+    return tabla[columnas].sort_values('publicaciones', ascending=False, kind='stable')
+
+def _percentiles_valores(serie, percentiles=PERCENTILES_DURACION):
+    """Percentiles (inverted_cdf) de los valores de una serie como dict 'p50' -> valor."""
+    if serie.empty:
+        return {f'p{round(p * 100)}': 0.0 for p in percentiles}
+    valores = np.percentile(serie.to_numpy(dtype='float64'), [p * 100 for p in percentiles],
+                            method='inverted_cdf')
+    return {f'p{round(p * 100)}': float(valor) for p, valor in zip(percentiles, valores)}
+
+def resultados_publicaciones(estado, top_k=5):
+    """
+    Convierte un estado de publicaciones en las métricas del análisis.
+
+    Los percentiles por estado y por ciudad son exactos. Por usuario se informa la
+    distribución de la duración media de cada autor (guardar un histograma por usuario
+    no escala con millones de autores) y el detalle de los más activos.
+
+    Args:
+        estado (dict): Estado acumulado
+        top_k (int): Número de usuarios y tags en los rankings
+
+    Returns:
+        dict: Métricas de publicaciones
+    """
+    total = estado['total_publicaciones']
+    duracion_estado = percentiles_histograma(estado['duracion_por_estado'])
+    publicadas = int(duracion_estado['publicaciones'].get(ESTADO_PUBLICADO, 0))
+    borradores = int(duracion_estado['publicaciones'].get(ESTADO_BORRADOR, 0))
+
+    por_usuario = estado['publicaciones_por_usuario']
+    segundos = estado['segundos_por_usuario']
+    duracion_media_usuario = (segundos / por_usuario.reindex(segundos.index)).rename('duracion_media')
+    # Empates por id, sin depender de cómo se partieron los bloques
+    activos = top_k_conteos(por_usuario.sort_index(), top_k)
+    usuarios_activos = pd.DataFrame({
+        'publicaciones': activos,
+        'publicadas': estado['publicadas_por_usuario'].reindex(activos.index, fill_value=0),
+        'duracion_media': duracion_media_usuario.reindex(activos.index)
+    })
+
+    por_dia = estado['publicaciones_por_dia'].sort_index()
+    return {
+        'total_publicaciones': total,
+        'total_publicadas': publicadas,
+        'total_borradores': borradores,
+        'tasa_publicacion': (publicadas / total) * 100 if total else 0.0,
+        'relacion_publicado_borrador': publicadas / borradores if borradores else None,
+        'publicaciones_por_estado': duracion_estado['publicaciones'].astype('int64'),
+        'duracion_por_estado': duracion_estado,
+        'duracion_por_ciudad': percentiles_histograma(estado['duracion_por_ciudad']),
+        'duracion_por_usuario': _percentiles_valores(duracion_media_usuario),
+        'publicadas_por_ciudad': estado['publicadas_por_ciudad'].sort_values(ascending=False, kind='stable'),
+        'usuarios_que_publican': len(por_usuario),
+        'publicaciones_por_usuario': _percentiles_valores(por_usuario),
+        'usuarios_mas_publican': usuarios_activos,
+        'top_tags': top_k_conteos(estado['tags'], top_k),
+        'publicaciones_por_dia': por_dia,
+        'promedio_publicaciones_dia': float(por_dia.mean()) if len(por_dia) else None
+    }
+
+def analizar_publicaciones(df_usuarios, ruta_publicaciones, tamano_chunk=TAMANO_CHUNK, top_k=5,
+                           indice_usuarios=None):
+    """
+    Recorre el archivo de publicaciones por bloques y calcula sus métricas.
+
+    La memoria depende del número de grupos (estados, ciudades, usuarios, tags y
+    duraciones distintas), no del número de publicaciones.
+
+    Args:
+        df_usuarios (pd.DataFrame): DataFrame de usuarios ya limpio (para la ciudad y
+            el nombre de cada autor)
+        ruta_publicaciones (str): Ruta al arreglo JSON o archivo JSON Lines
+        tamano_chunk (int): Número de publicaciones por bloque
+        top_k (int): Número de usuarios y tags en los rankings
+        indice_usuarios (dict): Índice ya construido (opcional)
+
+    Returns:
+        dict: Métricas (ver resultados_publicaciones), más 'nombres_usuarios_mas_publican'
+    """
+    if indice_usuarios is None:
+        indice_usuarios = construir_indice_usuarios(df_usuarios)
+
+    with etapa('publicaciones', "\n🎙️ Analizando publicaciones de voz..."):
+        estado = nuevo_estado_publicaciones()
+        for bloque in iterar_publicaciones(ruta_publicaciones, tamano_chunk):
+            acumular_publicaciones(estado, bloque, indice_usuarios)
+        resultados = resultados_publicaciones(estado, top_k)
+        resultados['nombres_usuarios_mas_publican'] = resolver_nombres(
+            df_usuarios, indice_usuarios, resultados['usuarios_mas_publican'].index)
+        evento('publicaciones_analizadas',
+               f"   ✓ {resultados['total_publicaciones']} publicaciones "
+               f"({resultados['tasa_publicacion']:.1f}% publicadas)",
+               publicaciones=resultados['total_publicaciones'],
+               tasa_publicacion=round(resultados['tasa_publicacion'], 2))
+    return resultados
@@ -0,0 +1,306 @@
+"""
+Servicio HTTP residente del reporte de la app de citas.
+
+Mantiene en memoria los datos limpios, los resultados del análisis, los resúmenes
+de los gráficos y las tablas, y los recalcula solo cuando cambian los archivos de
+entrada (un hilo vigila su tamaño y fecha de modificación). Endpoints:
+
+    GET /                         Reporte HTML completo (?formato=svg para gráficos SVG)
+    GET /api/resultados           Indicadores del análisis en JSON
+    GET /graficos/<clave>.png     Un gráfico (también .svg, o .json para sus datos)
+    GET /salud                    Versión de los datos y archivos vigilados
+    GET /estilos.css              Hoja de estilos del reporte
+
+Las respuestas se guardan por versión de los datos, y las solicitudes iguales que
+llegan a la vez se calculan una sola vez (las demás esperan el mismo resultado).
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from src.analisis import realizar_analisis, USUARIOS_PATH, INTERACCIONES_PATH
+from src.cache_datos import huella_archivo
+from src.cache_graficos import DIRECTORIO_CACHE_GRAFICOS
+from src.generar_reporte import calcular_resumenes_graficos, generar_html_reporte, preparar_tablas
+from src.instrumentacion import evento, etapa
+from src.particiones import es_particionada, listar_particiones
+from src.publicaciones import analizar_publicaciones, PUBLICACIONES_PATH
+from src.visualizacion import inicializar_dibujo, iterar_graficos, resumen_a_json, DIBUJOS_REPORTE, TIPOS_MIME
+
+# Segundos entre revisiones de los archivos de entrada
+INTERVALO_VIGILANCIA = 2.0
+
+# Hoja de estilos que enlaza el reporte (relativa al directorio de trabajo)
+RUTA_ESTILOS = 'estilos.css'
+
+_config = {
+    'ruta_usuarios': USUARIOS_PATH,
+    'ruta_interacciones': INTERACCIONES_PATH,
+    'ruta_publicaciones': PUBLICACIONES_PATH,   # Opcional: sin archivo no hay sección de publicaciones
+    'directorio_cache_graficos': DIRECTORIO_CACHE_GRAFICOS
+}
+
+_estado = {
+    'datos': None,        # Datos vigentes (ver _cargar); se reemplazan enteros al recargar
+    'respuestas': {},     # (versión, recurso) -> (cuerpo en bytes, tipo de contenido)
+    'en_curso': {},       # Clave -> Future de un cálculo que ya está corriendo
+    'detener': threading.Event()
+}
+
+# Protege 'respuestas' y 'en_curso'
+_bloqueo = threading.Lock()
+
+# pyplot y las etapas de la instrumentación no son seguros entre hilos: las recargas
+# y los dibujos se hacen de a uno (las respuestas ya calculadas no lo necesitan)
+_bloqueo_trabajo = threading.Lock()
+
+def calcular_una_vez(clave, funcion):
+    """
+    Ejecuta 'funcion' una sola vez aunque varios hilos la pidan a la vez con la misma clave.
+
+    El primer hilo la calcula; los que llegan mientras tanto esperan y reciben el mismo
+    resultado (o la misma excepción).
+
+    Args:
+        clave: Identificador del cálculo (hashable)
+        funcion (callable): Función sin argumentos
+
+    Returns:
+        Valor devuelto por la función
+    """
+    with _bloqueo:
+        futuro = _estado['en_curso'].get(clave)
+        propio = futuro is None
+        if propio:
+            futuro = _estado['en_curso'][clave] = Future()
+    if propio:
+        try:
+            futuro.set_result(funcion())
+        except BaseException as error:
+            futuro.set_exception(error)
+        finally:
+            with _bloqueo:
+                del _estado['en_curso'][clave]
+    return futuro.result()
+
+def _archivos_vigilados():
+    """
+    Archivos de entrada actuales (las particiones se listan en cada revisión).
+
+    Las publicaciones se vigilan solo si el archivo existe; si aparece o desaparece,
+    cambian las huellas y los datos se recargan.
+    """
+    interacciones = _config['ruta_interacciones']
+    rutas = listar_particiones(interacciones) if es_particionada(interacciones) else [interacciones]
+    publicaciones = _config['ruta_publicaciones']
+    if publicaciones and os.path.exists(publicaciones):
+        rutas.append(publicaciones)
+    return [_config['ruta_usuarios']] + rutas
+
+def _huellas():
+    """Tamaño y fecha de modificación de cada archivo de entrada."""
+    return tuple((h['ruta'], h['tamano'], h['mtime_ns']) for h in map(huella_archivo, _archivos_vigilados()))
+
+def _cargar(huellas):
+    """Carga y analiza los datos, y prepara los resúmenes de gráficos y las tablas."""
+    anteriores = _estado['datos']
+    with _bloqueo_trabajo, etapa('recarga', "\n🔄 Cargando datos del servicio..."):
+        inicio = time.perf_counter()
+        _, df_usuarios, df_interacciones, resultados = realizar_analisis(
+            _config['ruta_usuarios'], _config['ruta_interacciones'], usar_cache=True)
+        # Misma sección "Publicaciones de Voz" que generar_reporte
+        publicaciones = _config['ruta_publicaciones']
+        if publicaciones and os.path.exists(publicaciones):
+            resultados['publicaciones'] = analizar_publicaciones(df_usuarios, publicaciones)
+        datos = {
+            'version': anteriores['version'] + 1 if anteriores else 1,
+            'huellas': huellas,
+            'cargado': time.time(),
+            'df_usuarios': df_usuarios,
+            'df_interacciones': df_interacciones,
+            'resultados': resultados,
+            'resumenes': calcular_resumenes_graficos(df_usuarios, df_interacciones, resultados),
+            'tablas': preparar_tablas(df_usuarios, df_interacciones, resultados)
+        }
+    _estado['datos'] = datos
+    with _bloqueo:
+        # Las respuestas de versiones anteriores ya no se van a pedir
+        _estado['respuestas'] = {clave: valor for clave, valor in _estado['respuestas'].items()
+                                 if clave[0] == datos['version']}
+    evento('datos_recargados', f"   ✓ Datos listos (versión {datos['version']})",
+           version=datos['version'], segundos=round(time.perf_counter() - inicio, 4))
+    return datos
+
+def datos_actuales():
+    """Devuelve los datos vigentes, recargándolos si cambiaron los archivos de entrada."""
+    huellas = _huellas()
+    datos = _estado['datos']
+    if datos is not None and datos['huellas'] == huellas:
+        return datos
+    return calcular_una_vez(('datos', huellas), lambda: _cargar(huellas))
+
+def _vigilar():
+    """Hilo de fondo: recarga los datos en cuanto cambian los archivos, antes de la próxima solicitud."""
+    while not _estado['detener'].wait(INTERVALO_VIGILANCIA):
+        try:
+            datos_actuales()
+        except Exception as error:  # Archivo a medio escribir, borrado, etc.: se reintenta
+            evento('error_recarga', f"   ⚠️ No se pudieron recargar los datos: {error}", error=str(error))
+
+def _a_json(valor):
+    """Convierte resultados del análisis (series, DataFrames, escalares de numpy) a tipos de json."""
+    if isinstance(valor, pd.DataFrame):
+        return {str(indice): _a_json(fila) for indice, fila in valor.to_dict(orient='index').items()}
+    if isinstance(valor, dict):
+        return {str(clave): _a_json(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_a_json(v) for v in valor]
+    return resumen_a_json(valor)
+
+def respuesta(recurso, funcion):
+    """
+    Devuelve la respuesta de un recurso para los datos vigentes, calculándola como mucho una vez.
+
+    Args:
+        recurso (tuple): Identificador del recurso (p. ej. ('grafico', 'edad', 'png'))
+        funcion (callable): Recibe los datos vigentes y devuelve (cuerpo en bytes, tipo de contenido)
+
+    Returns:
+        tuple: (cuerpo en bytes, tipo de contenido)
+    """
+    datos = datos_actuales()
+    clave = (datos['version'],) + tuple(recurso)
+    guardada = _estado['respuestas'].get(clave)
+    if guardada is not None:
+        return guardada
+
+    def calcular():
+        resultado = funcion(datos)
+        with _bloqueo:
+            _estado['respuestas'][clave] = resultado
+        return resultado
+    return calcular_una_vez(clave, calcular)
+
+def _json(objeto):
+    return json.dumps(objeto, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+
+def _resultados(datos):
+    return _json(_a_json(datos['resultados']))
+
+def _grafico(clave, formato):
+    def dibujar(datos):
+        with _bloqueo_trabajo:
+            (_, imagen), = iterar_graficos({clave: datos['resumenes'][clave]}, formato=formato,
+                                           directorio_cache=_config['directorio_cache_graficos'])
+        return base64.b64decode(imagen), TIPOS_MIME[formato]
+    return dibujar
+
+def _datos_grafico(clave):
+    return lambda datos: _json(resumen_a_json(datos['resumenes'][clave]))
+
+def _reporte(formato):
+    def generar(datos):
+        with _bloqueo_trabajo:
+            html = generar_html_reporte(
+                datos['df_usuarios'], datos['df_interacciones'], None, datos['resultados'], datos['tablas'],
+                directorio_cache_graficos=_config['directorio_cache_graficos'], formato_graficos=formato)
+        return html.encode('utf-8'), 'text/html; charset=utf-8'
+    return generar
+
+class ManejadorReporte(BaseHTTPRequestHandler):
+    """Atiende las solicitudes GET del servicio (ver la documentación del módulo)."""
+
+    def do_GET(self):
+        inicio = time.perf_counter()
+        url = urlparse(self.path)
+        parametros = parse_qs(url.query)
+        try:
+            estado, cuerpo, tipo = 200, *self._resolver(url.path, parametros)
+        except KeyError as error:
+            estado, (cuerpo, tipo) = 404, _json({'error': f'No encontrado: {error.args[0]}'})
+        except Exception as error:
+            evento('error_solicitud', f"   ✗ {url.path}: {error}", ruta=url.path, error=str(error))
+            estado, (cuerpo, tipo) = 500, _json({'error': str(error)})
+
+        self.send_response(estado)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+        evento('solicitud', ruta=url.path, estado=estado, bytes=len(cuerpo),
+               segundos=round(time.perf_counter() - inicio, 4))
+
+    def _resolver(self, ruta, parametros):
+        """Devuelve (cuerpo, tipo de contenido) de una ruta; KeyError si no existe."""
+        if ruta in ('/', '/reporte.html'):
+            formato = parametros.get('formato', ['png'])[0]
+            if formato not in TIPOS_MIME:
+                raise KeyError(f'formato {formato}')
+            return respuesta(('reporte', formato), _reporte(formato))
+        if ruta == '/api/resultados':
+            return respuesta(('resultados',), _resultados)
+        if ruta.startswith('/graficos/'):
+            clave, _, extension = ruta[len('/graficos/'):].rpartition('.')
+            if clave not in DIBUJOS_REPORTE or clave not in datos_actuales()['resumenes']:
+                raise KeyError(f'gráfico {clave}')
+            if extension == 'json':
+                return respuesta(('datos_grafico', clave), _datos_grafico(clave))
+            if extension not in TIPOS_MIME:
+                raise KeyError(f'formato {extension}')
+            return respuesta(('grafico', clave, extension), _grafico(clave, extension))
+        if ruta == '/salud':
+            datos = datos_actuales()
+            return _json({'version': datos['version'], 'cargado': datos['cargado'],
+                          'archivos': [h[0] for h in datos['huellas']]})
+        if ruta == '/estilos.css' and os.path.exists(RUTA_ESTILOS):
+            with open(RUTA_ESTILOS, 'rb') as f:
+                return f.read(), 'text/css; charset=utf-8'
+        raise KeyError(ruta)
+
+    def log_message(self, formato, *args):
+        # Cada solicitud ya queda registrada como evento 'solicitud'
+        pass
+
+def servir(host='127.0.0.1', puerto=8000, ruta_usuarios=USUARIOS_PATH, ruta_interacciones=INTERACCIONES_PATH,
+           directorio_cache_graficos=DIRECTORIO_CACHE_GRAFICOS, ruta_publicaciones=PUBLICACIONES_PATH):
+    """
+    Carga los datos y atiende solicitudes hasta que se interrumpa el proceso (Ctrl+C).
+
+    Args:
+        host (str): Dirección en la que escuchar
+        puerto (int): Puerto (0 elige uno libre)
+        ruta_usuarios (str): CSV de usuarios
+        ruta_interacciones (str): Archivo de interacciones, o directorio/patrón glob de particiones
+        directorio_cache_graficos (str): Caché de gráficos en disco (None la desactiva)
+        ruta_publicaciones (str): Archivo de publicaciones de voz (si no existe, el
+            reporte no incluye su sección)
+    """
+    # Los gráficos se dibujan en los hilos del servidor: backend sin ventana
+    inicializar_dibujo()
+    _config.update(ruta_usuarios=ruta_usuarios, ruta_interacciones=ruta_interacciones,
+                   ruta_publicaciones=ruta_publicaciones, directorio_cache_graficos=directorio_cache_graficos)
+    datos_actuales()
+
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorReporte)
+    servidor.daemon_threads = True
+    _estado['detener'].clear()
+    vigilante = threading.Thread(target=_vigilar, name='vigilancia-datos', daemon=True)
+    vigilante.start()
+    evento('servicio_iniciado', f"\n🌐 Servicio en http://{host}:{servidor.server_address[1]}/ (Ctrl+C para detener)",
+           host=host, puerto=servidor.server_address[1])
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _estado['detener'].set()
+        servidor.server_close()
+        evento('servicio_detenido', "\n👋 Servicio detenido")
@@ -0,0 +1,234 @@
+"""
+Módulo de sketches (resúmenes aproximados) para la app de citas.
+Permiten calcular el ranking de usuarios más activos y el número de usuarios
+distintos con memoria acotada, sin guardar un contador por cada id_usuario.
+Todos los sketches se pueden combinar (por bloque, por partición) y serializar a JSON.
+
+- Frecuentes (Misra-Gries, equivalente a Space-Saving): con 'capacidad' contadores,
+  cada conteo estimado c cumple c <= real <= c + error, con
+  error = (n - suma de contadores) / (capacidad + 1) <= n / (capacidad + 1).
+  Todo elemento con más de n / (capacidad + 1) apariciones está en el sketch.
+- HyperLogLog: con 2**precision registros el error relativo típico (desviación
+  estándar) es 1.04 / sqrt(2**precision); con precision=12 ~1.6 %, con 14 ~0.8 %.
+"""
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+# Contadores del sketch de frecuentes
+CAPACIDAD_FRECUENTES = 1024
+
+# Bits de índice de registro de HyperLogLog (2**PRECISION_HLL registros de 1 byte)
+PRECISION_HLL = 12
+
+# ---------------------------------------------------------------------------
+# Frecuentes (Misra-Gries)
+# ---------------------------------------------------------------------------
+
+def nuevo_frecuentes(capacidad=CAPACIDAD_FRECUENTES):
+    """
+    Crea un sketch de elementos frecuentes vacío.
+
+    Args:
+        capacidad (int): Número máximo de contadores
+
+    Returns:
+        dict: 'capacidad', 'n' (elementos vistos) y 'conteos' (serie elemento -> conteo)
+    """
+    return {'capacidad': capacidad, 'n': 0, 'conteos': pd.Series(dtype='int64')}
+
+def _recortar(conteos, capacidad):
+    """Deja como máximo 'capacidad' contadores restando el (capacidad+1)-ésimo mayor a todos."""
+    if len(conteos) <= capacidad:
+        return conteos
+    valores = conteos.to_numpy()
+    umbral = np.partition(valores, len(valores) - capacidad - 1)[len(valores) - capacidad - 1]
+    restantes = conteos - umbral
+    return restantes[restantes > 0]
+
+def agregar_conteos_frecuentes(sketch, conteos):
+    """
+    Agrega al sketch los conteos exactos de un bloque (p. ej. interacciones por usuario).
+
+    Args:
+        sketch (dict): Sketch creado con nuevo_frecuentes
+        conteos (pd.Series): Elemento -> apariciones en el bloque
+
+    Returns:
+        dict: El mismo sketch actualizado
+    """
+    bloque = {'capacidad': sketch['capacidad'], 'n': int(conteos.sum()), 'conteos': conteos.astype('int64')}
+    combinado = combinar_frecuentes(sketch, bloque)
+    sketch['n'], sketch['conteos'] = combinado['n'], combinado['conteos']
+    return sketch
+
+def combinar_frecuentes(sketch_a, sketch_b):
+    """
+    Combina dos sketches de frecuentes (el error de cada uno se suma).
+
+    Returns:
+        dict: Nuevo sketch con la menor de las dos capacidades
+    """
+    capacidad = min(sketch_a['capacidad'], sketch_b['capacidad'])
+    if sketch_a['conteos'].empty:
+        conteos = sketch_b['conteos']
+    elif sketch_b['conteos'].empty:
+        conteos = sketch_a['conteos']
+    else:
+        conteos = sketch_a['conteos'].add(sketch_b['conteos'], fill_value=0).astype('int64')
+    return {'capacidad': capacidad, 'n': sketch_a['n'] + sketch_b['n'],
+            'conteos': _recortar(conteos, capacidad)}
+
+def error_frecuentes(sketch):
+    """Cota superior de lo que puede faltar a cada conteo estimado."""
+    return (sketch['n'] - int(sketch['conteos'].sum())) / (sketch['capacidad'] + 1)
+
+def top_frecuentes(sketch, k):
+    """
+    Devuelve los k elementos con mayor conteo estimado, de mayor a menor.
+
+    Args:
+        sketch (dict): Sketch de frecuentes
+        k (int): Número de elementos
+
+    Returns:
+        pd.Series: Elemento -> conteo estimado (cota inferior del real)
+    """
+    return sketch['conteos'].sort_values(ascending=False, kind='stable').head(k)
+
+def frecuentes_a_dict(sketch):
+    """Convierte el sketch en un diccionario serializable con json."""
+    return {'capacidad': sketch['capacidad'], 'n': int(sketch['n']),
+            'nombre': sketch['conteos'].index.name,
+            'elementos': sketch['conteos'].index.tolist(),
+            'conteos': sketch['conteos'].to_numpy(dtype='int64').tolist()}
+
+def frecuentes_desde_dict(datos):
+    """Reconstruye un sketch guardado con frecuentes_a_dict."""
+    sketch = nuevo_frecuentes(datos['capacidad'])
+    sketch['n'] = datos['n']
+    if datos['elementos']:
+        sketch['conteos'] = pd.Series(datos['conteos'], index=pd.Index(datos['elementos'], name=datos['nombre']),
+                                      dtype='int64', name='count')
+    return sketch
+
+# ---------------------------------------------------------------------------
+# HyperLogLog
+# ---------------------------------------------------------------------------
+
+def nuevo_hll(precision=PRECISION_HLL):
+    """
+    Crea un HyperLogLog vacío.
+
+    Args:
+        precision (int): Bits del índice de registro (entre 4 y 18)
+
+    Returns:
+        dict: 'precision' y 'registros' (np.uint8 de tamaño 2**precision)
+    """
+    return {'precision': precision, 'registros': np.zeros(1 << precision, dtype=np.uint8)}
+
+def _longitud_bits(x):
+    """Número de bits significativos de cada entero sin signo (0 para el 0), exacto."""
+    x = x.copy()
+    longitud = np.zeros(len(x), dtype=np.uint8)
+    for desplazamiento in (32, 16, 8, 4, 2, 1):
+        grandes = x >= np.uint64(1 << desplazamiento)
+        longitud[grandes] += desplazamiento
+        x[grandes] >>= np.uint64(desplazamiento)
+    return longitud + (x > 0)
+
+def _posiciones_y_rangos(valores, precision):
+    """Registro y rango (posición del primer bit en 1) de cada valor según su hash de 64 bits."""
+    hashes = pd.util.hash_array(np.asarray(valores))
+    bits_resto = 64 - precision
+    posiciones = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+    resto = hashes & np.uint64((1 << bits_resto) - 1)
+    rangos = (bits_resto + 1 - _longitud_bits(resto)).astype(np.uint8)
+    return posiciones, rangos
+
+def agregar_hll(hll, valores):
+    """
+    Agrega valores (ids, textos) al HyperLogLog; los repetidos no cambian la estimación.
+
+    Returns:
+        dict: El mismo HyperLogLog actualizado
+    """
+    if len(valores):
+        posiciones, rangos = _posiciones_y_rangos(valores, hll['precision'])
+        np.maximum.at(hll['registros'], posiciones, rangos)
+    return hll
+
+def agregar_hll_por_grupo(hlls, grupos, valores, precision=PRECISION_HLL):
+    """
+    Agrega valores a un HyperLogLog por grupo (p. ej. usuarios distintos por ciudad).
+
+    Todos los grupos del bloque se actualizan con una sola operación sobre una
+    matriz de registros grupo x registro.
+
+    Args:
+        hlls (dict): Grupo -> HyperLogLog (se crean los que falten)
+        grupos (array-like): Grupo de cada valor (los nulos se ignoran)
+        valores (array-like): Valores a contar, alineados con 'grupos'
+        precision (int): Precisión de los HyperLogLog nuevos
+
+    Returns:
+        dict: El mismo diccionario actualizado
+    """
+    codigos, unicos = pd.factorize(pd.Series(grupos))
+    validos = codigos >= 0
+    if not validos.any():
+        return hlls
+    posiciones, rangos = _posiciones_y_rangos(np.asarray(valores)[validos], precision)
+    matriz = np.zeros((len(unicos), 1 << precision), dtype=np.uint8)
+    np.maximum.at(matriz, (codigos[validos], posiciones), rangos)
+    for fila, grupo in enumerate(unicos):
+        hll = hlls.setdefault(grupo, nuevo_hll(precision))
+        np.maximum(hll['registros'], matriz[fila], out=hll['registros'])
+    return hlls
+
+def combinar_hll(hll_a, hll_b):
+    """Combina dos HyperLogLog de la misma precisión (unión de los conjuntos)."""
+    if hll_a['precision'] != hll_b['precision']:
+        raise ValueError('No se pueden combinar HyperLogLog de distinta precisión')
+    return {'precision': hll_a['precision'], 'registros': np.maximum(hll_a['registros'], hll_b['registros'])}
+
+def combinar_hll_por_grupo(hlls_a, hlls_b):
+    """Combina dos diccionarios grupo -> HyperLogLog."""
+    combinados = dict(hlls_a)
+    for grupo, hll in hlls_b.items():
+        combinados[grupo] = combinar_hll(combinados[grupo], hll) if grupo in combinados else hll
+    return combinados
+
+def estimar_hll(hll):
+    """
+    Estima el número de valores distintos.
+
+    Usa conteo lineal cuando la estimación es pequeña (muchos registros en cero).
+
+    Returns:
+        float: Cardinalidad estimada
+    """
+    m = len(hll['registros'])
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimacion = alfa * m * m / np.sum(np.ldexp(1.0, -hll['registros'].astype(np.int64)))
+    ceros = int(np.count_nonzero(hll['registros'] == 0))
+    if estimacion <= 2.5 * m and ceros:
+        estimacion = m * np.log(m / ceros)
+    return float(estimacion)
+
+def estimar_por_grupo(hlls, nombre=None):
+    """Estimaciones de un diccionario grupo -> HyperLogLog, como serie redondeada a enteros."""
+    estimaciones = {grupo: int(round(estimar_hll(hll))) for grupo, hll in hlls.items()}
+    return pd.Series(estimaciones, dtype='int64', name='distintos').rename_axis(nombre)
+
+def hll_a_dict(hll):
+    """Convierte un HyperLogLog en un diccionario serializable con json (registros en base64)."""
+    return {'precision': hll['precision'], 'registros': base64.b64encode(hll['registros'].tobytes()).decode()}
+
+def hll_desde_dict(datos):
+    """Reconstruye un HyperLogLog guardado con hll_a_dict."""
+    registros = np.frombuffer(base64.b64decode(datos['registros']), dtype=np.uint8).copy()
+    return {'precision': datos['precision'], 'registros': registros}
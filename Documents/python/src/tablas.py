@@ -0,0 +1,112 @@
+"""
+Módulo de tablas para el reporte.
+Escribe cada tabla como un archivo de datos compacto (JSON o NDJSON) que DataTables
+carga por AJAX con renderizado diferido, en lugar de incrustar todo el HTML de la
+tabla en el reporte. Las filas se escriben por bloques, sin construir un texto gigante.
+"""
+
+import json
+import os
+from html import escape
+
+import pandas as pd
+
+# Filas convertidas y escritas en cada iteración
+TAMANO_BLOQUE_FILAS = 10_000
+
+# Formatos de archivo de datos soportados
+FORMATOS_TABLA = ('json', 'ndjson')
+
+def _escapar(valor):
+    return escape(valor) if isinstance(valor, str) else valor
+
+def _filas(df, tamano_bloque=TAMANO_BLOQUE_FILAS):
+    """
+    Itera las filas del DataFrame como listas de tipos nativos (None para los nulos).
+
+    Los textos se escapan como en to_html: DataTables escribe cada celda como HTML.
+    """
+    textos = [posicion for posicion, tipo in enumerate(df.dtypes)
+              if tipo == object or isinstance(tipo, (pd.StringDtype, pd.CategoricalDtype))]
+    for inicio in range(0, len(df), tamano_bloque):
+        bloque = df.iloc[inicio:inicio + tamano_bloque].astype(object)
+        for posicion in textos:
+            bloque.isetitem(posicion, bloque.iloc[:, posicion].map(_escapar).astype(object))
+        yield from bloque.where(bloque.notna(), None).to_numpy().tolist()
+
+def _a_texto(fila):
+    return json.dumps(fila, ensure_ascii=False, separators=(',', ':'), default=str)
+
+def escribir_tabla(df, ruta, formato='json', tamano_bloque=TAMANO_BLOQUE_FILAS):
+    """
+    Escribe las filas de una tabla en un archivo de datos para DataTables.
+
+    'json' produce {"data": [[...], ...]} (el formato que DataTables lee por defecto);
+    'ndjson' produce una fila por línea.
+
+    Args:
+        df (pd.DataFrame): Tabla a escribir (el índice no se incluye)
+        ruta (str): Ruta del archivo de salida
+        formato (str): 'json' o 'ndjson'
+        tamano_bloque (int): Filas convertidas en cada iteración
+
+    Returns:
+        int: Número de filas escritas
+    """
+    if formato not in FORMATOS_TABLA:
+        raise ValueError(f'Formato de tabla no soportado: {formato}')
+
+    n_filas = 0
+    with open(ruta, 'w', encoding='utf-8') as f:
+        if formato == 'json':
+            f.write('{"data":[')
+        for fila in _filas(df, tamano_bloque):
+            if formato == 'json':
+                f.write(',\n' if n_filas else '\n')
+                f.write(_a_texto(fila))
+            else:
+                f.write(_a_texto(fila) + '\n')
+            n_filas += 1
+        if formato == 'json':
+            f.write('\n]}\n')
+    return n_filas
+
+def tabla_html_vacia(df, url, id_tabla):
+    """
+    Genera la tabla HTML sin filas (solo encabezados) que DataTables llena desde 'url'.
+
+    Args:
+        df (pd.DataFrame): Tabla de la que se toman los nombres de columna
+        url (str): Ruta del archivo de datos relativa al reporte
+        id_tabla (str): Atributo id de la tabla
+
+    Returns:
+        str: Elemento <table> con data-url
+    """
+    encabezados = ''.join(f'<th>{escape(str(columna))}</th>' for columna in df.columns)
+    return (f'<table id="{id_tabla}" class="table table-striped table-hover" data-url="{escape(url)}">'
+            f'<thead><tr>{encabezados}</tr></thead></table>')
+
+def escribir_tablas(tablas_df, directorio_reporte='.', subdirectorio='tablas', formato='json'):
+    """
+    Escribe todas las tablas del reporte como archivos de datos.
+
+    Args:
+        tablas_df (dict): Nombre de la tabla -> DataFrame (un índice con nombre, como
+            'ciudad', se escribe como primera columna)
+        directorio_reporte (str): Directorio donde se guarda el HTML del reporte
+        subdirectorio (str): Subdirectorio (relativo al reporte) para los archivos de datos
+        formato (str): 'json' o 'ndjson'
+
+    Returns:
+        dict: Nombre de la tabla -> elemento <table> vacío que la carga
+    """
+    os.makedirs(os.path.join(directorio_reporte, subdirectorio), exist_ok=True)
+    tablas = {}
+    for nombre, df in tablas_df.items():
+        if df.index.name is not None:
+            df = df.reset_index()
+        url = f'{subdirectorio}/{nombre}.{formato}'
+        escribir_tabla(df, os.path.join(directorio_reporte, url), formato)
+        tablas[nombre] = tabla_html_vacia(df, url, f'tabla-{nombre}')
+    return tablas
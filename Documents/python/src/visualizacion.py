@@ -1,40 +1,88 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
 import pandas as pd
 from io import BytesIO
+from importlib.metadata import version
+from concurrent.futures import ProcessPoolExecutor
 import base64
+import time
 
-# Configuración de estilo
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (10, 6)
-plt.rcParams['font.size'] = 10
+from src.intereses import tokenizar_intereses, conteo_intereses as contar_intereses
+from src.agregacion import contar_valores, contar_por_dia, fechas_desde_codigos
+from src.cache_graficos import clave_grafico, leer_grafico, guardar_grafico
+from src.instrumentacion import cronometrado, etapa, evento, registrar_etapa, rss_actual
+
+# Parámetros de estilo: forman parte de la clave de la caché de gráficos.
+# Cambiar VERSION_GRAFICOS invalida las imágenes guardadas (p. ej. si cambia una función de dibujo).
+VERSION_GRAFICOS = 1
+ESTILO_GRAFICOS = {
+    'estilo_seaborn': 'whitegrid',
+    'figsize': (10, 6),
+    'tamano_fuente': 10,
+    'dpi': 100,
+    'formato': 'png'
+}
+
+# matplotlib, pyplot y seaborn se importan recién al dibujar el primer gráfico (ver
+# _cargar_librerias): quien solo calcula resúmenes o métricas no paga su importación
+matplotlib = None
+plt = None
+sns = None
+
+def _cargar_librerias():
+    """Importa matplotlib y seaborn y aplica la configuración de estilo (solo la primera vez)."""
+    global matplotlib, plt, sns
+    if plt is not None:
+        return
+    import matplotlib as _matplotlib
+    import matplotlib.pyplot as _plt
+    import seaborn as _sns
+    matplotlib, plt, sns = _matplotlib, _plt, _sns
+    
+    # Configuración de estilo
+    sns.set_style(ESTILO_GRAFICOS['estilo_seaborn'])
+    plt.rcParams['figure.figsize'] = ESTILO_GRAFICOS['figsize']
+    plt.rcParams['font.size'] = ESTILO_GRAFICOS['tamano_fuente']
+    plt.rcParams['svg.fonttype'] = 'none'  # En SVG el texto queda como texto (más compacto que trazos)
+
+# Formatos de imagen soportados -> tipo MIME
+TIPOS_MIME = {'png': 'image/png', 'svg': 'image/svg+xml'}
 
 def figura_a_base64(fig):
-    """Convierte una figura de matplotlib a base64 para incrustar en HTML."""
+    """Convierte una figura de matplotlib a base64 (PNG o SVG según ESTILO_GRAFICOS['formato'])."""
     buffer = BytesIO()
-    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+    fig.savefig(buffer, format=ESTILO_GRAFICOS['formato'], bbox_inches='tight', dpi=ESTILO_GRAFICOS['dpi'])
     buffer.seek(0)
     img_base64 = base64.b64encode(buffer.read()).decode()
     plt.close(fig)
     return img_base64
 
-def graficar_distribucion_edad(df_usuarios):
+def resumen_distribucion_edad(df_usuarios, bins=15):
     """
-    Genera un histograma de la distribución de edades de los usuarios.
+    Calcula el histograma de edades que dibuja graficar_distribucion_edad.
     
     Args:
         df_usuarios: DataFrame con los datos de usuarios (debe tener columna 'edad')
+        bins: Número de intervalos del histograma
     
     Returns:
-        str: Imagen en formato base64
+        dict: 'conteos' y 'bordes' del histograma y 'media' de edad
     """
+    edades = df_usuarios['edad'].to_numpy(dtype='float64')
+    conteos, bordes = np.histogram(edades, bins=bins)
+    return {'conteos': conteos, 'bordes': bordes, 'media': float(edades.mean())}
+
+def dibujar_distribucion_edad(resumen):
+    """Dibuja el histograma de edades a partir de resumen_distribucion_edad."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Crear histograma
-    ax.hist(df_usuarios['edad'], bins=15, color='#FF6B6B', edgecolor='black', alpha=0.7)
+    # Crear histograma (los conteos ya vienen calculados, se usan como pesos)
+    bordes = resumen['bordes']
+    ax.hist(bordes[:-1], bins=bordes, weights=resumen['conteos'],
+            color='#FF6B6B', edgecolor='black', alpha=0.7)
     
     # Añadir línea de media
-    media_edad = df_usuarios['edad'].mean()
+    media_edad = resumen['media']
     ax.axvline(media_edad, color='#4ECDC4', linestyle='--', linewidth=2, 
                label=f'Media: {media_edad:.1f} años')
     
@@ -46,21 +94,41 @@ def graficar_distribucion_edad(df_usuarios):
     
     return figura_a_base64(fig)
 
-def graficar_intereses_populares(df_usuarios, top_n=10):
+@cronometrado()
+def graficar_distribucion_edad(df_usuarios):
     """
-    Genera un gráfico de barras con los intereses más populares.
+    Genera un histograma de la distribución de edades de los usuarios.
+    
+    Args:
+        df_usuarios: DataFrame con los datos de usuarios (debe tener columna 'edad')
+    
+    Returns:
+        str: Imagen en formato base64
+    """
+    return dibujar_distribucion_edad(resumen_distribucion_edad(df_usuarios))
+
+def resumen_intereses_populares(df_usuarios, top_n=10):
+    """
+    Cuenta los intereses individuales más populares.
     
     Args:
         df_usuarios: DataFrame con los datos de usuarios (debe tener columna 'intereses')
         top_n: Número de intereses top a mostrar
     
     Returns:
-        str: Imagen en formato base64
+        dict: 'conteo' (serie interés -> usuarios) y 'top_n'
     """
+    # Contar frecuencia de cada interés individual ("deportes, música" cuenta para ambos)
+    conteo = contar_intereses(tokenizar_intereses(df_usuarios['intereses'])).head(top_n)
+    return {'conteo': conteo, 'top_n': top_n}
+
+def dibujar_intereses_populares(resumen):
+    """Dibuja el gráfico de intereses a partir de resumen_intereses_populares."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    # Contar frecuencia de intereses
-    conteo_intereses = df_usuarios['intereses'].value_counts().head(top_n)
+    conteo_intereses = resumen['conteo']
+    top_n = resumen['top_n']
     
     # Crear gráfico de barras horizontal
     colores = sns.color_palette("viridis", len(conteo_intereses))
@@ -78,24 +146,35 @@ def graficar_intereses_populares(df_usuarios, top_n=10):
     plt.tight_layout()
     return figura_a_base64(fig)
 
-def graficar_publicaciones_por_ciudad(df_combinado):
+@cronometrado()
+def graficar_intereses_populares(df_usuarios, top_n=10):
     """
-    Genera un gráfico de barras mostrando el número de publicaciones activas por ciudad.
+    Genera un gráfico de barras con los intereses más populares.
     
     Args:
-        df_combinado: DataFrame combinado con datos de usuarios e interacciones
+        df_usuarios: DataFrame con los datos de usuarios (debe tener columna 'intereses')
+        top_n: Número de intereses top a mostrar
     
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_intereses_populares(resumen_intereses_populares(df_usuarios, top_n))
+
+def _estado_mayusculas(serie):
+    """Estado de publicación en mayúsculas ('publicado' y 'PUBLICADO' cuentan igual)."""
+    return serie.str.upper()
+
+def resumen_publicaciones_por_ciudad(df_combinado):
+    """Cuenta las publicaciones activas por ciudad (serie ciudad -> publicaciones)."""
+    # Filtrar solo publicaciones activas (se filtra la columna, no el DataFrame)
+    publicadas = (_estado_mayusculas(df_combinado['estado']) == 'PUBLICADO').to_numpy(bool, na_value=False)
+    return contar_valores(df_combinado['ciudad'][publicadas])
+
+def dibujar_publicaciones_por_ciudad(publicaciones_ciudad):
+    """Dibuja las publicaciones activas por ciudad a partir de resumen_publicaciones_por_ciudad."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Filtrar solo publicaciones activas
-    df_publicadas = df_combinado[df_combinado['estado'].str.upper() == 'PUBLICADO']
-    
-    # Contar publicaciones por ciudad
-    publicaciones_ciudad = df_publicadas['ciudad'].value_counts()
-    
     # Crear gráfico de barras
     colores = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
     publicaciones_ciudad.plot(kind='bar', ax=ax, color=colores, edgecolor='black')
@@ -113,24 +192,32 @@ def graficar_publicaciones_por_ciudad(df_combinado):
     plt.tight_layout()
     return figura_a_base64(fig)
 
-def graficar_tasa_publicacion(df_interacciones):
+@cronometrado()
+def graficar_publicaciones_por_ciudad(df_combinado):
     """
-    Genera un gráfico de pie mostrando la tasa de publicaciones activas.
+    Genera un gráfico de barras mostrando el número de publicaciones activas por ciudad.
     
     Args:
-        df_interacciones: DataFrame con las interacciones
+        df_combinado: DataFrame con las columnas 'estado' y 'ciudad' (publicaciones con la
+            ciudad de su autor)
     
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_publicaciones_por_ciudad(resumen_publicaciones_por_ciudad(df_combinado))
+
+def resumen_tasa_publicacion(df_publicaciones):
+    """Cuenta las publicaciones por estado (serie ESTADO -> publicaciones)."""
+    return contar_valores(_estado_mayusculas(df_publicaciones['estado']))
+
+def dibujar_tasa_publicacion(conteo_estados):
+    """Dibuja el gráfico de pie de estados a partir de resumen_tasa_publicacion."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(8, 8))
     
-    # Contar publicaciones activas vs borradores
-    conteo_estados = df_interacciones['estado'].str.upper().value_counts()
-    
-    # Crear gráfico de pie
+    # Crear gráfico de pie (solo se separa el primer sector)
     colores = ['#4ECDC4', '#FFB6C1']
-    explode = (0.05, 0)
+    explode = [0.05] + [0] * (len(conteo_estados) - 1)
     
     labels = [f'{estado.capitalize()} 📝' for estado in conteo_estados.index]
     ax.pie(conteo_estados, labels=labels, autopct='%1.1f%%',
@@ -141,21 +228,29 @@ def graficar_tasa_publicacion(df_interacciones):
     
     return figura_a_base64(fig)
 
-def graficar_duracion_promedio(df_interacciones):
+@cronometrado()
+def graficar_tasa_publicacion(df_interacciones):
     """
-    Genera un gráfico de barras mostrando la duración promedio de publicaciones por estado.
+    Genera un gráfico de pie mostrando la tasa de publicaciones activas.
     
     Args:
-        df_interacciones: DataFrame con las interacciones
+        df_interacciones: DataFrame con las publicaciones (debe tener columna 'estado')
     
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_tasa_publicacion(resumen_tasa_publicacion(df_interacciones))
+
+def resumen_duracion_promedio(df_publicaciones):
+    """Calcula la duración promedio por estado (serie ESTADO -> segundos)."""
+    estados = _estado_mayusculas(df_publicaciones['estado']).rename('estado')
+    return df_publicaciones['duracion_segundos'].groupby(estados).mean()
+
+def dibujar_duracion_promedio(duracion_por_estado):
+    """Dibuja la duración promedio por estado a partir de resumen_duracion_promedio."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Calcular duración promedio por estado
-    duracion_por_estado = df_interacciones.groupby(df_interacciones['estado'].str.upper())['duracion_segundos'].mean()
-    
     # Crear gráfico de barras
     colores = ['#4ECDC4', '#FFD700']
     duracion_por_estado.plot(kind='bar', ax=ax, color=colores, edgecolor='black')
@@ -173,24 +268,32 @@ def graficar_duracion_promedio(df_interacciones):
     plt.tight_layout()
     return figura_a_base64(fig)
 
-def graficar_genero_distribucion(df_usuarios):
+@cronometrado()
+def graficar_duracion_promedio(df_interacciones):
     """
-    Genera un gráfico de pie mostrando la distribución por género.
+    Genera un gráfico de barras mostrando la duración promedio de publicaciones por estado.
     
     Args:
-        df_usuarios: DataFrame con los datos de usuarios
+        df_interacciones: DataFrame con las publicaciones ('estado' y 'duracion_segundos')
     
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_duracion_promedio(resumen_duracion_promedio(df_interacciones))
+
+def resumen_genero_distribucion(df_usuarios):
+    """Cuenta usuarios por género (serie género -> usuarios)."""
+    conteo = df_usuarios['genero'].value_counts()
+    return conteo[conteo > 0]  # Sin categorías vacías
+
+def dibujar_genero_distribucion(conteo_genero):
+    """Dibuja el gráfico de pie de género a partir de resumen_genero_distribucion."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(8, 8))
     
-    # Contar distribución de género
-    conteo_genero = df_usuarios['genero'].value_counts()
-    
     # Crear gráfico de pie
     colores = ['#4ECDC4', '#FF6B6B']
-    explode = (0.05, 0.05)
+    explode = (0.05,) * len(conteo_genero)
     
     labels = ['Masculino' if g == 'M' else 'Femenino' for g in conteo_genero.index]
     
@@ -202,28 +305,36 @@ def graficar_genero_distribucion(df_usuarios):
     
     return figura_a_base64(fig)
 
-def graficar_actividad_usuario(df_interacciones):
+@cronometrado()
+def graficar_genero_distribucion(df_usuarios):
     """
-    Genera un gráfico de barras mostrando la distribución de publicaciones por usuario.
+    Genera un gráfico de pie mostrando la distribución por género.
     
     Args:
-        df_interacciones: DataFrame con las interacciones
+        df_usuarios: DataFrame con los datos de usuarios
     
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_genero_distribucion(resumen_genero_distribucion(df_usuarios))
+
+def resumen_actividad_usuario(df_interacciones, top_n=10):
+    """Cuenta los registros por usuario y devuelve los top_n (serie id_usuario -> cantidad)."""
+    return contar_valores(df_interacciones['id_usuario']).head(top_n)
+
+def dibujar_actividad_usuario(publicaciones_por_usuario):
+    """Dibuja el gráfico de usuarios más activos a partir de resumen_actividad_usuario."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    # Contar publicaciones por usuario (top 10)
-    publicaciones_por_usuario = df_interacciones['id_usuario'].value_counts().head(10)
-    
     # Crear gráfico de barras
     ax.bar(range(len(publicaciones_por_usuario)), publicaciones_por_usuario.values, 
            color='#4ECDC4', edgecolor='black', alpha=0.7)
     
     ax.set_xlabel('Usuario ID', fontsize=12, fontweight='bold')
     ax.set_ylabel('Número de Publicaciones', fontsize=12, fontweight='bold')
-    ax.set_title('Top 10 Usuarios Más Activos', fontsize=14, fontweight='bold', pad=20)
+    ax.set_title(f'Top {len(publicaciones_por_usuario)} Usuarios Más Activos', fontsize=14,
+                 fontweight='bold', pad=20)
     ax.set_xticks(range(len(publicaciones_por_usuario)))
     ax.set_xticklabels(publicaciones_por_usuario.index, rotation=45, ha='right')
     ax.grid(True, axis='y', alpha=0.3)
@@ -235,9 +346,10 @@ def graficar_actividad_usuario(df_interacciones):
     plt.tight_layout()
     return figura_a_base64(fig)
 
-def graficar_tasa_match(df_interacciones):
+@cronometrado()
+def graficar_actividad_usuario(df_interacciones):
     """
-    Genera un gráfico de pie mostrando la tasa de matches.
+    Genera un gráfico de barras mostrando la distribución de publicaciones por usuario.
     
     Args:
         df_interacciones: DataFrame con las interacciones
@@ -245,18 +357,24 @@ def graficar_tasa_match(df_interacciones):
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_actividad_usuario(resumen_actividad_usuario(df_interacciones))
+
+def resumen_tasa_match(df_interacciones):
+    """Cuenta matches y no matches de las interacciones."""
+    total_matches = int(df_interacciones['match'].sum())
+    return {'matches': total_matches, 'sin_match': len(df_interacciones) - total_matches}
+
+def dibujar_tasa_match(resumen):
+    """Dibuja el gráfico de pie de matches a partir de resumen_tasa_match."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(8, 8))
     
-    # Contar matches vs no matches
-    total_matches = df_interacciones['match'].sum()
-    total_no_matches = len(df_interacciones) - total_matches
-    
     # Crear gráfico de pie
     colores = ['#4ECDC4', '#FFB6C1']
     explode = (0.05, 0)
     
     labels = [f'Matches 💘', f'Sin Match 💔']
-    valores = [total_matches, total_no_matches]
+    valores = [resumen['matches'], resumen['sin_match']]
     
     ax.pie(valores, labels=labels, autopct='%1.1f%%',
            colors=colores, explode=explode, shadow=True, startangle=90,
@@ -266,23 +384,32 @@ def graficar_tasa_match(df_interacciones):
     
     return figura_a_base64(fig)
 
-def graficar_matches_por_ciudad(df_combinado):
+@cronometrado()
+def graficar_tasa_match(df_interacciones):
     """
-    Genera un gráfico de barras mostrando el número de matches por ciudad.
+    Genera un gráfico de pie mostrando la tasa de matches.
     
     Args:
-        df_combinado: DataFrame combinado con datos de usuarios e interacciones
+        df_interacciones: DataFrame con las interacciones
     
     Returns:
         str: Imagen en formato base64
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
+    return dibujar_tasa_match(resumen_tasa_match(df_interacciones))
+
+def resumen_matches_por_ciudad(df_combinado):
+    """Cuenta los matches por ciudad a partir del DataFrame combinado."""
     # Filtrar solo matches exitosos
     df_matches = df_combinado[df_combinado['match'] == True]
     
     # Contar matches por ciudad
     matches_ciudad = df_matches['ciudad'].value_counts()
+    return matches_ciudad[matches_ciudad > 0]  # Sin categorías vacías
+
+def dibujar_matches_por_ciudad(matches_ciudad):
+    """Dibuja el gráfico de matches por ciudad a partir de la serie ciudad -> matches."""
+    _cargar_librerias()
+    fig, ax = plt.subplots(figsize=(10, 6))
     
     # Crear gráfico de barras
     colores = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
@@ -301,20 +428,28 @@ def graficar_matches_por_ciudad(df_combinado):
     plt.tight_layout()
     return figura_a_base64(fig)
 
-def graficar_tipos_interaccion(df_interacciones):
+@cronometrado()
+def graficar_matches_por_ciudad(df_combinado):
     """
-    Genera un gráfico de barras mostrando los tipos de interacción.
+    Genera un gráfico de barras mostrando el número de matches por ciudad.
     
     Args:
-        df_interacciones: DataFrame con las interacciones
+        df_combinado: DataFrame combinado con datos de usuarios e interacciones
     
     Returns:
         str: Imagen en formato base64
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Contar tipos de interacción
+    return dibujar_matches_por_ciudad(resumen_matches_por_ciudad(df_combinado))
+
+def resumen_tipos_interaccion(df_interacciones):
+    """Cuenta las interacciones por tipo."""
     tipos = df_interacciones['tipo'].value_counts()
+    return tipos[tipos > 0]  # Sin categorías vacías
+
+def dibujar_tipos_interaccion(tipos):
+    """Dibuja el gráfico de tipos de interacción a partir de la serie tipo -> cantidad."""
+    _cargar_librerias()
+    fig, ax = plt.subplots(figsize=(10, 6))
     
     # Crear gráfico de barras
     colores = sns.color_palette("Set2", len(tipos))
@@ -333,27 +468,38 @@ def graficar_tipos_interaccion(df_interacciones):
     plt.tight_layout()
     return figura_a_base64(fig)
 
-def graficar_actividad_temporal(df_interacciones):
+@cronometrado()
+def graficar_tipos_interaccion(df_interacciones):
     """
-    Genera un gráfico de línea mostrando la actividad temporal.
+    Genera un gráfico de barras mostrando los tipos de interacción.
     
     Args:
-        df_interacciones: DataFrame con las interacciones (debe tener columna 'fecha')
+        df_interacciones: DataFrame con las interacciones
     
     Returns:
         str: Imagen en formato base64
     """
+    return dibujar_tipos_interaccion(resumen_tipos_interaccion(df_interacciones))
+
+def resumen_actividad_temporal(df_interacciones):
+    """
+    Cuenta las interacciones por día.
+    
+    Returns:
+        pd.Series: Interacciones por fecha, o None si no hay columna 'fecha'
+    """
+    if df_interacciones is None or 'fecha' not in df_interacciones.columns:
+        return None
+    # Contar por códigos de día enteros; solo los días distintos se vuelven objetos date
+    dias, conteos = contar_por_dia(df_interacciones['fecha'])
+    return pd.Series(conteos, index=pd.Index(fechas_desde_codigos(dias).date, name='fecha_solo'))
+
+def dibujar_actividad_temporal(actividad_diaria):
+    """Dibuja la actividad diaria a partir de resumen_actividad_temporal."""
+    _cargar_librerias()
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    # Convertir fecha a datetime si no lo es
-    if 'fecha' in df_interacciones.columns:
-        df_temp = df_interacciones.copy()
-        df_temp['fecha'] = pd.to_datetime(df_temp['fecha'])
-        df_temp['fecha_solo'] = df_temp['fecha'].dt.date
-        
-        # Contar interacciones por fecha
-        actividad_diaria = df_temp.groupby('fecha_solo').size()
-        
+    if actividad_diaria is not None:
         # Crear gráfico de línea
         ax.plot(actividad_diaria.index, actividad_diaria.values, 
                 marker='o', linewidth=2, markersize=6, color='#4ECDC4')
@@ -373,4 +519,211 @@ def graficar_actividad_temporal(df_interacciones):
         ax.set_ylim(0, 1)
         ax.axis('off')
     
-    return figura_a_base64(fig)
\ No newline at end of file
+    return figura_a_base64(fig)
+
+@cronometrado()
+def graficar_actividad_temporal(df_interacciones):
+    """
+    Genera un gráfico de línea mostrando la actividad temporal.
+    
+    Args:
+        df_interacciones: DataFrame con las interacciones (debe tener columna 'fecha')
+    
+    Returns:
+        str: Imagen en formato base64
+    """
+    return dibujar_actividad_temporal(resumen_actividad_temporal(df_interacciones))
+
+def resumenes_desde_resultados(resultados):
+    """
+    Obtiene los resúmenes de gráficos que ya calculó el análisis, sin volver a recorrer los datos.
+    
+    Args:
+        resultados: Diccionario devuelto por realizar_analisis (o agregacion.agregar_todo)
+    
+    Returns:
+        dict: Clave del gráfico (ver DIBUJOS_REPORTE) -> resumen, solo para los disponibles
+    """
+    resumenes = {}
+    if 'distribucion_genero' in resultados:
+        resumenes['genero'] = resultados['distribucion_genero']
+    if 'total_matches' in resultados:
+        total_matches = int(resultados['total_matches'])
+        resumenes['tasa_match'] = {'matches': total_matches,
+                                   'sin_match': int(resultados['total_interacciones']) - total_matches}
+    if 'matches_por_ciudad' in resultados:
+        resumenes['matches_ciudad'] = resultados['matches_por_ciudad']
+    if 'tipos_interaccion' in resultados:
+        resumenes['tipos'] = resultados['tipos_interaccion']
+    if 'actividad_diaria' in resultados:
+        # Mismo formato que resumen_actividad_temporal (fecha -> interacciones, None si no hay fechas)
+        actividad = resultados['actividad_diaria']
+        resumenes['actividad'] = (pd.Series(actividad.to_numpy(), index=pd.Index(actividad.index.date, name='fecha_solo'))
+                                  if len(actividad) else None)
+    if 'publicaciones' in resultados:
+        # Mismos formatos que resumen_publicaciones_por_ciudad, resumen_tasa_publicacion y
+        # resumen_duracion_promedio, desde las métricas de src.publicaciones
+        publicaciones = resultados['publicaciones']
+        resumenes['publicaciones_ciudad'] = publicaciones['publicadas_por_ciudad']
+        resumenes['estado_publicaciones'] = publicaciones['publicaciones_por_estado']
+        resumenes['duracion_estado'] = publicaciones['duracion_por_estado']['media']
+    return resumenes
+
+def resumen_a_json(resumen):
+    """
+    Convierte un resumen de gráfico en un objeto serializable con json.
+    
+    Las series pasan a {'etiquetas': [...], 'valores': [...]}, los arreglos a listas
+    y los diccionarios se convierten valor por valor.
+    
+    Args:
+        resumen: Resumen devuelto por una función resumen_* (o None)
+    
+    Returns:
+        dict | list | int | float | str | None: Resumen con tipos nativos de Python
+    """
+    if isinstance(resumen, pd.Series):
+        return {'etiquetas': [str(etiqueta) for etiqueta in resumen.index],
+                'valores': resumen.to_numpy().tolist()}
+    if isinstance(resumen, np.ndarray):
+        return resumen.tolist()
+    if isinstance(resumen, dict):
+        return {clave: resumen_a_json(valor) for clave, valor in resumen.items()}
+    if isinstance(resumen, np.generic):
+        return resumen.item()
+    return resumen
+
+# Gráficos disponibles: clave en el diccionario 'graficos' -> función de dibujo
+DIBUJOS_REPORTE = {
+    'edad': dibujar_distribucion_edad,
+    'intereses': dibujar_intereses_populares,
+    'genero': dibujar_genero_distribucion,
+    'tasa_match': dibujar_tasa_match,
+    'matches_ciudad': dibujar_matches_por_ciudad,
+    'tipos': dibujar_tipos_interaccion,
+    'actividad': dibujar_actividad_temporal,
+    'actividad_usuario': dibujar_actividad_usuario,
+    'publicaciones_ciudad': dibujar_publicaciones_por_ciudad,
+    'estado_publicaciones': dibujar_tasa_publicacion,
+    'duracion_estado': dibujar_duracion_promedio
+}
+
+def inicializar_dibujo():
+    """
+    Prepara un proceso para dibujar con el backend Agg, sin ventana ni estado compartido.
+
+    Se usa como inicializador de los procesos de dibujo y en el servicio, cuyos hilos
+    dibujan fuera del hilo principal (los backends con ventana no lo permiten).
+    """
+    import matplotlib as _matplotlib
+    _matplotlib.use('Agg')
+
+def _parametros_estilo(formato):
+    """Estilo completo que identifica una imagen: parámetros propios y versiones de las librerías."""
+    return dict(ESTILO_GRAFICOS, formato=formato, version=VERSION_GRAFICOS,
+                matplotlib=version('matplotlib'), seaborn=version('seaborn'))
+
+def _dibujar(clave, resumen, formato):
+    """Dibuja un gráfico del reporte en el formato indicado (se ejecuta en el proceso de dibujo)."""
+    formato_anterior = ESTILO_GRAFICOS['formato']
+    ESTILO_GRAFICOS['formato'] = formato
+    try:
+        return DIBUJOS_REPORTE[clave](resumen)
+    finally:
+        ESTILO_GRAFICOS['formato'] = formato_anterior
+
+def _dibujar_cronometrado(clave, resumen, formato):
+    """Dibuja en un proceso del pool y devuelve también la duración y la memoria de ese proceso."""
+    inicio = time.perf_counter()
+    imagen = _dibujar(clave, resumen, formato)
+    return imagen, time.perf_counter() - inicio, rss_actual()
+
+def iterar_graficos(resumenes, procesos=None, al_terminar=None, directorio_cache=None, formato=None):
+    """
+    Dibuja los gráficos del reporte y los entrega uno a uno, en el orden de 'resumenes'.
+    
+    A cada proceso solo se envía el resumen ya agregado de su gráfico (unos pocos
+    valores), no los DataFrames. pyplot no es seguro entre hilos, por eso se usan
+    procesos independientes con el backend Agg. Con varios procesos, el trabajo se
+    envía al pool al llamar a esta función: los gráficos se van dibujando mientras
+    quien consume el iterador hace otra cosa (por ejemplo, escribir el encabezado).
+    
+    Con 'directorio_cache', cada resumen se identifica por su hash (más el estilo):
+    los gráficos cuyo resumen no cambió se leen del disco y solo los demás se dibujan.
+    
+    Args:
+        resumenes (dict): Clave del gráfico (ver DIBUJOS_REPORTE) -> resumen
+        procesos (int): Número de procesos; None o 1 dibuja en el proceso actual
+        al_terminar (callable): Función opcional llamada con la clave de cada gráfico entregado
+        directorio_cache (str): Directorio de la caché de gráficos; None la desactiva
+        formato (str): 'png' o 'svg' (ver TIPOS_MIME); None usa ESTILO_GRAFICOS['formato']
+    
+    Returns:
+        iterator: Pares (clave del gráfico, imagen en base64)
+    """
+    formato = formato or ESTILO_GRAFICOS['formato']
+    if formato not in TIPOS_MIME:
+        raise ValueError(f'Formato de gráfico no soportado: {formato}')
+    
+    # 1. Buscar en la caché
+    en_cache = {}
+    hashes = {}
+    pendientes = dict(resumenes)
+    if directorio_cache is not None:
+        estilo = _parametros_estilo(formato)
+        for clave, resumen in resumenes.items():
+            hashes[clave] = clave_grafico(DIBUJOS_REPORTE[clave].__name__, resumen, estilo)
+            contenido = leer_grafico(hashes[clave], formato, directorio_cache)
+            if contenido is not None:
+                en_cache[clave] = base64.b64encode(contenido).decode()
+                del pendientes[clave]
+    
+    # 2. Enviar al pool los gráficos que faltan
+    pool = None
+    futuros = {}
+    if procesos and procesos > 1 and len(pendientes) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(procesos, len(pendientes)), initializer=inicializar_dibujo)
+        futuros = {clave: pool.submit(_dibujar_cronometrado, clave, resumen, formato)
+                    for clave, resumen in pendientes.items()}
+    
+    # 3. Entregar en orden, dibujando en este proceso si no hay pool
+    def _entregar():
+        try:
+            for clave in resumenes:
+                funcion = DIBUJOS_REPORTE[clave].__name__
+                if clave in en_cache:
+                    img_base64 = en_cache.pop(clave)
+                    evento('grafico_en_cache', grafico=clave, funcion=funcion)
+                else:
+                    if clave in futuros:
+                        img_base64, segundos, rss = futuros.pop(clave).result()
+                        registrar_etapa(funcion, segundos, rss, grafico=clave, origen='proceso')
+                    else:
+                        with etapa(funcion, grafico=clave, origen='local'):
+                            img_base64 = _dibujar(clave, pendientes[clave], formato)
+                    if clave in hashes:
+                        guardar_grafico(hashes[clave], base64.b64decode(img_base64), formato, directorio_cache)
+                if al_terminar:
+                    al_terminar(clave)
+                yield clave, img_base64
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    
+    return _entregar()
+
+def renderizar_graficos(resumenes, procesos=None, al_terminar=None, directorio_cache=None, formato=None):
+    """
+    Dibuja todos los gráficos del reporte (ver iterar_graficos).
+    
+    Args:
+        resumenes (dict): Clave del gráfico (ver DIBUJOS_REPORTE) -> resumen
+        procesos (int): Número de procesos; None o 1 dibuja en el proceso actual
+        al_terminar (callable): Función opcional llamada con la clave de cada gráfico terminado
+        directorio_cache (str): Directorio de la caché de gráficos; None la desactiva
+        formato (str): 'png' o 'svg' (ver TIPOS_MIME); None usa ESTILO_GRAFICOS['formato']
+    
+    Returns:
+        dict: Clave del gráfico -> imagen en base64, en el mismo orden que 'resumenes'
+    """
+    return dict(iterar_graficos(resumenes, procesos, al_terminar, directorio_cache, formato))
@@ -0,0 +1,9 @@
+"""
+Configuración de pytest: los tests importan los módulos como 'src.<modulo>', igual
+que los scripts del proyecto, así que la raíz del proyecto va en sys.path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,82 @@
+"""
+Tests de agregación: el análisis por bloques debe dar los mismos resultados que el
+análisis del archivo completo, incluido el orden de los empates.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from src.analisis import realizar_analisis
+
+USUARIOS = """id_usuario,nombre,edad,genero,ciudad,intereses
+1,Ana,28,Femenino,Bogotá,"Deportes, Música"
+2,Carlos,32,Masculino,Medellín,"Cine, Música"
+3,Lucía,25,Femenino,Cali,Viajes
+4,Pedro,30,Masculino,Cartagena,"Deportes, Cine"
+"""
+
+# Cada tipo aparece 4 veces, cada ciudad tiene 2 matches y cada usuario 3 interacciones;
+# los primeros bloques cortos tienen otro orden por conteo que el archivo completo
+TIPOS = ['like', 'superlike', 'superlike', 'dislike', 'dislike', 'dislike',
+         'like', 'like', 'superlike', 'dislike', 'like', 'superlike']
+USUARIOS_INTERACCION = [3, 1, 1, 4, 2, 4, 2, 3, 2, 1, 4, 3]
+MATCHES = [False, True, True, True, False, True, True, False, True, False, False, True]
+
+INTERACCIONES = [
+    {'id_interaccion': i + 1, 'id_usuario': usuario, 'tipo': tipo, 'match': match,
+     'fecha': f'2025-10-{1 + i % 4:02d}T10:00:00'}
+    for i, (usuario, tipo, match) in enumerate(zip(USUARIOS_INTERACCION, TIPOS, MATCHES))
+]
+
+@pytest.fixture
+def rutas(tmp_path):
+    """Usuarios y las mismas interacciones como un archivo JSON y como JSON Lines."""
+    ruta_usuarios = tmp_path / 'usuarios.csv'
+    ruta_usuarios.write_text(USUARIOS, encoding='utf-8')
+    ruta_json = tmp_path / 'interacciones.json'
+    ruta_json.write_text(json.dumps(INTERACCIONES), encoding='utf-8')
+    return str(ruta_usuarios), str(ruta_json)
+
+def comprobar_resultados_iguales(resultados, esperados):
+    """Compara dos diccionarios de resultados, incluido el orden de las series."""
+    assert resultados.keys() == esperados.keys()
+    for clave, esperado in esperados.items():
+        valor = resultados[clave]
+        if isinstance(esperado, pd.Series):
+            pd.testing.assert_series_equal(valor, esperado, check_names=False, check_dtype=False,
+                                           check_index_type=False, check_categorical=False)
+        elif isinstance(esperado, pd.DataFrame):
+            pd.testing.assert_frame_equal(valor, esperado, check_dtype=False,
+                                          check_index_type=False, check_categorical=False)
+        else:
+            assert valor == pytest.approx(esperado), clave
+
+def test_empates_en_orden_de_primera_aparicion(rutas):
+    _, _, _, resultados = realizar_analisis(*rutas)
+    assert resultados['tipos_interaccion'].index.tolist() == ['like', 'superlike', 'dislike']
+    assert resultados['usuarios_activos'].index.tolist()[:4] == [3, 1, 4, 2]
+
+@pytest.mark.parametrize('tamano_chunk', [1, 2, 3, 5])
+def test_por_bloques_igual_que_archivo_completo(rutas, tamano_chunk):
+    _, _, _, esperados = realizar_analisis(*rutas)
+    _, _, _, resultados = realizar_analisis(*rutas, tamano_chunk=tamano_chunk)
+    comprobar_resultados_iguales(resultados, esperados)
+
+@pytest.mark.parametrize('procesos', [1, 2])
+def test_particiones_igual_que_archivo_completo(rutas, tmp_path, procesos):
+    directorio = tmp_path / 'particiones'
+    directorio.mkdir()
+    # Particiones de distinto tamaño; se combinan en orden alfabético de archivo
+    for nombre, (inicio, fin) in zip(['parte-0.jsonl', 'parte-1.json', 'parte-2.jsonl'], [(0, 2), (2, 7), (7, 12)]):
+        registros = INTERACCIONES[inicio:fin]
+        if nombre.endswith('.jsonl'):
+            texto = ''.join(json.dumps(r) + '\n' for r in registros)
+        else:
+            texto = json.dumps(registros)
+        (directorio / nombre).write_text(texto, encoding='utf-8')
+
+    _, _, _, esperados = realizar_analisis(*rutas)
+    _, _, _, resultados = realizar_analisis(rutas[0], str(directorio), procesos=procesos, tamano_chunk=2)
+    comprobar_resultados_iguales(resultados, esperados)
@@ -0,0 +1,99 @@
+"""
+Tests de consultas: los resultados de consultar sobre los índices deben coincidir con
+los de un merge de pandas filtrado con máscaras booleanas.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.consultas import construir_indices, consultar, filtrar
+
+CIUDADES = ['Bogotá', 'Cali', 'Medellín', 'Cartagena']
+GENEROS = ['Masculino', 'Femenino', 'No binario']
+TIPOS = ['like', 'dislike', 'superlike']
+
+@pytest.fixture(scope='module')
+def datos():
+    """Usuarios e interacciones sintéticos, con nulos y usuarios que no existen."""
+    generador = np.random.default_rng(11)
+    n_usuarios, n_interacciones = 300, 20_000
+    df_usuarios = pd.DataFrame({
+        'id_usuario': np.arange(1, n_usuarios + 1),
+        'ciudad': pd.Categorical(generador.choice(CIUDADES, n_usuarios), categories=CIUDADES),
+        'genero': pd.Categorical(generador.choice(GENEROS, n_usuarios), categories=GENEROS),
+        'edad': generador.integers(18, 60, n_usuarios).astype('float64')
+    })
+    df_usuarios.loc[::37, 'edad'] = np.nan
+    df_usuarios.loc[::41, 'ciudad'] = np.nan
+
+    fechas = pd.Timestamp('2025-10-01') + pd.to_timedelta(generador.integers(0, 30 * 24 * 3600, n_interacciones), unit='s')
+    df_interacciones = pd.DataFrame({
+        'id_usuario': generador.integers(1, n_usuarios + 20, n_interacciones),
+        'tipo': pd.Categorical(generador.choice(TIPOS, n_interacciones), categories=TIPOS),
+        'match': generador.random(n_interacciones) < 0.3,
+        'fecha': pd.Series(fechas).where(generador.random(n_interacciones) > 0.02)
+    })
+    unidos = df_interacciones.merge(df_usuarios, on='id_usuario', how='left')
+    return construir_indices(df_usuarios, df_interacciones), df_interacciones, unidos
+
+def _mascara(unidos, ciudad=None, genero=None, tipo=None, edad=None, fecha=None):
+    """Filtro equivalente con pandas; los valores de texto se pasan ya con su etiqueta original."""
+    mascara = pd.Series(True, index=unidos.index)
+    for columna, valor in (('ciudad', ciudad), ('genero', genero), ('tipo', tipo)):
+        if valor is not None:
+            mascara &= unidos[columna].isin([valor] if isinstance(valor, str) else valor)
+    if edad is not None:
+        mascara &= unidos['edad'].between(*edad)
+    if fecha is not None:
+        dias = unidos['fecha'].dt.normalize()
+        mascara &= dias.between(pd.Timestamp(fecha[0]), pd.Timestamp(fecha[1]))
+    return mascara.to_numpy()
+
+CASOS = [
+    ({}, {}),
+    ({'ciudad': 'bogota'}, {'ciudad': 'Bogotá'}),
+    ({'ciudad': ['CALI', 'medellin'], 'tipo': 'Superlike'},
+     {'ciudad': ['Cali', 'Medellín'], 'tipo': 'superlike'}),
+    ({'genero': 'femenino', 'edad': (25, 30)}, {'genero': 'Femenino', 'edad': (25, 30)}),
+    ({'fecha': ('2025-10-03', '2025-10-09')}, {'fecha': ('2025-10-03', '2025-10-09')}),
+    ({'ciudad': 'cartagena', 'tipo': 'like', 'edad': (40, 59), 'fecha': ('2025-10-10', '2025-10-10')},
+     {'ciudad': 'Cartagena', 'tipo': 'like', 'edad': (40, 59), 'fecha': ('2025-10-10', '2025-10-10')}),
+    ({'ciudad': 'Lima'}, {'ciudad': 'Lima'}),
+]
+
+@pytest.mark.parametrize('filtros, equivalentes', CASOS)
+def test_consultar_coincide_con_mascara(datos, filtros, equivalentes):
+    indices, df_interacciones, unidos = datos
+    mascara = _mascara(unidos, **equivalentes)
+
+    np.testing.assert_array_equal(np.sort(filtrar(indices, **filtros)), np.flatnonzero(mascara))
+
+    resultado = consultar(indices, **filtros)
+    seleccion = unidos[mascara]
+    assert resultado['interacciones'] == len(seleccion)
+    assert resultado['matches'] == int(seleccion['match'].sum())
+    assert resultado['usuarios'] == seleccion['id_usuario'].nunique()
+    esperada = seleccion['match'].mean() * 100 if len(seleccion) else 0.0
+    assert resultado['tasa_match'] == pytest.approx(esperada)
+
+@pytest.mark.parametrize('por, columna', [('dia', 'fecha'), ('ciudad', 'ciudad'), ('edad', 'edad')])
+def test_consultar_agrupado_coincide_con_groupby(datos, por, columna):
+    indices, _, unidos = datos
+    filtros = {'tipo': 'like', 'fecha': ('2025-10-05', '2025-10-20')}
+    seleccion = unidos[_mascara(unidos, **filtros)]
+    claves = seleccion[columna].dt.normalize() if por == 'dia' else seleccion[columna]
+    esperado = seleccion.groupby(claves, observed=True)['match'].agg(['size', 'sum'])
+
+    tabla = consultar(indices, por=por, **filtros)
+    np.testing.assert_array_equal(np.asarray(tabla.index, dtype=object), np.asarray(esperado.index, dtype=object))
+    np.testing.assert_array_equal(tabla['interacciones'].to_numpy(), esperado['size'].to_numpy())
+    np.testing.assert_array_equal(tabla['matches'].to_numpy(), esperado['sum'].to_numpy())
+    np.testing.assert_allclose(tabla['tasa_match'].to_numpy(), (esperado['sum'] / esperado['size'] * 100).to_numpy())
+
+def test_filtro_sin_datos_de_la_dimension():
+    df_usuarios = pd.DataFrame({'id_usuario': [1], 'ciudad': ['Cali']})
+    df_interacciones = pd.DataFrame({'id_usuario': [1], 'tipo': ['like'], 'match': [True]})
+    indices = construir_indices(df_usuarios, df_interacciones)
+    with pytest.raises(ValueError):
+        consultar(indices, edad=(20, 30))
@@ -0,0 +1,101 @@
+"""
+Tests del modo incremental: al volver a ejecutar tras agregar registros al final del
+archivo, el estado debe coincidir con agregar el archivo completo de una vez, sin contar
+dos veces los registros con la misma fecha que la marca ni los registros sin fecha.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from src.agregacion import acumular_interacciones, construir_indice_usuarios, nuevo_estado
+from src.incremental import actualizar_estado, avanzar_marca, filtrar_nuevas, marca_vacia
+from src.preprocesamiento import iterar_interacciones
+
+USUARIOS = pd.DataFrame({'id_usuario': [1, 2, 3, 4],
+                         'ciudad': pd.Categorical(['Cali', 'Bogotá', 'Cali', 'Medellín'])})
+
+INICIALES = [
+    {'id_interaccion': 1, 'id_usuario': 1, 'tipo': 'like', 'match': True, 'fecha': '2025-10-01T10:00:00'},
+    {'id_interaccion': 2, 'id_usuario': 2, 'tipo': 'like', 'match': False, 'fecha': '2025-10-02T11:00:00'},
+    {'id_interaccion': 3, 'id_usuario': 3, 'tipo': 'superlike', 'match': True, 'fecha': '2025-10-03T12:00:00'},
+    {'id_interaccion': 4, 'id_usuario': 4, 'tipo': 'dislike', 'match': False, 'fecha': None},
+]
+
+AGREGADAS = [
+    # Misma fecha que la marca (2025-10-03T12:00:00) con id mayor
+    {'id_interaccion': 5, 'id_usuario': 1, 'tipo': 'like', 'match': True, 'fecha': '2025-10-03T12:00:00'},
+    # Sin fecha
+    {'id_interaccion': 6, 'id_usuario': 2, 'tipo': 'like', 'match': True, 'fecha': None},
+    {'id_interaccion': 7, 'id_usuario': 3, 'tipo': 'superlike', 'match': False},
+    {'id_interaccion': 8, 'id_usuario': 4, 'tipo': 'like', 'match': True, 'fecha': '2025-10-05T09:00:00'},
+]
+
+def _escribir(ruta, registros):
+    if ruta.suffix == '.jsonl':
+        ruta.write_text(''.join(json.dumps(r) + '\n' for r in registros), encoding='utf-8')
+    else:
+        ruta.write_text(json.dumps(registros, indent=2), encoding='utf-8')
+
+def _estado_completo(ruta, indice):
+    estado = nuevo_estado()
+    for bloque in iterar_interacciones(str(ruta), tamano_chunk=3):
+        acumular_interacciones(estado, bloque, indice)
+    return estado
+
+def _comprobar_igual(estado, esperado):
+    for clave in ('total_interacciones', 'total_matches'):
+        assert estado[clave] == esperado[clave]
+    for clave in ('tipos_interaccion', 'interacciones_por_usuario', 'matches_por_ciudad', 'actividad_diaria'):
+        # Sin ordenar: el orden de las etiquetas desempata los rankings
+        pd.testing.assert_series_equal(estado[clave], esperado[clave], check_names=False, check_index_type=False)
+
+@pytest.mark.parametrize('extension', ['.jsonl', '.json'])
+def test_reejecucion_tras_agregar_no_cuenta_dos_veces(tmp_path, extension):
+    ruta = tmp_path / f'interacciones{extension}'
+    ruta_estado = str(tmp_path / 'estado.json')
+    indice = construir_indice_usuarios(USUARIOS)
+
+    _escribir(ruta, INICIALES)
+    _, info = actualizar_estado(str(ruta), indice, ruta_estado, tamano_chunk=3)
+    assert info['nuevas'] == len(INICIALES)
+
+    _escribir(ruta, INICIALES + AGREGADAS)
+    estado, info = actualizar_estado(str(ruta), indice, ruta_estado, tamano_chunk=3)
+    assert info['nuevas'] == len(AGREGADAS)
+    if extension == '.jsonl':
+        assert info['desplazamiento'] > 0  # Solo se leyó lo agregado
+    _comprobar_igual(estado, _estado_completo(ruta, indice))
+
+    # Sin cambios en el archivo no se agrega nada
+    estado_repetido, info = actualizar_estado(str(ruta), indice, ruta_estado, tamano_chunk=3)
+    assert info['nuevas'] == 0
+    _comprobar_igual(estado_repetido, estado)
+
+def test_marca_con_misma_fecha_y_sin_fecha():
+    bloque = pd.DataFrame({
+        'id_interaccion': pd.array([1, 2, 3], dtype='Int32'),
+        'fecha': pd.to_datetime(['2025-10-03T12:00:00', '2025-10-03T12:00:00', None])
+    })
+    marca = avanzar_marca(marca_vacia(), bloque)
+    assert marca == {'fecha': '2025-10-03T12:00:00', 'id_interaccion': 3}
+
+    siguiente = pd.DataFrame({
+        'id_interaccion': pd.array([2, 3, 4, 5, 6], dtype='Int32'),
+        'fecha': pd.to_datetime(['2025-10-03T12:00:00', None, '2025-10-03T12:00:00', None,
+                                 '2025-10-01T00:00:00'])
+    })
+    # Ya agregados: 2 (misma fecha, id menor) y 3 (sin fecha, mismo id). El 6 tiene fecha anterior
+    assert filtrar_nuevas(siguiente, marca)['id_interaccion'].tolist() == [4, 5]
+
+def test_estado_de_otro_archivo_se_descarta(tmp_path):
+    indice = construir_indice_usuarios(USUARIOS)
+    ruta_estado = str(tmp_path / 'estado.json')
+    ruta_a, ruta_b = tmp_path / 'a.jsonl', tmp_path / 'b.jsonl'
+    _escribir(ruta_a, INICIALES)
+    _escribir(ruta_b, AGREGADAS)
+    actualizar_estado(str(ruta_a), indice, ruta_estado)
+    estado, info = actualizar_estado(str(ruta_b), indice, ruta_estado)
+    assert info['nuevas'] == len(AGREGADAS)
+    _comprobar_igual(estado, _estado_completo(ruta_b, indice))
@@ -0,0 +1,81 @@
+"""
+Tests del lector por bloques de preprocesamiento: arreglos JSON y JSON Lines cuyos
+registros quedan partidos entre bloques de lectura y entre bloques de registros.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from src import preprocesamiento
+from src.preprocesamiento import iterar_interacciones
+
+REGISTROS = [
+    {'id_interaccion': i, 'id_usuario': i % 4 + 1, 'tipo': ['like', 'superlike', 'dislike'][i % 3],
+     'match': i % 2 == 0, 'fecha': f'2025-10-{i % 28 + 1:02d}T10:{i % 60:02d}:00',
+     'nota': 'texto con , comas ] corchetes y "comillas" { llaves }'}
+    for i in range(1, 24)
+]
+
+@pytest.fixture(params=[1, 7, 64])
+def bloque_lectura(request, monkeypatch):
+    """Bloques de lectura diminutos: casi todos los registros quedan partidos entre lecturas."""
+    monkeypatch.setattr(preprocesamiento, 'TAMANO_BLOQUE_LECTURA', request.param)
+    return request.param
+
+def _leer(ruta, tamano_chunk, **opciones):
+    bloques = list(iterar_interacciones(str(ruta), tamano_chunk=tamano_chunk, **opciones))
+    return bloques, pd.concat(bloques, ignore_index=True)
+
+def _comprobar(df):
+    assert df['id_interaccion'].tolist() == [r['id_interaccion'] for r in REGISTROS]
+    assert df['nota'].tolist() == [r['nota'] for r in REGISTROS]
+    assert df['match'].tolist() == [r['match'] for r in REGISTROS]
+    assert df['fecha'].tolist() == [pd.Timestamp(r['fecha']) for r in REGISTROS]
+
+@pytest.mark.parametrize('tamano_chunk', [1, 5, 23, 100])
+def test_arreglo_json_partido_entre_bloques(tmp_path, bloque_lectura, tamano_chunk):
+    ruta = tmp_path / 'interacciones.json'
+    ruta.write_text('\ufeff[\n  ' + ',\n  '.join(json.dumps(r, ensure_ascii=False) for r in REGISTROS) + '\n]\n',
+                    encoding='utf-8')
+    bloques, df = _leer(ruta, tamano_chunk)
+    assert [len(b) for b in bloques[:-1]] == [tamano_chunk] * (len(bloques) - 1)
+    _comprobar(df)
+
+@pytest.mark.parametrize('tamano_chunk', [1, 5, 23, 100])
+def test_json_lines_partido_entre_bloques(tmp_path, bloque_lectura, tamano_chunk):
+    ruta = tmp_path / 'interacciones.jsonl'
+    ruta.write_text('\ufeff' + '\n'.join(json.dumps(r, ensure_ascii=False) for r in REGISTROS) + '\n\n',
+                    encoding='utf-8')
+    bloques, df = _leer(ruta, tamano_chunk)
+    assert [len(b) for b in bloques[:-1]] == [tamano_chunk] * (len(bloques) - 1)
+    _comprobar(df)
+
+def test_json_lines_sin_extension_se_detecta(tmp_path, bloque_lectura):
+    ruta = tmp_path / 'interacciones.json'
+    ruta.write_text('\n'.join(json.dumps(r) for r in REGISTROS), encoding='utf-8')
+    _, df = _leer(ruta, 5)
+    _comprobar(df)
+
+def test_json_lines_desde_desplazamiento(tmp_path):
+    ruta = tmp_path / 'interacciones.jsonl'
+    lineas = [json.dumps(r) + '\n' for r in REGISTROS]
+    ruta.write_text(''.join(lineas), encoding='utf-8')
+    desplazamiento = len(''.join(lineas[:10]).encode('utf-8'))
+    _, df = _leer(ruta, 4, desplazamiento=desplazamiento)
+    assert df['id_interaccion'].tolist() == [r['id_interaccion'] for r in REGISTROS[10:]]
+
+def test_columnas_nuevas_a_mitad_de_bloque(tmp_path):
+    ruta = tmp_path / 'interacciones.jsonl'
+    registros = [{'id_interaccion': 1, 'id_usuario': 1}, {'id_interaccion': 2, 'id_usuario': 2, 'extra': 'x'}]
+    ruta.write_text('\n'.join(json.dumps(r) for r in registros), encoding='utf-8')
+    _, df = _leer(ruta, 10)
+    assert pd.isna(df['extra'][0]) and df['extra'][1] == 'x'
+
+@pytest.mark.parametrize('contenido', ['[{"id_interaccion": 1}, {"id_interaccion": 2}', '{"id_interaccion": 1}]'])
+def test_arreglo_incompleto_o_invalido(tmp_path, bloque_lectura, contenido):
+    ruta = tmp_path / 'interacciones.json'
+    ruta.write_text(contenido, encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iterar_interacciones(str(ruta), formato='json'))
@@ -0,0 +1,101 @@
+"""
+Tests de los sketches: al combinar sketches de partes de un flujo, los conteos de
+frecuentes y las estimaciones de HyperLogLog se mantienen dentro de sus cotas de error
+respecto de los valores exactos.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.sketches import (agregar_conteos_frecuentes, agregar_hll, agregar_hll_por_grupo,
+                          combinar_frecuentes, combinar_hll, combinar_hll_por_grupo,
+                          error_frecuentes, estimar_hll, estimar_por_grupo, frecuentes_a_dict,
+                          frecuentes_desde_dict, nuevo_frecuentes, nuevo_hll, top_frecuentes)
+
+PRECISION = 12
+# Tres desviaciones estándar del error relativo de HyperLogLog
+TOLERANCIA_HLL = 3 * 1.04 / np.sqrt(1 << PRECISION)
+
+@pytest.fixture
+def ids():
+    """Flujo de ids con distribución de Zipf: pocos muy frecuentes y una cola larga."""
+    generador = np.random.default_rng(7)
+    return generador.zipf(1.3, size=200_000) % 50_000
+
+def _sketch_por_partes(ids, partes, capacidad):
+    sketches = []
+    for parte in np.array_split(ids, partes):
+        sketch = nuevo_frecuentes(capacidad)
+        for bloque in np.array_split(parte, 4):
+            agregar_conteos_frecuentes(sketch, pd.Series(bloque).value_counts())
+        sketches.append(sketch)
+    combinado = sketches[0]
+    for sketch in sketches[1:]:
+        combinado = combinar_frecuentes(combinado, sketch)
+    return combinado
+
+@pytest.mark.parametrize('partes', [1, 3, 8])
+def test_frecuentes_combinados_respetan_la_cota(ids, partes):
+    capacidad = 64
+    exactos = pd.Series(ids).value_counts()
+    sketch = _sketch_por_partes(ids, partes, capacidad)
+
+    assert sketch['n'] == len(ids)
+    assert len(sketch['conteos']) <= capacidad
+    error = error_frecuentes(sketch)
+    assert error <= len(ids) / (capacidad + 1)
+
+    estimados = sketch['conteos']
+    reales = exactos.reindex(estimados.index)
+    assert (estimados <= reales).all()
+    assert (reales <= estimados + error).all()
+    # Todo elemento con más de n / (capacidad + 1) apariciones está en el sketch
+    assert exactos[exactos > len(ids) / (capacidad + 1)].index.isin(estimados.index).all()
+    # Los más frecuentes, separados por más que el error, quedan en el mismo orden
+    assert top_frecuentes(sketch, 3).index.tolist() == exactos.head(3).index.tolist()
+
+def test_frecuentes_sobrevive_la_serializacion(ids):
+    sketch = _sketch_por_partes(ids, 2, 32)
+    recuperado = frecuentes_desde_dict(frecuentes_a_dict(sketch))
+    assert recuperado['n'] == sketch['n']
+    assert error_frecuentes(recuperado) == error_frecuentes(sketch)
+    pd.testing.assert_series_equal(recuperado['conteos'], sketch['conteos'], check_names=False)
+
+@pytest.mark.parametrize('distintos', [100, 5_000, 200_000])
+def test_hll_combinado_dentro_del_error(distintos):
+    generador = np.random.default_rng(distintos)
+    valores = generador.choice(np.arange(10 * distintos), size=distintos, replace=False)
+    # Con repetidos y partido en partes que se solapan
+    flujo = np.concatenate([valores, valores[: distintos // 2]])
+    generador.shuffle(flujo)
+
+    unico = agregar_hll(nuevo_hll(PRECISION), flujo)
+    combinado = nuevo_hll(PRECISION)
+    for parte in np.array_split(flujo, 5):
+        combinado = combinar_hll(combinado, agregar_hll(nuevo_hll(PRECISION), parte))
+
+    np.testing.assert_array_equal(combinado['registros'], unico['registros'])
+    assert abs(estimar_hll(combinado) - distintos) / distintos <= TOLERANCIA_HLL
+
+def test_hll_de_distinta_precision_no_se_combinan():
+    with pytest.raises(ValueError):
+        combinar_hll(nuevo_hll(10), nuevo_hll(12))
+
+def test_hll_por_grupo_combinado_dentro_del_error():
+    generador = np.random.default_rng(3)
+    grupos = generador.choice(['Bogotá', 'Cali', 'Medellín'], size=120_000)
+    valores = generador.integers(0, 40_000, size=len(grupos))
+    exactos = pd.DataFrame({'grupo': grupos, 'valor': valores}).groupby('grupo')['valor'].nunique()
+
+    partes = []
+    for indices in np.array_split(np.arange(len(grupos)), 4):
+        partes.append(agregar_hll_por_grupo({}, grupos[indices], valores[indices], PRECISION))
+    combinado = partes[0]
+    for parte in partes[1:]:
+        combinado = combinar_hll_por_grupo(combinado, parte)
+
+    estimados = estimar_por_grupo(combinado, 'grupo')
+    assert sorted(estimados.index) == sorted(exactos.index)
+    relativo = (estimados - exactos).abs() / exactos
+    assert (relativo <= TOLERANCIA_HLL).all()
@@ -0,0 +1,31 @@
+"""
+Tests de las tablas del reporte: los archivos de datos de DataTables deben llevar
+los textos escapados, igual que las tablas generadas con to_html.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tablas import escribir_tabla
+
+@pytest.mark.parametrize('formato', ['json', 'ndjson'])
+def test_textos_escapados_y_nulos(tmp_path, formato):
+    df = pd.DataFrame({
+        'nombre': ['<script>alert(1)</script>', 'Ana & Luis', None],
+        'ciudad': pd.Categorical(['<b>Cali</b>', 'Bogotá', 'Bogotá']),
+        'interacciones': [3, 2, 1],
+        'tasa': [50.0, np.nan, 12.5]
+    })
+    ruta = tmp_path / f'tabla.{formato}'
+    assert escribir_tabla(df, str(ruta), formato) == 3
+
+    texto = ruta.read_text(encoding='utf-8')
+    filas = json.loads(texto)['data'] if formato == 'json' else [json.loads(l) for l in texto.splitlines()]
+    assert filas == [
+        ['&lt;script&gt;alert(1)&lt;/script&gt;', '&lt;b&gt;Cali&lt;/b&gt;', 3, 50.0],
+        ['Ana &amp; Luis', 'Bogotá', 2, None],
+        [None, 'Bogotá', 1, 12.5]
+    ]
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 # Importa las funciones del módulo de preprocesamiento
 from .preprocesamiento import cargar_datos, manejar_nulos, estandarizar_texto, limpieza_especifica
@@ -6,6 +7,14 @@ from .preprocesamiento import cargar_datos, manejar_nulos, estandarizar_texto, l
 USUARIOS_PATH = 'data/usuarios.csv' # ¡CORREGIDO!
 PUBLICACIONES_PATH = 'data/publicaciones.json' # ¡CORREGIDO!
 
+def percentiles_inversos(serie, percentiles):
+    """Percentiles sin interpolar (method='inverted_cdf'): el menor valor cuyo acumulado llega a p."""
+    valores = serie.dropna().to_numpy(dtype='float64')
+    if len(valores) == 0:
+        return pd.Series(np.nan, index=[f'p{int(p * 100)}' for p in percentiles])
+    return pd.Series(np.percentile(valores, [p * 100 for p in percentiles], method='inverted_cdf'),
+                     index=[f'p{int(p * 100)}' for p in percentiles])
+
 def realizar_analisis():
     print("--- 1. Carga y Preprocesamiento de Datos ---")
     df_usuarios, df_publicaciones = cargar_datos(USUARIOS_PATH, PUBLICACIONES_PATH)
@@ -19,8 +28,38 @@ def realizar_analisis():
     df_combinado = pd.merge(df_usuarios, df_publicaciones, on='id_usuario', how='inner')
     print("Datos cargados y combinados correctamente.")
     
-    # --- Aquí va el código para responder las preguntas clave (Trabajo de Miembro 3) ---
-    # *Este código debe ser completado por el Analista Principal después del PR*
+    # --- Preguntas clave ---
+    print("\n--- 2. Análisis de Publicaciones ---")
+    
+    # Relación publicado/borrador
+    conteo_estados = df_publicaciones['estado'].value_counts()
+    publicadas = conteo_estados.get('PUBLICADO', 0)
+    borradores = conteo_estados.get('BORRADOR', 0)
+    tasa = publicadas / len(df_publicaciones) * 100 if len(df_publicaciones) else 0.0
+    print(f"Publicadas: {publicadas} | Borradores: {borradores} | "
+          f"Tasa de publicación: {tasa:.1f}%")
+    if borradores:
+        print(f"Relación publicado/borrador: {publicadas / borradores:.2f}")
+    
+    # Percentiles de duración por estado, ciudad (si los usuarios la tienen) y usuario
+    percentiles = [0.25, 0.5, 0.75, 0.9]
+    dimensiones = [('estado', df_publicaciones), ('ciudad', df_combinado), ('id_usuario', df_publicaciones)]
+    for columna, df in dimensiones:
+        if columna not in df.columns:
+            continue
+        # Mismo método que el pipeline de src/publicaciones.py (sin interpolar)
+        tabla = df.groupby(columna)['duracion_segundos'].apply(
+            percentiles_inversos, percentiles=percentiles).unstack()
+        print(f"\nDuración (segundos) por {columna}:\n", tabla)
+    
+    # Cadencia: publicaciones por usuario
+    por_usuario = df_publicaciones['id_usuario'].value_counts()
+    print(f"\nUsuarios que publican: {len(por_usuario)} | "
+          f"Mediana de publicaciones por usuario: {por_usuario.median():.0f} | Máximo: {por_usuario.max()}")
+    
+    # Tags más usados (se aplanan las listas y se estandariza el texto)
+    tags = df_publicaciones['tags'].explode().str.strip().str.lower()
+    print("\nTags más usados:\n", tags.value_counts().head(5))
     
     return df_combinado
 